@@ -0,0 +1,311 @@
+"""Offline benchmarks for the NetMind SDK against a local mock server.
+
+Run from the repository root::
+
+    python -m benchmarks.bench --scenarios chat,parse --concurrency 1,8,32 --requests 200
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from netmind import NetMind, AsyncNetMind
+from netmind._compression import COMPRESSIONS
+from netmind.concurrency import AdaptiveConcurrency
+from netmind.types.code_interpreter import CodeInterpreterCodeRequest, CodeInterpreterCodeFile
+
+from benchmarks.mock_server import MockConfig, MockServerProcess
+
+
+MODEL = "mock/model"
+CODE_REQUEST = CodeInterpreterCodeRequest(
+    language="python",
+    files=[CodeInterpreterCodeFile(name="main.py", content="print('hello')")],
+)
+
+
+@dataclass
+class BenchResult:
+    scenario: str
+    mode: str
+    concurrency: int
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    peak_mem_kb: float
+    allocated_blocks: int
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def sync_scenarios(client: NetMind, upload_path: str, prompt: str = "hi") -> Dict[str, Callable[[], Any]]:
+    return {
+        "chat": lambda: client.chat.completions.create(
+            model=MODEL, messages=[{"role": "user", "content": prompt}]
+        ),
+        "embeddings": lambda: client.embeddings.create(model=MODEL, input=["hello world"] * 8),
+        "files": lambda: client.files.create(upload_path, purpose="inference"),
+        "parse": lambda: client.parse_pro.parse(upload_path, format="json"),
+        "code_interpreter": lambda: client.code_interpreter.run(CODE_REQUEST),
+    }
+
+
+def async_scenarios(
+        client: AsyncNetMind, upload_path: str, prompt: str = "hi"
+) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    return {
+        "chat": lambda: client.chat.completions.create(
+            model=MODEL, messages=[{"role": "user", "content": prompt}]
+        ),
+        "embeddings": lambda: client.embeddings.create(model=MODEL, input=["hello world"] * 8),
+        "files": lambda: client.files.create(upload_path, purpose="inference"),
+        "parse": lambda: client.parse_pro.parse(upload_path, format="json"),
+        "code_interpreter": lambda: client.code_interpreter.arun(CODE_REQUEST),
+    }
+
+
+def _summarize(
+        scenario: str, mode: str, concurrency: int, latencies: List[float],
+        errors: int, seconds: float, peak: int, blocks: int,
+) -> BenchResult:
+    total = len(latencies) + errors
+    return BenchResult(
+        scenario=scenario,
+        mode=mode,
+        concurrency=concurrency,
+        requests=total,
+        errors=errors,
+        seconds=round(seconds, 4),
+        throughput=round(total / seconds, 2) if seconds else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 3),
+        p90_ms=round(percentile(latencies, 90) * 1000, 3),
+        p99_ms=round(percentile(latencies, 99) * 1000, 3),
+        peak_mem_kb=round(peak / 1024, 1),
+        allocated_blocks=blocks,
+    )
+
+
+def run_sync(call: Callable[[], Any], requests: int, concurrency: int) -> tuple:
+    # workers take requests from a shared iterator, so nothing is queued up front per request
+    pending = iter(range(requests))
+
+    def worker() -> tuple:
+        latencies: List[float] = []
+        errors = 0
+        for _ in pending:
+            start = time.perf_counter()
+            try:
+                call()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        return latencies, errors
+
+    latencies: List[float] = []
+    errors = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for worker_latencies, worker_errors in pool.map(lambda _: worker(), range(concurrency)):
+            latencies.extend(worker_latencies)
+            errors += worker_errors
+    return latencies, errors, time.perf_counter() - start
+
+
+async def _run_async(call: Callable[[], Awaitable[Any]], requests: int, concurrency: int) -> tuple:
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in pending:
+            start = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def measure(run: Callable[[], tuple], scenario: str, mode: str, concurrency: int, trace: bool) -> BenchResult:
+    # blocks are counted without pending garbage, so they are what the run left allocated
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    if trace:
+        tracemalloc.start()
+    try:
+        latencies, errors, seconds = run()
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    finally:
+        if trace:
+            tracemalloc.stop()
+    gc.collect()
+    blocks = sys.getallocatedblocks() - blocks_before
+    return _summarize(scenario, mode, concurrency, latencies, errors, seconds, peak, blocks)
+
+
+def run_benchmarks(
+        server_url: str,
+        scenarios: List[str],
+        modes: List[str],
+        concurrency_levels: List[int],
+        requests: int,
+        upload_path: str,
+        warmup: int = 5,
+        trace: bool = True,
+        client_options: Optional[Dict[str, Any]] = None,
+        async_options: Optional[Dict[str, Any]] = None,
+        prompt: str = "hi",
+) -> List[BenchResult]:
+    client_options = {"max_retries": 0, **(client_options or {})}
+    async_options = {**client_options, **(async_options or {})}
+    results: List[BenchResult] = []
+    for concurrency in concurrency_levels:
+        if "sync" in modes:
+            client = NetMind(api_key="mock", base_url=server_url, **client_options)
+            calls = sync_scenarios(client, upload_path, prompt)
+            for name in scenarios:
+                run_sync(calls[name], warmup, 1)
+                results.append(measure(
+                    lambda: run_sync(calls[name], requests, concurrency), name, "sync", concurrency, trace
+                ))
+        if "async" in modes:
+            # one loop for all the scenarios, so the client and its connections are reused across them
+            loop = asyncio.new_event_loop()
+            try:
+                client = AsyncNetMind(api_key="mock", base_url=server_url, **async_options)
+                calls = async_scenarios(client, upload_path, prompt)
+                for name in scenarios:
+                    loop.run_until_complete(_run_async(calls[name], warmup, 1))
+                    results.append(measure(
+                        lambda: loop.run_until_complete(_run_async(calls[name], requests, concurrency)),
+                        name, "async", concurrency, trace,
+                    ))
+            finally:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.run_until_complete(loop.shutdown_default_executor())
+                loop.close()
+    return results
+
+
+def format_table(results: List[BenchResult]) -> str:
+    columns = [
+        "scenario", "mode", "concurrency", "requests", "errors", "throughput",
+        "p50_ms", "p90_ms", "p99_ms", "peak_mem_kb", "allocated_blocks",
+    ]
+    rows = [[str(getattr(r, c)) for c in columns] for r in results]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) if rows else len(c) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    lines.extend("  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in rows)
+    return "\n".join(lines)
+
+
+def _prompt(chars: int) -> str:
+    words = " ".join(f"word{i}" for i in range(chars // 6 + 1))
+    return words[:chars] if chars > 0 else "hi"
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _str_list(value: str) -> List[str]:
+    return [v for v in value.split(",") if v]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=_str_list, default=["chat", "embeddings", "files", "parse", "code_interpreter"])
+    parser.add_argument("--modes", type=_str_list, default=["sync", "async"])
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency per request, in seconds")
+    parser.add_argument("--upload-latency", type=float, default=0.0, help="extra latency of presigned PUTs")
+    parser.add_argument("--upload-size", type=int, default=64 * 1024, help="size in bytes of the uploaded file")
+    parser.add_argument("--parse-blocks", type=int, default=16)
+    parser.add_argument("--parse-block-chars", type=int, default=256)
+    parser.add_argument("--embedding-dim", type=int, default=1024)
+    parser.add_argument("--chat-words", type=int, default=32)
+    parser.add_argument("--prompt-chars", type=int, default=2, help="size of the chat prompt, e.g. a long context")
+    parser.add_argument("--request-compression", default=None, choices=COMPRESSIONS, help="compress request bodies")
+    parser.add_argument("--lean", action="store_true", help="decode responses with `lean_responses=True`")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="server answers 429 past this many requests")
+    parser.add_argument("--max-retries", type=int, default=0)
+    parser.add_argument("--adaptive", action="store_true", help="async client uses `AdaptiveConcurrency()`")
+    parser.add_argument("--server-url", default=None, help="use an already running mock server")
+    parser.add_argument("--no-trace", action="store_true", help="skip tracemalloc, which slows every allocation")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(
+        latency=args.latency,
+        upload_latency=args.upload_latency,
+        parse_blocks=args.parse_blocks,
+        parse_block_chars=args.parse_block_chars,
+        embedding_dim=args.embedding_dim,
+        chat_words=args.chat_words,
+        max_concurrency=args.max_concurrency,
+        record=False,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        upload_path = os.path.join(tmp, "upload.pdf")
+        with open(upload_path, "wb") as f:
+            f.write(b"%PDF-1.4\n" + os.urandom(max(0, args.upload_size - 9)))
+
+        server = None
+        server_url = args.server_url
+        if server_url is None:
+            # served from another process, so the measured memory and blocks are the SDK's alone
+            server = MockServerProcess(config).start()
+            server_url = server.url
+        try:
+            results = run_benchmarks(
+                server_url, args.scenarios, args.modes, args.concurrency,
+                args.requests, upload_path, warmup=args.warmup, trace=not args.no_trace,
+                client_options={
+                    "lean_responses": args.lean, "max_retries": args.max_retries,
+                    "request_compression": args.request_compression,
+                },
+                async_options={"concurrency": AdaptiveConcurrency()} if args.adaptive else None,
+                prompt=_prompt(args.prompt_chars),
+            )
+        finally:
+            if server is not None:
+                server.stop()
+
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
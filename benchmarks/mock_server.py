@@ -0,0 +1,486 @@
+import gzip
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+INFERENCE_PREFIX = "/inference-api/openai/v1"
+PARSE_PATH = "/inference-api/agent/v1/parse-pdf"
+CODE_INTERPRETER_PATH = "/inference-api/agent/code-interpreter/v1/execute"
+
+
+@dataclass
+class MockConfig:
+    # artificial server-side latency in seconds, applied to every request
+    latency: float = 0.0
+    # latency applied to the presigned PUT only, on top of `latency`
+    upload_latency: float = 0.0
+    # number of blocks returned by json parse results
+    parse_blocks: int = 16
+    # size in characters of the text carried by each parse block
+    parse_block_chars: int = 256
+    # dimension of every embedding vector
+    embedding_dim: int = 1024
+    # number of words in chat completion answers
+    chat_words: int = 32
+    # size in bytes of code-interpreter stdout
+    stdout_bytes: int = 64
+    # number of polls an async parse task stays PENDING before succeeding
+    parse_task_polls: int = 0
+    # minimum response size before gzip is used for clients accepting it
+    gzip_min_size: Optional[int] = None
+    # requests beyond this many in flight are rejected with 429, like a rate-limited backend
+    max_concurrency: Optional[int] = None
+    # keep every request and uploaded body for inspection, off for long benchmark runs
+    record: bool = True
+
+
+@dataclass
+class RecordedRequest:
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body_size: int
+    raw_body_size: int
+    # decoded request body
+    body: bytes = b""
+
+
+@dataclass
+class _State:
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    uploads: Dict[str, bytes] = field(default_factory=dict)
+    tasks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    requests: List[RecordedRequest] = field(default_factory=list)
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    throttled: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _read_body(self) -> Tuple[bytes, int]:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            raw = b"".join(chunks)
+        else:
+            raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        encoding = self.headers.get("Content-Encoding", "").lower()
+        if encoding == "gzip":
+            return gzip.decompress(raw), len(raw)
+        if encoding == "deflate":
+            return zlib.decompress(raw), len(raw)
+        if encoding == "zstd":
+            import zstandard
+            return zstandard.ZstdDecompressor().decompressobj().decompress(raw), len(raw)
+        return raw, len(raw)
+
+    def _send(
+            self, status: int, payload: Any = None, raw: Optional[bytes] = None,
+            extra_headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if raw is None:
+            raw = b"" if payload is None else json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json", **(extra_headers or {})}
+        threshold = self.server.config.gzip_min_size
+        if (
+            threshold is not None
+            and len(raw) >= threshold
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+        ):
+            raw = gzip.compress(raw, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _handle(self, method: str) -> None:
+        body, raw_size = self._read_body()
+        path = urlparse(self.path).path
+        state = self.server.state
+        config = self.server.config
+        if config.record:
+            with state.lock:
+                state.requests.append(RecordedRequest(
+                    method=method,
+                    path=path,
+                    headers={k.lower(): v for k, v in self.headers.items()},
+                    body_size=len(body),
+                    raw_body_size=raw_size,
+                    body=body,
+                ))
+        with state.lock:
+            state.in_flight += 1
+            state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+            throttled = config.max_concurrency is not None and state.in_flight > config.max_concurrency
+            if throttled:
+                state.throttled += 1
+        try:
+            if throttled:
+                self._send(
+                    429, {"error": {"message": "Too many requests"}},
+                    extra_headers={"retry-after-ms": "10"},
+                )
+                return
+            if config.latency:
+                time.sleep(config.latency)
+            status, payload = self.server.route(method, path, body)
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+        if isinstance(payload, bytes):
+            self._send(status, raw=payload)
+        else:
+            self._send(status, payload)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PUT(self) -> None:
+        self._handle("PUT")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], config: MockConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.state = _State()
+        self._vectors: Dict[Tuple[int, int], List[float]] = {}
+
+    def handle_error(self, request, client_address) -> None:
+        # clients that gave up on a slow response (timeouts, deadlines) are not server errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        data = json.loads(body) if body and method in ("POST",) else None
+
+        if path == f"{INFERENCE_PREFIX}/chat/completions" and method == "POST":
+            return 200, self._chat(data)
+        if path == f"{INFERENCE_PREFIX}/embeddings" and method == "POST":
+            return 200, self._embeddings(data)
+        if path == CODE_INTERPRETER_PATH and method == "POST":
+            return 200, self._code_interpreter(data)
+        if path == PARSE_PATH and method == "POST":
+            return 200, self._parse_result(data)
+        if path == f"{PARSE_PATH}/async" and method == "POST":
+            return 200, self._parse_submit(data)
+        if path.startswith(f"{PARSE_PATH}/async/") and method == "GET":
+            return self._parse_poll(path.rsplit("/", 1)[-1])
+        if path.startswith("/upload/") and method == "PUT":
+            return self._upload(path.rsplit("/", 1)[-1], body)
+        if path == "/v1/files" and method == "POST":
+            return 200, self._file_create(data)
+        if path == "/v1/files" and method == "GET":
+            with self.state.lock:
+                return 200, list(self.state.files.values())
+        if path.startswith("/v1/files/"):
+            parts = path.split("/")
+            file_id = parts[3]
+            with self.state.lock:
+                file = self.state.files.get(file_id)
+            if file is None:
+                return 404, {"error": {"message": f"File {file_id} not found"}}
+            if len(parts) == 5 and parts[4] == "presigned_url" and method == "GET":
+                return 200, {"presigned_url": f"{self.url}/upload/{file_id}"}
+            if len(parts) == 4 and method == "GET":
+                return 200, file
+            if len(parts) == 4 and method == "DELETE":
+                with self.state.lock:
+                    self.state.files.pop(file_id, None)
+                    self.state.uploads.pop(file_id, None)
+                return 200, None
+        return 404, {"error": {"message": f"No route for {method} {path}"}}
+
+    def _chat(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        words = self.config.chat_words
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": data.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": " ".join(["token"] * words)},
+            }],
+            "usage": {"prompt_tokens": 8, "completion_tokens": words, "total_tokens": 8 + words},
+        }
+
+    def _embeddings(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = data.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dim = data.get("dimensions") or self.config.embedding_dim
+        rows = []
+        for index, text in enumerate(inputs):
+            rows.append({"object": "embedding", "index": index, "embedding": self._vector(str(text), dim)})
+        return {
+            "object": "list",
+            "model": data.get("model", "mock"),
+            "data": rows,
+            "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+        }
+
+    def _vector(self, text: str, dim: int) -> List[float]:
+        # deterministic per text, built from a small pool so large runs stay cheap to serve
+        seed = zlib.crc32(text.encode()) % 64
+        key = (seed, dim)
+        vector = self._vectors.get(key)
+        if vector is None:
+            vector = [((seed * 31 + i * 7) % 255) / 255.0 for i in range(dim)]
+            self._vectors[key] = vector
+        return vector
+
+    def _code_interpreter(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        stdout = "x" * self.config.stdout_bytes
+        # code saving a figure produces an artifact, like matplotlib runs on the real service
+        artifacts = [
+            {"generated_file_name": "figure.png", "id": f"file-{uuid.uuid4().hex}", "mime_type": "image/png"}
+            for f in data.get("files", []) if "savefig" in f.get("content", "")
+        ]
+        return {
+            "language": data.get("language", "python"),
+            "version": "3.11",
+            "run": {
+                "stdout": stdout,
+                "stderr": "",
+                "code": 0,
+                "output": stdout,
+                "memory": 1024,
+                "cpu_time": 1,
+                "wall_time": 1,
+                "data": artifacts,
+            },
+        }
+
+    def _blocks(self) -> List[Dict[str, Any]]:
+        text = "lorem ipsum " * (self.config.parse_block_chars // 12 + 1)
+        return [
+            {"type": "text", "page": i // 4 + 1, "text": text[:self.config.parse_block_chars]}
+            for i in range(self.config.parse_blocks)
+        ]
+
+    def _parse_payload(self, data: Dict[str, Any]) -> Any:
+        blocks = self._blocks()
+        if data.get("format") == "json":
+            return blocks
+        return "\n\n".join(block["text"] for block in blocks)
+
+    def _parse_result(self, data: Dict[str, Any]) -> Any:
+        return self._parse_payload(data)
+
+    def _parse_submit(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        task_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.tasks[task_id] = {"request": data, "polls": 0}
+        return {"task_id": task_id, "status": "PENDING"}
+
+    def _parse_poll(self, task_id: str) -> Tuple[int, Any]:
+        with self.state.lock:
+            task = self.state.tasks.get(task_id)
+            if task is None:
+                return 404, {"error": {"message": f"Task {task_id} not found"}}
+            task["polls"] += 1
+            polls = task["polls"]
+        if polls <= self.config.parse_task_polls:
+            return 200, {"task_id": task_id, "status": "PENDING"}
+        return 200, {
+            "task_id": task_id,
+            "status": "SUCCESS",
+            "data": self._parse_payload(task["request"]),
+            "page_size": (self.config.parse_blocks + 3) // 4,
+        }
+
+    def _upload(self, file_id: str, body: bytes) -> Tuple[int, Any]:
+        if self.config.upload_latency:
+            time.sleep(self.config.upload_latency)
+        with self.state.lock:
+            if file_id not in self.state.files:
+                return 404, {"error": {"message": f"File {file_id} not found"}}
+            if self.config.record:
+                self.state.uploads[file_id] = body
+            self.state.files[file_id]["bytes"] = len(body)
+        return 200, b""
+
+    def _file_create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex}"
+        with self.state.lock:
+            self.state.files[file_id] = {
+                "id": file_id,
+                "file_name": data["file_name"],
+                "purpose": data["purpose"],
+                "created_at": int(time.time()),
+                "bytes": 0,
+            }
+        return {"id": file_id, "presigned_url": f"{self.url}/upload/{file_id}"}
+
+
+class MockServer:
+    """A local stand-in for the NetMind API, served from a background thread.
+
+    Usage::
+
+        with MockServer(MockConfig(latency=0.01)) as server:
+            client = NetMind(api_key="mock", base_url=server.url)
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        self._server = _Server((host, port), self.config)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return self._server.url
+
+    @property
+    def requests(self) -> List[RecordedRequest]:
+        with self._server.state.lock:
+            return list(self._server.state.requests)
+
+    @property
+    def uploads(self) -> Dict[str, bytes]:
+        with self._server.state.lock:
+            return dict(self._server.state.uploads)
+
+    @property
+    def throttled(self) -> int:
+        """Number of requests rejected with 429 because of `MockConfig.max_concurrency`."""
+        with self._server.state.lock:
+            return self._server.state.throttled
+
+    @property
+    def peak_in_flight(self) -> int:
+        with self._server.state.lock:
+            return self._server.state.peak_in_flight
+
+    def reset(self) -> None:
+        with self._server.state.lock:
+            self._server.state.requests.clear()
+            self._server.state.throttled = 0
+            self._server.state.peak_in_flight = 0
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def _serve(config: MockConfig, host: str, connection: Connection) -> None:
+    server = MockServer(config, host=host)
+    connection.send(server.url)
+    connection.close()
+    server._server.serve_forever()
+
+
+class MockServerProcess:
+    """A `MockServer` run in a child process, so its work is left out of the caller's measurements.
+
+    Only `url` is available, the recorded requests and uploads stay in the child.
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1"):
+        self.config = config or MockConfig()
+        self.host = host
+        self.url: Optional[str] = None
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+
+    def start(self) -> "MockServerProcess":
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        self._process = context.Process(target=_serve, args=(self.config, self.host, sender), daemon=True)
+        self._process.start()
+        sender.close()
+        try:
+            self.url = receiver.recv()
+        finally:
+            receiver.close()
+        return self
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+
+    def __enter__(self) -> "MockServerProcess":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the NetMind API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--parse-blocks", type=int, default=16)
+    parser.add_argument("--embedding-dim", type=int, default=1024)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockServer(
+        MockConfig(
+            latency=args.latency, parse_blocks=args.parse_blocks,
+            embedding_dim=args.embedding_dim, max_concurrency=args.max_concurrency,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Mock NetMind API listening on {server.url}")
+    server._server.serve_forever()
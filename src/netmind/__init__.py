@@ -1,7 +1,9 @@
 from netmind.client import NetMind, AsyncNetMind
+from netmind.bridge import BackgroundNetMind
 
 
 __all__ = [
     "NetMind",
     "AsyncNetMind",
-]
\ No newline at end of file
+    "BackgroundNetMind",
+]
@@ -0,0 +1,35 @@
+import zlib
+from typing import Callable, Optional, Tuple
+
+from netmind.exceptions import NetMindError
+
+COMPRESSIONS = ("gzip", "zstd")
+
+
+def check_compression(compression: Optional[str]) -> Optional[str]:
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Expected `compression` to be one of {COMPRESSIONS} but received {compression!r}")
+    return compression
+
+
+def compressor(compression: str, level: Optional[int] = None) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """Return the `(compress, flush)` functions of a streaming gzip or zstd compressor.
+
+    `level` defaults to 6 for gzip and 3 for zstd.
+    """
+    if compression == "gzip":
+        gzip = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+        return gzip.compress, gzip.flush
+    try:
+        import zstandard
+    except ImportError as err:
+        raise NetMindError(
+            "zstd compression requires the `zstandard` package, install it with `pip install 'netmind[zstd]'`"
+        ) from err
+    zstd = zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+    return zstd.compress, zstd.flush
+
+
+def compress(data: bytes, compression: str, level: Optional[int] = None) -> bytes:
+    compress_chunk, flush = compressor(compression, level)
+    return compress_chunk(data) + flush()
@@ -0,0 +1,117 @@
+from typing import Optional
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from openai._models import FinalRequestOptions
+from openai._types import NotGiven
+
+from netmind._compression import check_compression, compress
+from netmind.deadlines import bound_request_body, bound_response_body, check_deadline, raise_on_expiry, trim_timeout
+from netmind.exceptions import DeadlineExceededError
+from netmind.scheduling import PRIORITY_EXTENSION, PRIORITY_HEADER
+
+# json bodies smaller than this are not worth compressing
+DEFAULT_COMPRESSION_THRESHOLD = 16 * 1024
+# requests are compressed on the calling thread, so favour speed: json still shrinks 5-10x
+_LEVELS = {"gzip": 1, "zstd": 3}
+
+
+class _DeadlineMixin:
+    """Fits every attempt of a request, and the backoff between them, in the current deadline."""
+
+    def _trim_options(self, options: FinalRequestOptions) -> FinalRequestOptions:
+        if check_deadline() is not None:
+            options.timeout = trim_timeout(self.timeout if isinstance(options.timeout, NotGiven) else options.timeout)
+        return options
+
+    def _calculate_retry_timeout(
+            self, remaining_retries: int, options: FinalRequestOptions, response_headers: Optional[httpx.Headers] = None
+    ) -> float:
+        timeout = super()._calculate_retry_timeout(remaining_retries, options, response_headers)
+        left = check_deadline()
+        if left is not None and timeout >= left:
+            raise DeadlineExceededError(
+                f"Not retrying {options.url} in {timeout:.3f}s, only {left:.3f}s are left before the deadline"
+            )
+        return timeout
+
+
+class _CompressionMixin:
+    """Compresses json request bodies of at least `compression_threshold` bytes with `request_compression`."""
+
+    request_compression: Optional[str] = None
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD
+
+    def _build_request(self, options: FinalRequestOptions, *, retries_taken: int = 0) -> httpx.Request:
+        request = super()._build_request(options, retries_taken=retries_taken)
+        if (
+            self.request_compression is None
+            or not isinstance(request.stream, httpx.ByteStream)
+            or "content-encoding" in request.headers
+            or not request.headers.get("content-type", "").startswith("application/json")
+            or len(request.content) < self.compression_threshold
+        ):
+            return request
+        body = compress(request.content, self.request_compression, _LEVELS[self.request_compression])
+        if len(body) >= len(request.content):
+            return request
+        headers = request.headers.copy()
+        headers["Content-Encoding"] = self.request_compression
+        del headers["Content-Length"]
+        return httpx.Request(request.method, request.url, headers=headers, content=body, extensions=request.extensions)
+
+
+class _PriorityMixin:
+    """Moves the priority header to the request extensions, so it never leaves the process."""
+
+    def _build_request(self, options: FinalRequestOptions, *, retries_taken: int = 0) -> httpx.Request:
+        request = super()._build_request(options, retries_taken=retries_taken)
+        priority = request.headers.pop(PRIORITY_HEADER, None)
+        if priority is not None:
+            request.extensions[PRIORITY_EXTENSION] = priority
+        return request
+
+
+class NetMindOpenAI(_DeadlineMixin, _PriorityMixin, _CompressionMixin, OpenAI):
+    def __init__(
+            self,
+            *,
+            request_compression: Optional[str] = None,
+            compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+            **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.request_compression = check_compression(request_compression)
+        self.compression_threshold = compression_threshold
+        # nothing cancels a blocking call, so bodies check the deadline between their chunks
+        hooks = self._client.event_hooks
+        for name, hook in (("request", bound_request_body), ("response", bound_response_body)):
+            if hook not in hooks[name]:
+                hooks[name].append(hook)
+
+    def request(self, *args, **kwargs):
+        with raise_on_expiry():
+            return super().request(*args, **kwargs)
+
+    def _prepare_options(self, options: FinalRequestOptions) -> FinalRequestOptions:
+        return self._trim_options(super()._prepare_options(options))
+
+
+class AsyncNetMindOpenAI(_DeadlineMixin, _PriorityMixin, _CompressionMixin, AsyncOpenAI):
+    def __init__(
+            self,
+            *,
+            request_compression: Optional[str] = None,
+            compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+            **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.request_compression = check_compression(request_compression)
+        self.compression_threshold = compression_threshold
+
+    async def request(self, *args, **kwargs):
+        with raise_on_expiry():
+            return await super().request(*args, **kwargs)
+
+    async def _prepare_options(self, options: FinalRequestOptions) -> FinalRequestOptions:
+        return self._trim_options(await super()._prepare_options(options))
@@ -0,0 +1,77 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Union
+
+from netmind.exceptions import NetMindError
+from netmind.types.parse_pro import Formt, JsonFormat, MarkdownFormat
+
+# block keys carrying a page number, shifted by the shard offset when stitching json results
+_PAGE_KEYS = ("page", "page_idx", "page_no", "page_number")
+
+
+@dataclass
+class PdfShard:
+    path: str
+    first_page: int  # zero-based index of the first page of the shard in the source document
+    page_count: int
+
+
+def _import_pypdf():
+    try:
+        import pypdf
+    except ImportError as err:
+        raise NetMindError(
+            "Splitting PDFs requires the `pypdf` package, install it with `pip install 'netmind[pdf]'`"
+        ) from err
+    return pypdf
+
+
+def count_pages(path: Union[str, os.PathLike]) -> int:
+    pypdf = _import_pypdf()
+    return len(pypdf.PdfReader(path).pages)
+
+
+def split_pdf(path: Union[str, os.PathLike], pages_per_shard: int, directory: str) -> List[PdfShard]:
+    if pages_per_shard < 1:
+        raise ValueError(f"Expected a positive `pages_per_shard` but received {pages_per_shard!r}")
+    pypdf = _import_pypdf()
+    reader = pypdf.PdfReader(path)
+    total = len(reader.pages)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    shards = []
+    for first in range(0, total, pages_per_shard):
+        last = min(first + pages_per_shard, total)
+        writer = pypdf.PdfWriter()
+        for index in range(first, last):
+            writer.add_page(reader.pages[index])
+        shard_path = os.path.join(directory, f"{stem}_p{first + 1}-{last}.pdf")
+        with open(shard_path, "wb") as f:
+            writer.write(f)
+        shards.append(PdfShard(path=shard_path, first_page=first, page_count=last - first))
+    return shards
+
+
+def _shift_pages(block: Dict[str, Any], offset: int) -> Dict[str, Any]:
+    if not offset:
+        return block
+    shifted = None
+    for key in _PAGE_KEYS:
+        value = block.get(key)
+        if isinstance(value, int) and not isinstance(value, bool):
+            if shifted is None:
+                shifted = dict(block)
+            shifted[key] = value + offset
+    return block if shifted is None else shifted
+
+
+def merge_results(
+        format: Formt | str,
+        shards: Sequence[PdfShard],
+        results: Sequence[Union[JsonFormat, MarkdownFormat]],
+) -> Union[JsonFormat, MarkdownFormat]:
+    if Formt(format) == Formt.json:
+        blocks: JsonFormat = []
+        for shard, result in zip(shards, results):
+            blocks.extend(_shift_pages(block, shard.first_page) for block in result or [])
+        return blocks
+    return "\n\n".join(result for result in results if result)
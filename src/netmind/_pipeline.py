@@ -0,0 +1,90 @@
+import contextvars
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Stage = Tuple[Callable[[Any], Any], int]
+
+
+def _chain(item: Any, stages: Sequence[Stage], executors: List[ThreadPoolExecutor]) -> Future:
+    outer: Future = Future()
+    # stages run in the context of the caller, e.g. under its deadline
+    context = contextvars.copy_context()
+
+    def submit(index: int, value: Any) -> None:
+        if outer.cancelled():
+            return
+        try:
+            future = executors[index].submit(context.run, stages[index][0], value)
+        except RuntimeError as err:  # executor already shut down
+            outer.set_exception(err)
+            return
+        future.add_done_callback(lambda f: advance(index, f))
+
+    def advance(index: int, future: Future) -> None:
+        if outer.cancelled():
+            return
+        if future.cancelled():
+            outer.cancel()
+            return
+        err = future.exception()
+        if err is not None:
+            outer.set_exception(err)
+        elif index + 1 < len(stages):
+            submit(index + 1, future.result())
+        else:
+            outer.set_result(future.result())
+
+    submit(0, item)
+    return outer
+
+
+def run_pipeline(
+        items: Iterable[Any],
+        stages: Sequence[Stage],
+        *,
+        max_pending: Optional[int] = None,
+        return_exceptions: bool = False,
+) -> Iterator[Any]:
+    """Run every item through `stages` in order, each stage on its own thread pool.
+
+    Stages overlap across items, so stage 1 of item N+1 runs while stage 2 of item N is
+    still in flight. At most `max_pending` items are in the pipeline at once: the input
+    iterable is only advanced when the oldest item has been yielded. Results are yielded
+    in input order.
+    """
+    if not stages:
+        raise ValueError("Expected at least one pipeline stage")
+    for _, workers in stages:
+        if workers < 1:
+            raise ValueError(f"Expected a positive worker count but received {workers!r}")
+    if max_pending is None:
+        max_pending = sum(workers for _, workers in stages)
+    if max_pending < 1:
+        raise ValueError(f"Expected a positive `max_pending` but received {max_pending!r}")
+
+    executors = [
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"netmind-stage-{index}")
+        for index, (_, workers) in enumerate(stages)
+    ]
+    pending: Deque[Future] = deque()
+
+    def collect(future: Future) -> Any:
+        if return_exceptions:
+            err = future.exception()
+            if err is not None:
+                return err
+        return future.result()
+
+    try:
+        for item in items:
+            if len(pending) >= max_pending:
+                yield collect(pending.popleft())
+            pending.append(_chain(item, stages, executors))
+        while pending:
+            yield collect(pending.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
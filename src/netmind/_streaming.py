@@ -0,0 +1,112 @@
+import re
+import codecs
+import json
+from typing import Any, List
+
+_WHITESPACE = " \t\r\n"
+
+# parser states
+_OPEN = 0        # before the opening bracket
+_FIRST = 1       # after '[', expecting an element or ']'
+_ELEMENT = 2     # after ',', expecting an element
+_SEPARATOR = 3   # after an element, expecting ',' or ']'
+_CLOSED = 4      # after the closing bracket
+
+_DELIMITER = re.compile(r'[ \t\r\n,:\[\]{}"]')
+
+
+def _runs_to_end(buffer: str, pos: int, end: int) -> bool:
+    """Whether the token at `pos` (a number, literal or escape) may continue past the end of the buffer."""
+    return _DELIMITER.search(buffer, pos, end) is None
+
+
+def _truncated(err: json.JSONDecodeError, end: int) -> bool:
+    """Whether a decode error is due to the element being cut off by the end of the buffer.
+
+    That is when the error is at the end, inside a string left open, or in a token running up
+    to the end; anything else is invalid whatever follows.
+    """
+    return err.msg.startswith("Unterminated string") or _runs_to_end(err.doc, err.pos, end)
+
+
+class JsonArrayDecoder:
+    """Incrementally decode the elements of a top-level JSON array.
+
+    Feed it the response body chunk by chunk; every call returns the elements completed so
+    far. Only the undecoded tail of the body is buffered, so memory stays proportional to
+    the largest element rather than to the whole array.
+    """
+
+    def __init__(self) -> None:
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._state = _OPEN
+        # do not retry decoding an incomplete element before the buffer reaches this size
+        self._needed = 0
+
+    @staticmethod
+    def _error(message: str, buffer: str, pos: int) -> ValueError:
+        return ValueError(f"Invalid JSON array in response body: {message}, found {buffer[pos:pos + 20]!r}")
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        return self._drain(self._buffer + self._text.decode(chunk))
+
+    def _drain(self, buffer: str) -> List[Any]:
+        items: List[Any] = []
+        pos = 0
+        end = len(buffer)
+        while True:
+            while pos < end and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= end:
+                break
+            char = buffer[pos]
+            state = self._state
+            if state == _OPEN:
+                if char != "[":
+                    raise self._error("expected '['", buffer, pos)
+                self._state = _FIRST
+                pos += 1
+            elif state == _CLOSED:
+                raise self._error("unexpected data after the closing bracket", buffer, pos)
+            elif state == _SEPARATOR or (state == _FIRST and char == "]"):
+                if char == "]":
+                    self._state = _CLOSED
+                elif char == "," and state == _SEPARATOR:
+                    self._state = _ELEMENT
+                else:
+                    raise self._error("expected ',' or ']'", buffer, pos)
+                pos += 1
+            else:
+                if end - pos < self._needed:
+                    break
+                try:
+                    item, stop = self._json.raw_decode(buffer, pos)
+                except json.JSONDecodeError as err:
+                    if not _truncated(err, end):
+                        raise self._error(err.msg, buffer, err.pos) from err
+                    stop = end
+                # an element is only complete once a delimiter follows it, otherwise a number
+                # split across two chunks (after its "." or "e" too) would be decoded short
+                if _runs_to_end(buffer, stop, end):
+                    self._needed = 2 * (end - pos)
+                    break
+                items.append(item)
+                self._needed = 0
+                self._state = _SEPARATOR
+                pos = stop
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self) -> List[Any]:
+        """Decode what is left once the body has been fully read, and check the array was complete."""
+        self._needed = 0
+        items = self._drain(self._buffer + self._text.decode(b"", final=True))
+        tail = self._buffer.strip(_WHITESPACE)
+        if self._state in (_FIRST, _ELEMENT) and tail:
+            # surfaces the decoder's own error for a malformed trailing element
+            self._json.raw_decode(tail)
+        if self._state != _CLOSED or tail:
+            raise ValueError("Invalid JSON array in response body: the body ended before the array was complete")
+        return items
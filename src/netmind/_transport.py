@@ -0,0 +1,107 @@
+import time
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+from netmind.concurrency import (
+    AdaptiveConcurrency,
+    CHAT, EMBEDDINGS, PARSE, CODE_INTERPRETER, FILES,
+    OK, THROTTLED, FAILED,
+)
+from netmind.scheduling import PRIORITY_EXTENSION, PriorityScheduler
+
+
+def endpoint_family(request: httpx.Request) -> Optional[str]:
+    path = request.url.path
+    if path.endswith("/chat/completions") or path.endswith("/completions"):
+        return CHAT
+    if path.endswith("/embeddings"):
+        return EMBEDDINGS
+    if "/parse-pdf" in path:
+        return PARSE
+    if "/code-interpreter/" in path:
+        return CODE_INTERPRETER
+    # presigned uploads are the only PUTs
+    if "/v1/files" in path or request.method == "PUT":
+        return FILES
+    return None
+
+
+def _outcome(status_code: int) -> str:
+    if status_code == 429:
+        return THROTTLED
+    if status_code >= 500:
+        return FAILED
+    return OK
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that calls `release` once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class AdaptiveConcurrencyTransport(httpx.AsyncBaseTransport):
+    """Holds every request in the limiter of its endpoint family until its response is closed."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, concurrency: AdaptiveConcurrency):
+        self._transport = transport
+        self.concurrency = concurrency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        family = endpoint_family(request)
+        if family is None:
+            return await self._transport.handle_async_request(request)
+        limiter = self.concurrency.limiter(family)
+        started = await limiter.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except (httpx.TimeoutException, httpx.NetworkError):
+            limiter.record(started, None, FAILED)
+            limiter.release()
+            raise
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.record(started, time.monotonic() - started, _outcome(response.status_code))
+        response.stream = _ReleasingStream(response.stream, limiter.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class PriorityTransport(httpx.AsyncBaseTransport):
+    """Admits requests through a `PriorityScheduler`, holding their slot until the response is closed."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, scheduler: PriorityScheduler):
+        self._transport = transport
+        self.scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        priority = self.scheduler.classify(endpoint_family(request), request.extensions.get(PRIORITY_EXTENSION))
+        await self.scheduler.acquire(priority)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self.scheduler.release(priority)
+            raise
+        response.stream = _ReleasingStream(response.stream, lambda: self.scheduler.release(priority))
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
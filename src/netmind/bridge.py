@@ -0,0 +1,235 @@
+import os
+import time
+import asyncio
+import inspect
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+from netmind.client import AsyncNetMind
+from netmind.scheduling import use_priority
+
+
+async def _call(client: AsyncNetMind, path: Tuple[str, ...], args: Tuple, kwargs: Dict[str, Any]) -> Any:
+    target: Any = client
+    for name in path:
+        target = getattr(target, name)
+    result = target(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class _Submitter:
+    """Stands for an attribute of the background `AsyncNetMind`, calling it submits the call."""
+
+    def __init__(self, bridge: "BackgroundNetMind", path: Tuple[str, ...]):
+        self._bridge = bridge
+        self._path = path
+
+    def __getattr__(self, name: str) -> "_Submitter":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Submitter(self._bridge, self._path + (name,))
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Future:
+        return self._bridge.submit(self._path, *args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<{type(self._bridge).__name__}.{'.'.join(self._path)}>"
+
+
+class BackgroundNetMind:
+    """A blocking-code front for `AsyncNetMind`, running it on an event loop in a background thread.
+
+    Calls such as ``client.chat.completions.create(...)`` return at once with a
+    `concurrent.futures.Future`, so a sync application can keep hundreds of requests in
+    flight on one connection pool and one thread. Keyword arguments build the `AsyncNetMind`,
+    or an existing one is given as `client`, and method names are those of `AsyncNetMind`
+    (e.g. ``code_interpreter.arun``). `use_deadline` and `use_priority` blocks around a call
+    apply to it. The loop starts on the first call, `close` stops it.
+    """
+
+    def __init__(self, client: Optional[AsyncNetMind] = None, **kwargs: Any):
+        self.client = client if client is not None else AsyncNetMind(**kwargs)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._pid = os.getpid()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"client": self.client}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    def __enter__(self) -> "BackgroundNetMind":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _running_loop(self) -> asyncio.AbstractEventLoop:
+        # called with the lock held, so `close` cannot stop the loop before the call is scheduled on it
+        if self._closed:
+            raise RuntimeError(f"Cannot submit calls to a closed {type(self).__name__}")
+        if self._pid != os.getpid():
+            # the loop thread of the parent does not exist in a forked child
+            self._loop, self._thread, self._pid = None, None, os.getpid()
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name="netmind-loop", daemon=True)
+            self._thread.start()
+            self._loop = loop
+        return self._loop
+
+    def submit(self, path: Tuple[str, ...], *args: Any, **kwargs: Any) -> Future:
+        """Call the `AsyncNetMind` attribute at `path` on the loop, e.g. ``("embeddings", "create")``.
+
+        Cancelling the returned future cancels the call, submitting after `close` raises `RuntimeError`.
+        """
+        with self._lock:
+            loop = self._running_loop()
+            # the task runs in a copy of the caller's context, deadlines and priorities included
+            return asyncio.run_coroutine_threadsafe(_call(self.client, path, args, kwargs), loop)
+
+    @staticmethod
+    def priority(priority: str):
+        """Context manager submitting the calls made inside it at `priority`, see `PriorityScheduler`."""
+        return use_priority(priority)
+
+    @property
+    def chat(self) -> Any:
+        return _Submitter(self, ("chat",))
+
+    @property
+    def embeddings(self) -> Any:
+        return _Submitter(self, ("embeddings",))
+
+    @property
+    def files(self) -> Any:
+        return _Submitter(self, ("files",))
+
+    @property
+    def parse_pro(self) -> Any:
+        return _Submitter(self, ("parse_pro",))
+
+    @property
+    def code_interpreter(self) -> Any:
+        return _Submitter(self, ("code_interpreter",))
+
+    def map(
+            self,
+            fn: Callable[..., Future],
+            *iterables: Iterable[Any],
+            timeout: Optional[float] = None,
+            limit: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """Like `Executor.map`, yield the results of `fn(*args)` in order, `fn` submitting a call.
+
+        At most `limit` calls are in flight, all of them at once if it is None. `timeout`
+        bounds the whole iteration, raising `TimeoutError`, and the calls still pending when
+        it stops are cancelled.
+        """
+        window = _Window(fn, zip(*iterables), limit)
+        end = None if timeout is None else time.monotonic() + timeout
+
+        def results() -> Iterator[Any]:
+            try:
+                while window.pending:
+                    _, future = window.pending[0]
+                    left = None if end is None else max(0.0, end - time.monotonic())
+                    # the builtin `TimeoutError`, as in `as_completed`: `concurrent.futures` only aliases it from 3.11
+                    if not wait([future], left).done:
+                        raise TimeoutError(f"{len(window.pending)} calls did not finish in time")
+                    window.pending.popleft()
+                    yield future.result()
+                    window.fill()
+            finally:
+                window.cancel()
+
+        return results()
+
+    def as_completed(
+            self,
+            fn: Callable[..., Future],
+            *iterables: Iterable[Any],
+            timeout: Optional[float] = None,
+            limit: Optional[int] = None,
+    ) -> Iterator[Tuple[Any, Future]]:
+        """Yield `(item, future)` pairs as the calls `fn(*args)` finish, in completion order.
+
+        `item` is the element of the single iterable, or the tuple of elements of several.
+        `limit` and `timeout` behave as in `map`, a timeout raising `TimeoutError`.
+        """
+        window = _Window(fn, zip(*iterables), limit)
+        end = None if timeout is None else time.monotonic() + timeout
+        single = len(iterables) == 1
+
+        def completed() -> Iterator[Tuple[Any, Future]]:
+            try:
+                while window.pending:
+                    left = None if end is None else max(0.0, end - time.monotonic())
+                    done, _ = wait([future for _, future in window.pending], left, FIRST_COMPLETED)
+                    if not done:
+                        raise TimeoutError(f"{len(window.pending)} calls did not finish in time")
+                    finished = [entry for entry in window.pending if entry[1] in done]
+                    window.pending = deque(entry for entry in window.pending if entry[1] not in done)
+                    window.fill()
+                    for args, future in finished:
+                        yield (args[0] if single else args), future
+            finally:
+                window.cancel()
+
+        return completed()
+
+    def close(self) -> None:
+        """Cancel the calls still running, close the connection pools of the client and stop the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+            self._closed = True
+        if loop is None or self._pid != os.getpid():
+            return
+        asyncio.run_coroutine_threadsafe(self._aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    async def _aclose(self) -> None:
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for name in ("_openai_client", "_inference_client"):
+            openai_client = self.client.__dict__.pop(name, None)
+            if openai_client is not None:
+                await openai_client.close()
+        # resources are bound to the closed clients
+        for name in ("chat", "embeddings", "files", "parse_pro", "code_interpreter"):
+            self.client.__dict__.pop(name, None)
+
+
+class _Window:
+    """The calls of `map` and `as_completed` in flight, refilled from `args` up to `limit`."""
+
+    def __init__(self, fn: Callable[..., Future], args: Iterator[Tuple], limit: Optional[int]):
+        self.fn = fn
+        self.args = args
+        self.limit = limit
+        self.pending: Deque[Tuple[Tuple, Future]] = deque()
+        # submitted right away, as `Executor.map` does
+        self.fill()
+
+    def fill(self) -> None:
+        while self.limit is None or len(self.pending) < self.limit:
+            args = next(self.args, None)
+            if args is None:
+                return
+            self.pending.append((args, self.fn(*args)))
+
+    def cancel(self) -> None:
+        for _, future in self.pending:
+            future.cancel()
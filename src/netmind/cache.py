@@ -0,0 +1,227 @@
+import os
+import time
+import zlib
+import struct
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+_HEADER = struct.Struct("<d")  # expiry timestamp, 0 when the entry never expires
+_SUFFIX = ".z"
+
+
+class Cache(ABC):
+    """A bytes store used to keep results of idempotent API calls."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+def _expiry(ttl: Optional[float]) -> float:
+    return time.time() + ttl if ttl else 0.0
+
+
+class MemoryCache(Cache):
+    """An in-process LRU cache bounded by the total size of its values."""
+
+    def __init__(self, max_size: int = 256 * 1024 * 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __getstate__(self):
+        # entries stay with the process that cached them
+        return {"max_size": self.max_size, "ttl": self.ttl}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires and expires < time.time():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (_expiry(self.ttl if ttl is None else ttl), value)
+            self._size += len(value)
+            while self._size > self.max_size:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class DiskCache(Cache):
+    """A zlib-compressed on-disk cache, evicting least recently used entries past `max_size` bytes.
+
+    Every entry is one file under `directory`, written atomically, so several processes can
+    share the same directory. `max_size` accounts for the compressed size of the entries.
+    """
+
+    def __init__(
+            self,
+            directory: str | os.PathLike,
+            max_size: int = 1024 * 1024 * 1024,
+            ttl: Optional[float] = None,
+            compress_level: int = 6,
+    ):
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.compress_level = compress_level
+        os.makedirs(self.directory, exist_ok=True)
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {
+            "directory": self.directory, "max_size": self.max_size,
+            "ttl": self.ttl, "compress_level": self.compress_level,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + _SUFFIX)
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._current_size()
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._entries())
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            (expires,) = _HEADER.unpack_from(data)
+            value = None if expires and expires < time.time() else zlib.decompress(memoryview(data)[_HEADER.size:])
+        except (struct.error, zlib.error):
+            # a truncated or corrupt entry is a miss
+            value = None
+        if value is None:
+            self.delete(key)
+            return None
+        try:
+            # the modification time orders entries for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        data = _HEADER.pack(_expiry(self.ttl if ttl is None else ttl)) + zlib.compress(value, self.compress_level)
+        if len(data) > self.max_size:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        with self._lock:
+            size = self._current_size()
+            try:
+                size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp, path)
+            self._size = size + len(data)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        for path, _, entry_size in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        self._size = size
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                return
+            if self._size is not None:
+                self._size -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
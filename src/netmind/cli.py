@@ -0,0 +1,380 @@
+"""The `netmind` command line, moving whole directories of documents through the API.
+
+    netmind files upload ./data --purpose batch --output uploads.jsonl
+    netmind files ls --purpose batch
+    netmind files rm --purpose batch --yes
+    netmind parse "./docs/**/*.pdf" --format json --output-dir ./parsed
+    netmind embed texts.jsonl --model nvidia/NV-Embed-v2 --output vectors.jsonl
+
+Requests run concurrently on `AsyncNetMind`. Jobs writing to `--output` or `--output-dir`
+resume where they stopped: items already present in the output are skipped.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from netmind._compression import COMPRESSIONS
+from netmind.client import AsyncNetMind
+from netmind.concurrency import AdaptiveConcurrency
+from netmind.exceptions import NetMindError
+from netmind.resources.parse_pro import is_url
+from netmind.types.files import FilePurpose
+from netmind.types.parse_pro import Formt
+
+T = TypeVar("T")
+
+
+class Progress:
+    """A one-line progress report on stderr, redrawn at most every `interval` seconds."""
+
+    def __init__(self, label: str, total: Optional[int] = None, enabled: bool = True, interval: float = 0.2):
+        self.label = label
+        self.total = total
+        self.enabled = enabled
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self._start = time.monotonic()
+        self._drawn = 0.0
+
+    def advance(self, count: int = 1, ok: bool = True) -> None:
+        if ok:
+            self.done += count
+        else:
+            self.failed += count
+        self._render()
+
+    def _line(self) -> str:
+        elapsed = time.monotonic() - self._start
+        total = f"/{self.total}" if self.total is not None else ""
+        rate = self.done / elapsed if elapsed else 0.0
+        return f"{self.label}: {self.done}{total} done, {self.failed} failed, {rate:.1f}/s"
+
+    def _render(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if self.enabled and (force or now - self._drawn >= self.interval):
+            self._drawn = now
+            sys.stderr.write("\r" + self._line())
+            sys.stderr.flush()
+
+    def close(self) -> None:
+        if self.enabled:
+            self._render(force=True)
+            sys.stderr.write("\n")
+            sys.stderr.flush()
+
+
+async def run_bounded(items: Iterable[T], worker: Callable[[T], Awaitable[None]], concurrency: int) -> None:
+    """Run `worker` over `items` with at most `concurrency` calls in flight, pulling items lazily."""
+    iterator = iter(items)
+
+    async def drain() -> None:
+        for item in iterator:
+            await worker(item)
+
+    await asyncio.gather(*(drain() for _ in range(max(1, concurrency))))
+
+
+def _report_error(item: Any, error: BaseException) -> None:
+    sys.stderr.write(f"\nerror: {item}: {error}\n")
+
+
+def _open_output(path: Optional[str], key: str) -> Tuple[IO[str], Set[Any]]:
+    """Open a JSONL output for appending and return the `key` of every record it already holds.
+
+    A last line cut short by an interrupted run is dropped first.
+    """
+    if path is None or path == "-":
+        return sys.stdout, set()
+    done: Set[Any] = set()
+    if os.path.exists(path):
+        with open(path, "rb+") as f:
+            end = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                end += len(line)
+                try:
+                    done.add(json.loads(line)[key])
+                except (ValueError, KeyError, TypeError):
+                    pass
+            f.truncate(end)
+    return open(path, "a", encoding="utf-8"), done
+
+
+def _write_record(out: IO[str], record: dict) -> None:
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def _has_magic(pattern: str) -> bool:
+    return any(char in pattern for char in "*?[")
+
+
+def expand_sources(sources: List[str], pattern: str = "*", allow_urls: bool = False) -> Iterator[Tuple[str, str]]:
+    """Yield `(source, name)` for every file under `sources`, `name` being its path relative to the argument."""
+    for source in sources:
+        if allow_urls and is_url(source):
+            digest = hashlib.sha256(source.encode()).hexdigest()[:12]
+            stem = Path(source.split("?", 1)[0].rstrip("/")).name or "document"
+            yield source, f"{stem}-{digest}"
+        elif os.path.isdir(source):
+            for path in sorted(Path(source).rglob(pattern)):
+                if path.is_file():
+                    yield str(path), str(path.relative_to(source))
+        elif _has_magic(source):
+            parts = Path(source).parts
+            index = next(i for i, part in enumerate(parts) if _has_magic(part))
+            root = os.path.join(*parts[:index]) if index else "."
+            for path in sorted(glob.glob(source, recursive=True)):
+                if os.path.isfile(path):
+                    yield path, os.path.relpath(path, root)
+        elif os.path.isfile(source):
+            yield source, Path(source).name
+        else:
+            raise NetMindError(f"No such file or directory: {source}")
+
+
+async def files_upload(client: AsyncNetMind, args: argparse.Namespace) -> int:
+    paths = [os.path.abspath(path) for path, _ in expand_sources(args.paths, args.pattern)]
+    out, done = _open_output(args.output, "path")
+    todo = [path for path in paths if path not in done]
+    progress = Progress("upload", len(todo), enabled=not args.quiet)
+
+    async def upload(path: str) -> None:
+        try:
+            result = await client.files.create(
+                path, purpose=args.purpose, compression=args.compression, validate=args.validate
+            )
+        except Exception as e:
+            _report_error(path, e)
+            progress.advance(ok=False)
+            return
+        _write_record(out, {"path": path, **result.model_dump()})
+        progress.advance()
+
+    try:
+        await run_bounded(todo, upload, args.concurrency)
+    finally:
+        progress.close()
+        if out is not sys.stdout:
+            out.close()
+    return 1 if progress.failed else 0
+
+
+async def files_ls(client: AsyncNetMind, args: argparse.Namespace) -> int:
+    for file in await client.files.list():
+        if args.purpose is None or getattr(file.purpose, "value", file.purpose) == args.purpose:
+            sys.stdout.write(file.model_dump_json(warnings=False) + "\n")
+    return 0
+
+
+async def files_rm(client: AsyncNetMind, args: argparse.Namespace) -> int:
+    ids = list(args.ids)
+    if args.purpose is not None:
+        ids.extend(
+            file.id for file in await client.files.list()
+            if getattr(file.purpose, "value", file.purpose) == args.purpose
+        )
+        if not args.yes:
+            sys.stderr.write(f"{len(ids)} files would be deleted, pass --yes to delete them\n")
+            return 1
+    progress = Progress("rm", len(ids), enabled=not args.quiet)
+
+    async def remove(file_id: str) -> None:
+        try:
+            await client.files.delete(file_id)
+        except Exception as e:
+            _report_error(file_id, e)
+            progress.advance(ok=False)
+            return
+        progress.advance()
+
+    try:
+        await run_bounded(ids, remove, args.concurrency)
+    finally:
+        progress.close()
+    return 1 if progress.failed else 0
+
+
+async def parse(client: AsyncNetMind, args: argparse.Namespace) -> int:
+    suffix = ".jsonl" if args.format == Formt.json.value else ".md"
+    jobs = [
+        (source, os.path.join(args.output_dir, name + suffix))
+        for source, name in expand_sources(args.sources, args.pattern, allow_urls=True)
+    ]
+    todo = [(source, target) for source, target in jobs if args.overwrite or not os.path.exists(target)]
+    progress = Progress("parse", len(todo), enabled=not args.quiet)
+
+    async def parse_one(job: Tuple[str, str]) -> None:
+        source, target = job
+        partial = target + ".part"
+        try:
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            if args.format == Formt.json.value:
+                # blocks are streamed to disk as the response is read
+                await client.parse_pro.parse_to_jsonl(source, partial, timeout=args.timeout, mode=args.mode)
+            else:
+                text = await client.parse_pro.parse(source, format=Formt.markdown, timeout=args.timeout, mode=args.mode)
+                with open(partial, "w", encoding="utf-8") as f:
+                    f.write(text)
+            os.replace(partial, target)
+        except Exception as e:
+            _report_error(source, e)
+            progress.advance(ok=False)
+            return
+        progress.advance()
+
+    try:
+        await run_bounded(todo, parse_one, args.concurrency)
+    finally:
+        progress.close()
+    return 1 if progress.failed else 0
+
+
+def _embedding_batches(
+        path: str, field: str, batch_size: int, done: Set[int], progress: Progress
+) -> Iterator[Tuple[List[int], List[str]]]:
+    lines: List[int] = []
+    texts: List[str] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if number in done or not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                text = record if isinstance(record, str) else record[field]
+                if not isinstance(text, str):
+                    raise TypeError(f"`{field}` must be a string")
+            except (ValueError, KeyError, TypeError) as e:
+                _report_error(f"{path}:{number}", e)
+                progress.advance(ok=False)
+                continue
+            lines.append(number)
+            texts.append(text)
+            if len(texts) >= batch_size:
+                yield lines, texts
+                lines, texts = [], []
+    if texts:
+        yield lines, texts
+
+
+async def embed(client: AsyncNetMind, args: argparse.Namespace) -> int:
+    out, done = _open_output(args.output, "line")
+    progress = Progress("embed", enabled=not args.quiet)
+    options = {"dimensions": args.dimensions} if args.dimensions else {}
+
+    async def embed_batch(batch: Tuple[List[int], List[str]]) -> None:
+        lines, texts = batch
+        try:
+            response = await client.embeddings.create(model=args.model, input=texts, **options)
+        except Exception as e:
+            _report_error(f"{args.input}:{lines[0]}-{lines[-1]}", e)
+            progress.advance(len(lines), ok=False)
+            return
+        for item in sorted(response.data, key=lambda d: d.index):
+            _write_record(out, {"line": lines[item.index], "embedding": item.embedding})
+        progress.advance(len(lines))
+
+    try:
+        batches = _embedding_batches(args.input, args.field, args.batch_size, done, progress)
+        await run_bounded(batches, embed_batch, args.concurrency)
+    finally:
+        progress.close()
+        if out is not sys.stdout:
+            out.close()
+    return 1 if progress.failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="netmind", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--api-key", default=None, help="defaults to $NETMIND_API_KEY")
+    parser.add_argument("--base-url", default=None, help="defaults to $NETMIND_BASE_URL")
+    parser.add_argument("--max-retries", type=int, default=2)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-c", "--concurrency", type=int, default=8, help="requests in flight (default: 8)")
+    common.add_argument(
+        "--adaptive", action="store_true",
+        help="adapt the number of requests in flight to the service, up to --concurrency",
+    )
+    common.add_argument("-q", "--quiet", action="store_true", help="do not report progress on stderr")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    files = commands.add_parser("files", help="manage uploaded files")
+    files_commands = files.add_subparsers(dest="files_command", required=True)
+
+    upload = files_commands.add_parser("upload", parents=[common], help="upload files or directories")
+    upload.add_argument("paths", nargs="+", help="files, directories or glob patterns")
+    upload.add_argument("--pattern", default="*", help="files to pick inside directories (default: *)")
+    upload.add_argument("--purpose", default=FilePurpose.inference.value, choices=[p.value for p in FilePurpose])
+    upload.add_argument("--compression", default=None, choices=COMPRESSIONS)
+    upload.add_argument("--validate", action="store_true", help="validate fine-tune and batch JSONL first")
+    upload.add_argument("-o", "--output", default=None, help="JSONL of uploaded files, makes the job resumable")
+    upload.set_defaults(handler=files_upload)
+
+    ls = files_commands.add_parser("ls", help="list files")
+    ls.add_argument("--purpose", default=None, choices=[p.value for p in FilePurpose])
+    ls.set_defaults(handler=files_ls)
+
+    rm = files_commands.add_parser("rm", parents=[common], help="delete files")
+    rm.add_argument("ids", nargs="*", help="file ids")
+    rm.add_argument("--purpose", default=None, choices=[p.value for p in FilePurpose],
+                    help="delete every file of this purpose")
+    rm.add_argument("-y", "--yes", action="store_true", help="confirm deleting by --purpose")
+    rm.set_defaults(handler=files_rm)
+
+    parse_cmd = commands.add_parser("parse", parents=[common], help="parse documents with ParsePro")
+    parse_cmd.add_argument("sources", nargs="+", help="files, directories, glob patterns or urls")
+    parse_cmd.add_argument("--pattern", default="*", help="files to pick inside directories (default: *)")
+    parse_cmd.add_argument("-f", "--format", default=Formt.json.value, choices=[f.value for f in Formt])
+    parse_cmd.add_argument("--mode", default=None)
+    parse_cmd.add_argument("--timeout", type=float, default=5 * 60)
+    parse_cmd.add_argument("-o", "--output-dir", required=True, help="one .jsonl or .md file per document")
+    parse_cmd.add_argument("--overwrite", action="store_true", help="parse documents already in --output-dir")
+    parse_cmd.set_defaults(handler=parse)
+
+    embed_cmd = commands.add_parser("embed", parents=[common], help="embed the lines of a JSONL file")
+    embed_cmd.add_argument("input", help="JSONL of strings or of objects holding --field")
+    embed_cmd.add_argument("-m", "--model", required=True)
+    embed_cmd.add_argument("--field", default="text")
+    embed_cmd.add_argument("--dimensions", type=int, default=None)
+    embed_cmd.add_argument("-b", "--batch-size", type=int, default=64)
+    embed_cmd.add_argument("-o", "--output", default=None, help="JSONL of {line, embedding}, makes the job resumable")
+    embed_cmd.set_defaults(handler=embed)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    concurrency = getattr(args, "concurrency", None)
+    try:
+        client = AsyncNetMind(
+            api_key=args.api_key,
+            base_url=args.base_url,
+            max_retries=args.max_retries,
+            concurrency=AdaptiveConcurrency(max_limit=concurrency) if getattr(args, "adaptive", False) else None,
+        )
+        if getattr(args, "adaptive", False):
+            # the limiters, not the worker count, decide how many requests are in flight
+            args.concurrency = concurrency * 4
+        return asyncio.run(args.handler(client, args))
+    except NetMindError as e:
+        sys.stderr.write(f"error: {e}\n")
+        return 2
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
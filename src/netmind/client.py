@@ -1,8 +1,22 @@
 import os
+import weakref
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 from functools import cached_property
-from openai import OpenAI, AsyncOpenAI
 
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+from openai._constants import DEFAULT_CONNECTION_LIMITS
+
+from netmind.cache import Cache
+from netmind.images import ImageProcessor
+from netmind.concurrency import AdaptiveConcurrency
+from netmind.scheduling import PriorityScheduler, use_priority
+from netmind._compression import check_compression
+from netmind._openai import DEFAULT_COMPRESSION_THRESHOLD, NetMindOpenAI, AsyncNetMindOpenAI
+from netmind._transport import AdaptiveConcurrencyTransport, PriorityTransport
 from netmind.exceptions import NetMindError
+from netmind.journal import TaskJournal
 from netmind.constants import BASE_URL
 from netmind.types import NetMindClient
 from netmind.resources import (
@@ -13,13 +27,107 @@ from netmind.resources import (
     CodeInterpreter, AsyncCodeInterpreter
 )
 
+# instances whose transports are dropped in forked children
+_instances: "weakref.WeakSet" = weakref.WeakSet()
+# transports inherited from the parent, kept referenced so their finalizers never run in
+# the child and close sockets the parent is still using
+_inherited: List[Any] = []
+_shared: Dict[Tuple, Any] = {}
+_shared_lock = threading.Lock()
+
+# attributes holding live connections, rebuilt lazily on first use
+_TRANSPORT_ATTRIBUTES = (
+    "_openai_client", "_inference_client",
+    "chat", "embeddings", "files", "parse_pro", "code_interpreter",
+)
+# client options holding live connections, left out of the pickled configuration
+_LIVE_OPTIONS = ("http_client",)
+
+
+def _hashable(value: Any) -> Any:
+    if isinstance(value, dict):
+        items = ((key, _hashable(item)) for key, item in value.items())
+        return tuple(sorted(items, key=lambda item: repr(item[0])))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _reset_after_fork() -> None:
+    for instance in list(_instances):
+        instance._reset_transports()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class _ProcessSafeClient:
+    """Fork and pickle support shared by `NetMind` and `AsyncNetMind`.
+
+    Connection pools are built on first use. A forked child drops the ones inherited from
+    its parent and builds its own, and pickling only carries the configuration (a custom
+    `http_client` is left out), so a client can be handed to `multiprocessing` or
+    `ProcessPoolExecutor` workers.
+    """
+
+    def _track(self) -> None:
+        _instances.add(self)
+
+    def _reset_transports(self) -> None:
+        for name in _TRANSPORT_ATTRIBUTES:
+            transport = self.__dict__.pop(name, None)
+            if transport is not None:
+                _inherited.append(transport)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "api_key": self.client.api_key,
+            "base_url": self.client.base_url,
+            "parse_cache": self.parse_cache,
+            "parse_journal": self.parse_journal,
+            "code_cache": self.code_cache,
+            "image_processor": self.image_processor,
+            "request_compression": self.request_compression,
+            "compression_threshold": self.compression_threshold,
+            "lean_responses": self.lean_responses,
+            **{k: v for k, v in self.client.kwargs.items() if k not in _LIVE_OPTIONS},
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    @classmethod
+    def shared(cls, **kwargs):
+        """Return the instance of this process built with `kwargs`, creating it on first use.
+
+        Lets every task of a process pool reuse one client instead of building its own.
+        """
+        key = (cls, os.getpid(), _hashable(kwargs))
+        with _shared_lock:
+            instance = _shared.get(key)
+            if instance is None:
+                instance = _shared[key] = cls(**kwargs)
+        return instance
 
-class NetMind:
+
+class NetMind(_ProcessSafeClient):
     def __init__(
             self,
             *,
             api_key: str | None = None,
             base_url: str | None = None,
+            parse_cache: Optional[Cache] = None,
+            parse_journal: Optional[TaskJournal] = None,
+            code_cache: Optional[Cache] = None,
+            image_processor: Optional[ImageProcessor] = None,
+            request_compression: Optional[str] = None,
+            compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+            lean_responses: bool = False,
             **kwargs,
     ):
 
@@ -48,24 +156,49 @@ class NetMind:
         else:
             base_url = base_url
 
+        self.parse_cache = parse_cache
+        self.parse_journal = parse_journal
+        self.code_cache = code_cache
+        self.image_processor = image_processor
+        self.request_compression = check_compression(request_compression)
+        self.compression_threshold = compression_threshold
+        self.lean_responses = lean_responses
+
         self.client = NetMindClient(
             api_key=api_key,
             base_url=base_url,
             **kwargs,
         )
 
-        self._openai_client: OpenAI = OpenAI(
-            api_key=api_key,
-            base_url=base_url, **kwargs
+        self._inference_url = inference_url
+        self._track()
+
+    @property
+    def _openai_kwargs(self) -> Dict[str, Any]:
+        # `version` is only meaningful to NetMindClient
+        return {
+            **{k: v for k, v in self.client.kwargs.items() if k != "version"},
+            "request_compression": self.request_compression,
+            "compression_threshold": self.compression_threshold,
+        }
+
+    @cached_property
+    def _openai_client(self) -> OpenAI:
+        return NetMindOpenAI(
+            api_key=self.client.api_key,
+            base_url=self.client.base_url, **self._openai_kwargs
         )
-        self._inference_client: OpenAI = OpenAI(
-            api_key=api_key,
-            base_url=inference_url, **kwargs
+
+    @cached_property
+    def _inference_client(self) -> OpenAI:
+        return NetMindOpenAI(
+            api_key=self.client.api_key,
+            base_url=self._inference_url, **self._openai_kwargs
         )
 
     @cached_property
     def chat(self):
-        return Chat(self._inference_client)
+        return Chat(self._inference_client, self.image_processor)
 
     @cached_property
     def embeddings(self):
@@ -73,7 +206,7 @@ class NetMind:
 
     @cached_property
     def files(self):
-        return Files(self._openai_client)
+        return Files(self._openai_client, lean=self.lean_responses)
 
     @cached_property
     def parse_pro(self):
@@ -81,15 +214,24 @@ class NetMind:
 
     @cached_property
     def code_interpreter(self):
-        return CodeInterpreter(self._openai_client)
+        return CodeInterpreter(self._openai_client, lean=self.lean_responses, cache=self.code_cache)
 
 
-class AsyncNetMind:
+class AsyncNetMind(_ProcessSafeClient):
     def __init__(
             self,
             *,
             api_key: str | None = None,
             base_url: str | None = None,
+            parse_cache: Optional[Cache] = None,
+            parse_journal: Optional[TaskJournal] = None,
+            code_cache: Optional[Cache] = None,
+            image_processor: Optional[ImageProcessor] = None,
+            request_compression: Optional[str] = None,
+            compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+            lean_responses: bool = False,
+            concurrency: Optional[AdaptiveConcurrency] = None,
+            scheduler: Optional[PriorityScheduler] = None,
             **kwargs,
     ):
 
@@ -120,25 +262,70 @@ class AsyncNetMind:
         else:
             base_url = base_url
 
+        self.parse_cache = parse_cache
+        self.parse_journal = parse_journal
+        self.code_cache = code_cache
+        self.image_processor = image_processor
+        self.request_compression = check_compression(request_compression)
+        self.compression_threshold = compression_threshold
+        self.lean_responses = lean_responses
+        self.concurrency = concurrency
+        self.scheduler = scheduler
+        if (concurrency is not None or scheduler is not None) and "http_client" in kwargs:
+            raise NetMindError("`concurrency` and `scheduler` cannot be combined with a custom `http_client`")
+
         self.client = NetMindClient(
             api_key=api_key,
             base_url=base_url,
             **kwargs,
         )
 
-        self._openai_client: AsyncOpenAI = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url, **kwargs
+        self._inference_url = inference_url
+        self._track()
+
+    @property
+    def _openai_kwargs(self) -> Dict[str, Any]:
+        # `version` is only meaningful to NetMindClient
+        kwargs = {
+            **{k: v for k, v in self.client.kwargs.items() if k != "version"},
+            "request_compression": self.request_compression,
+            "compression_threshold": self.compression_threshold,
+        }
+        if self.concurrency is not None or self.scheduler is not None:
+            transport = httpx.AsyncHTTPTransport(limits=DEFAULT_CONNECTION_LIMITS)
+            if self.concurrency is not None:
+                transport = AdaptiveConcurrencyTransport(transport, self.concurrency)
+            if self.scheduler is not None:
+                # outermost, so requests wait in priority order rather than in arrival order
+                transport = PriorityTransport(transport, self.scheduler)
+            kwargs["http_client"] = DefaultAsyncHttpxClient(transport=transport)
+        return kwargs
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {**super().__getstate__(), "concurrency": self.concurrency, "scheduler": self.scheduler}
+
+    @staticmethod
+    def priority(priority: str):
+        """Context manager running the requests made inside it at `priority`, see `PriorityScheduler`."""
+        return use_priority(priority)
+
+    @cached_property
+    def _openai_client(self) -> AsyncOpenAI:
+        return AsyncNetMindOpenAI(
+            api_key=self.client.api_key,
+            base_url=self.client.base_url, **self._openai_kwargs
         )
 
-        self._inference_client: AsyncOpenAI = AsyncOpenAI(
-            api_key=api_key,
-            base_url=inference_url, **kwargs
+    @cached_property
+    def _inference_client(self) -> AsyncOpenAI:
+        return AsyncNetMindOpenAI(
+            api_key=self.client.api_key,
+            base_url=self._inference_url, **self._openai_kwargs
         )
 
     @cached_property
     def chat(self):
-        return AsyncChat(self._inference_client)
+        return AsyncChat(self._inference_client, self.image_processor)
 
     @cached_property
     def embeddings(self):
@@ -146,7 +333,7 @@ class AsyncNetMind:
 
     @cached_property
     def files(self):
-        return AsyncFiles(self._openai_client)
+        return AsyncFiles(self._openai_client, lean=self.lean_responses)
 
     @cached_property
     def parse_pro(self):
@@ -154,4 +341,4 @@ class AsyncNetMind:
 
     @cached_property
     def code_interpreter(self):
-        return AsyncCodeInterpreter(self._openai_client)
\ No newline at end of file
+        return AsyncCodeInterpreter(self._openai_client, lean=self.lean_responses, cache=self.code_cache)
\ No newline at end of file
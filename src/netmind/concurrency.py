@@ -0,0 +1,193 @@
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from netmind.types.concurrency import ConcurrencyMetrics
+
+# endpoint families, each with its own limiter
+CHAT = "chat"
+EMBEDDINGS = "embeddings"
+PARSE = "parse"
+CODE_INTERPRETER = "code_interpreter"
+FILES = "files"
+FAMILIES = (CHAT, EMBEDDINGS, PARSE, CODE_INTERPRETER, FILES)
+
+# outcomes of a request, as fed back to its limiter
+OK = "ok"
+THROTTLED = "throttled"
+FAILED = "failed"
+NEUTRAL = "neutral"
+
+# parse and transfer latencies grow with the document, they say nothing about load
+_DEFAULT_OVERRIDES: Dict[str, Dict[str, Any]] = {
+    PARSE: {"latency_tolerance": None},
+    FILES: {"latency_tolerance": None},
+}
+
+
+class AIMDLimiter:
+    """An additive-increase / multiplicative-decrease limit on requests in flight.
+
+    Every healthy response grows the limit by `increase / limit`, so about `increase` per
+    round of `limit` requests. A 429, a 5xx, a transport error or a response slower than
+    `latency_tolerance` times the baseline latency multiplies it by `decrease`, at most
+    once per round: responses to requests sent before the last cut are not counted again.
+    """
+
+    def __init__(
+            self,
+            family: str,
+            *,
+            initial_limit: float = 8,
+            min_limit: float = 1,
+            max_limit: float = 128,
+            increase: float = 1.0,
+            decrease: float = 0.5,
+            latency_tolerance: Optional[float] = 3.0,
+            smoothing: float = 0.1,
+            warmup: int = 10,
+    ):
+        self.family = family
+        self.limit = float(min(initial_limit, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.warmup = warmup
+        self.in_flight = 0
+        self.successes = 0
+        self.throttled = 0
+        self.failures = 0
+        self.slowdowns = 0
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self._last_cut = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def capacity(self) -> int:
+        return max(int(self.limit), int(self.min_limit), 1)
+
+    async def acquire(self) -> float:
+        """Wait for a slot, returns the monotonic time the request was let through."""
+        if not self._waiters and self.in_flight < self.capacity:
+            self.in_flight += 1
+            return time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just before the cancellation
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+        return time.monotonic()
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # the slot is taken on behalf of the waiter
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def record(self, started: float, latency: Optional[float], outcome: str) -> None:
+        if outcome == OK:
+            self.successes += 1
+            if latency is not None and self._is_slow(latency):
+                self.slowdowns += 1
+                self._cut(started)
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                self._wake()
+            if latency is not None:
+                self._observe(latency)
+        elif outcome == THROTTLED:
+            self.throttled += 1
+            self._cut(started)
+        elif outcome == FAILED:
+            self.failures += 1
+            self._cut(started)
+
+    def _is_slow(self, latency: float) -> bool:
+        return (
+            self.latency_tolerance is not None
+            and self.baseline is not None
+            and self.successes > self.warmup
+            and latency > self.latency_tolerance * self.baseline
+        )
+
+    def _observe(self, latency: float) -> None:
+        self.latency = latency if self.latency is None else self.latency + self.smoothing * (latency - self.latency)
+        if self.baseline is None or self.latency < self.baseline:
+            self.baseline = self.latency
+        else:
+            # follow lasting changes of the service time slowly
+            self.baseline += self.smoothing * 0.1 * (self.latency - self.baseline)
+
+    def _cut(self, started: float) -> None:
+        if started < self._last_cut:
+            return
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self._last_cut = time.monotonic()
+
+    def metrics(self) -> ConcurrencyMetrics:
+        return ConcurrencyMetrics(
+            family=self.family,
+            limit=self.capacity,
+            in_flight=self.in_flight,
+            waiting=len(self._waiters),
+            successes=self.successes,
+            throttled=self.throttled,
+            failures=self.failures,
+            slowdowns=self.slowdowns,
+            latency_ms=None if self.latency is None else round(self.latency * 1000, 3),
+            baseline_latency_ms=None if self.baseline is None else round(self.baseline * 1000, 3),
+        )
+
+
+class AdaptiveConcurrency:
+    """Adaptive concurrency limits for `AsyncNetMind`, one `AIMDLimiter` per endpoint family.
+
+    Keyword arguments configure every limiter, `families` overrides them per family, e.g.
+    ``AdaptiveConcurrency(max_limit=64, families={"embeddings": {"initial_limit": 32}})``.
+    """
+
+    def __init__(self, *, families: Optional[Dict[str, Dict[str, Any]]] = None, **options: Any):
+        self.options = options
+        self.families = families or {}
+        self._limiters: Dict[str, AIMDLimiter] = {}
+        self._pid = os.getpid()
+
+    def __getstate__(self):
+        return {"families": self.families, "options": self.options}
+
+    def __setstate__(self, state):
+        self.__init__(families=state["families"], **state["options"])
+
+    def limiter(self, family: str) -> AIMDLimiter:
+        if self._pid != os.getpid():
+            # slots held by the parent's requests at fork time are not ours to release
+            self._limiters, self._pid = {}, os.getpid()
+        limiter = self._limiters.get(family)
+        if limiter is None:
+            options = {**self.options, **_DEFAULT_OVERRIDES.get(family, {}), **self.families.get(family, {})}
+            limiter = self._limiters[family] = AIMDLimiter(family, **options)
+        return limiter
+
+    def metrics(self) -> Dict[str, ConcurrencyMetrics]:
+        return {family: limiter.metrics() for family, limiter in self._limiters.items()}
@@ -0,0 +1,193 @@
+import os
+import csv
+import json
+import time
+import threading
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from netmind.exceptions import NetMindError
+
+Source = Union[str, os.PathLike, Iterable[str]]
+
+# suffix of the bitmap recording the rows already written to a matrix
+CHECKPOINT_SUFFIX = ".done"
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as err:
+        raise NetMindError(
+            "Embedding into a matrix requires the `numpy` package, install it with `pip install 'netmind[index]'`"
+        ) from err
+    return numpy
+
+
+def _is_path(source: Source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def _jsonl_lines(path: str) -> Iterator[Tuple[int, bytes]]:
+    """Yield the numbered lines of a JSONL file that are not blank, read as bytes so counting them is cheap."""
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, start=1):
+            stripped = line.strip()
+            # unicode whitespace (e.g. U+3000) makes a blank line too
+            if stripped and (stripped.isascii() or stripped.decode("utf-8", "replace").strip()):
+                yield number, line
+
+
+def iter_texts(source: Source, field: str = "text") -> Iterator[str]:
+    """Yield the texts of a corpus, one per matrix row.
+
+    `source` is a JSONL file (lines holding a string, or an object with a `field` string;
+    blank lines are skipped), a CSV file with a `field` column, or an iterable of strings.
+    """
+    if not _is_path(source):
+        yield from source
+        return
+    path = os.fspath(source)
+    if path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames is None or field not in reader.fieldnames:
+                raise NetMindError(f"{path}: no `{field}` column")
+            for record in reader:
+                yield record[field]
+        return
+    for number, line in _jsonl_lines(path):
+        try:
+            record = json.loads(line)
+            text = record if isinstance(record, str) else record[field]
+        except (ValueError, KeyError, TypeError) as err:
+            raise NetMindError(f"{path}:{number}: expected a string or an object with a `{field}` string") from err
+        if not isinstance(text, str):
+            raise NetMindError(f"{path}:{number}: `{field}` must be a string")
+        yield text
+
+
+def count_rows(source: Source, field: str = "text") -> int:
+    if _is_path(source):
+        path = os.fspath(source)
+        if path.endswith(".csv"):
+            return sum(1 for _ in iter_texts(path, field))
+        return sum(1 for _ in _jsonl_lines(path))
+    if isinstance(source, Sequence):
+        return len(source)
+    raise NetMindError("The number of `rows` must be given when embedding an iterator")
+
+
+class EmbeddingMatrix:
+    """A preallocated, memory-mapped `.npy` matrix of float32 embeddings with a checkpoint.
+
+    Rows can be written in any order. The checkpoint is a bitmap of the finished rows, stored
+    next to the matrix (`<path>.done`) and rewritten atomically after the matrix is flushed,
+    so after a crash it never claims rows that did not reach the disk.
+    """
+
+    def __init__(
+            self,
+            path: Union[str, os.PathLike],
+            rows: int,
+            dim: Optional[int] = None,
+            checkpoint_interval: float = 10.0,
+    ):
+        self._np = _import_numpy()
+        self.path = os.fspath(path)
+        self.checkpoint_path = self.path + CHECKPOINT_SUFFIX
+        self.rows = rows
+        self.checkpoint_interval = checkpoint_interval
+        self._checkpointed = time.monotonic()
+        self._lock = threading.Lock()
+        self.vectors = None
+        self.done = self._np.zeros(rows, dtype=bool)
+        if os.path.exists(self.checkpoint_path):
+            self._resume()
+        elif os.path.exists(self.path):
+            raise NetMindError(f"{self.path} already exists without a checkpoint, remove it to embed again")
+        elif dim is not None:
+            self.allocate(dim)
+
+    def _resume(self) -> None:
+        np = self._np
+        self.vectors = np.load(self.path, mmap_mode="r+")
+        if self.vectors.ndim != 2 or self.vectors.shape[0] != self.rows:
+            raise NetMindError(
+                f"{self.path} has shape {self.vectors.shape}, it cannot hold the {self.rows} rows of this corpus"
+            )
+        with open(self.checkpoint_path, "rb") as f:
+            bits = np.load(f)
+        self.done = np.unpackbits(bits, count=self.rows).astype(bool)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self.vectors is None else self.vectors.shape[1]
+
+    @property
+    def completed(self) -> int:
+        return int(self.done.sum())
+
+    def allocate(self, dim: int) -> None:
+        np = self._np
+        # sparse on most filesystems, rows only take space once written
+        self.vectors = np.lib.format.open_memmap(self.path, mode="w+", dtype=np.float32, shape=(self.rows, dim))
+        self.checkpoint()
+
+    def write(self, rows: Sequence[int], vectors: Any) -> None:
+        np = self._np
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.vectors is None:
+            self.allocate(vectors.shape[1])
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size and rows[-1] - rows[0] + 1 == rows.size:
+            # contiguous rows, the common case, are a plain slice assignment
+            self.vectors[rows[0]:rows[-1] + 1] = vectors
+        else:
+            self.vectors[rows] = vectors
+        self.done[rows] = True
+
+    def checkpoint_due(self) -> bool:
+        """Whether `checkpoint_interval` has passed since the last checkpoint, claiming the next one."""
+        now = time.monotonic()
+        if now - self._checkpointed < self.checkpoint_interval:
+            return False
+        self._checkpointed = now
+        return True
+
+    def checkpoint(self) -> None:
+        """Flush the matrix, then atomically replace the bitmap of finished rows."""
+        if self.vectors is None:
+            return
+        with self._lock:
+            self._checkpointed = time.monotonic()
+            # rows finished while flushing are left for the next checkpoint
+            done = self.done.copy()
+            self.vectors.flush()
+            partial = self.checkpoint_path + ".part"
+            with open(partial, "wb") as f:
+                self._np.save(f, self._np.packbits(done))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(partial, self.checkpoint_path)
+
+    def pending(self, texts: Iterable[str], batch_size: int) -> Iterator[Tuple[List[int], List[str]]]:
+        """Group the texts of the rows not written yet into batches of `(rows, texts)`."""
+        rows: List[int] = []
+        batch: List[str] = []
+        count = 0
+        for row, text in enumerate(texts):
+            count = row + 1
+            if row >= self.rows:
+                raise NetMindError(f"The corpus has more than the {self.rows} rows of {self.path}")
+            if self.done[row]:
+                continue
+            rows.append(row)
+            batch.append(text)
+            if len(batch) >= batch_size:
+                yield rows, batch
+                rows, batch = [], []
+        if batch:
+            yield rows, batch
+        if count < self.rows:
+            raise NetMindError(f"The corpus has {count} rows but {self.path} holds {self.rows}")
+
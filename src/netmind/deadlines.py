@@ -0,0 +1,136 @@
+import time
+import asyncio
+import contextlib
+import contextvars
+from typing import AsyncIterator, Iterable, Iterator, Optional, Union
+
+import httpx
+from openai import APIConnectionError
+
+from netmind.exceptions import DeadlineExceededError
+
+# absolute `time.monotonic()` by which the current operation must be done
+_current_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("netmind_deadline", default=None)
+
+
+@contextlib.contextmanager
+def use_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Give the requests made inside the block, including retries and the steps of composite
+    calls, `seconds` in total. Nested deadlines never extend an enclosing one; `None` is a no-op.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _current_deadline.get()
+    token = _current_deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, `None` outside of a deadline."""
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline() -> Optional[float]:
+    """Return `remaining()`, raising `DeadlineExceededError` if the deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(f"Deadline exceeded by {-left:.3f}s")
+    return left
+
+
+@contextlib.contextmanager
+def raise_on_expiry() -> Iterator[None]:
+    """Turn the failure of a request whose time was cut by the deadline into `DeadlineExceededError`."""
+    try:
+        yield
+    except (httpx.TransportError, APIConnectionError) as err:
+        left = remaining()
+        if left is None or left > 0:
+            raise
+        raise DeadlineExceededError(f"Deadline exceeded by {-left:.3f}s") from err
+
+
+def trim_timeout(timeout: Union[float, httpx.Timeout, None]) -> Union[float, httpx.Timeout, None]:
+    """Cap `timeout` to the time left before the current deadline."""
+    left = check_deadline()
+    if left is None:
+        return timeout
+    if isinstance(timeout, httpx.Timeout):
+        return httpx.Timeout(
+            connect=left if timeout.connect is None else min(timeout.connect, left),
+            read=left if timeout.read is None else min(timeout.read, left),
+            write=left if timeout.write is None else min(timeout.write, left),
+            pool=left if timeout.pool is None else min(timeout.pool, left),
+        )
+    return left if timeout is None else min(timeout, left)
+
+
+class _BoundedStream(httpx.SyncByteStream):
+    def __init__(self, stream: Iterable[bytes]):
+        self._stream = stream
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            check_deadline()
+            yield chunk
+
+    def close(self) -> None:
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            close()
+
+
+def bound_request_body(request: httpx.Request) -> None:
+    """httpx request hook checking the deadline between the chunks of a streamed upload."""
+    if remaining() is not None and not isinstance(request.stream, httpx.ByteStream):
+        request.stream = _BoundedStream(request.stream)
+
+
+def bound_response_body(response: httpx.Response) -> None:
+    """httpx response hook checking the deadline between the chunks of the response body.
+
+    Timeouts only bound each read, so without it a response trickling in could outlast the deadline.
+    """
+    if remaining() is not None:
+        response.stream = _BoundedStream(response.stream)
+
+
+def trim_sleep(seconds: float) -> float:
+    """Cap a polling or backoff sleep to the time left, so the next step fails fast instead."""
+    left = check_deadline()
+    return seconds if left is None else min(seconds, left)
+
+
+@contextlib.asynccontextmanager
+async def cancel_at_deadline(seconds: Optional[float]) -> AsyncIterator[None]:
+    """`use_deadline` for coroutines, also cancelling the block once the deadline passes."""
+    with use_deadline(seconds):
+        left = check_deadline()
+        if left is None:
+            yield
+            return
+        task = asyncio.current_task()
+        expired = False
+
+        def expire() -> None:
+            nonlocal expired
+            expired = True
+            task.cancel()
+
+        handle = asyncio.get_running_loop().call_later(left, expire)
+        try:
+            yield
+        except asyncio.CancelledError as err:
+            if not expired:
+                raise
+            if hasattr(task, "uncancel"):
+                task.uncancel()
+            raise DeadlineExceededError("Deadline exceeded, the operation was cancelled") from err
+        finally:
+            handle.cancel()
@@ -1,3 +1,12 @@
-
 class NetMindError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class JsonlValidationError(NetMindError):
+    def __init__(self, report):
+        super().__init__(report.summary())
+        self.report = report
+
+
+class DeadlineExceededError(NetMindError, TimeoutError):
+    pass
@@ -0,0 +1,160 @@
+import io
+import os
+import base64
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from netmind.cache import Cache, MemoryCache
+from netmind.exceptions import NetMindError
+
+ImageInput = Union[str, os.PathLike, bytes, bytearray, memoryview]
+
+# formats every vision model accepts, kept as they are when no resizing is needed
+_WEB_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp", "GIF": "image/gif"}
+
+
+def _import_pillow():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError as err:
+        raise NetMindError(
+            "Local images require the `pillow` package, install it with `pip install 'netmind[images]'`"
+        ) from err
+    return Image, ImageOps
+
+
+def is_local_image(url: Any) -> bool:
+    """Whether an `image_url` value is a local image (path or bytes) rather than a url or data url."""
+    if isinstance(url, (bytes, bytearray, memoryview, Path)):
+        return True
+    if isinstance(url, str):
+        return not url.startswith(("http://", "https://", "data:")) and os.path.isfile(url)
+    return False
+
+
+class ImageProcessor:
+    """Turns local images into data urls for multimodal chat requests.
+
+    Images larger than `max_dimension` are downscaled and re-encoded (JPEG at `quality`, or
+    PNG when they have transparency) in a pool of `workers` threads; smaller JPEG, PNG, WEBP
+    and GIF images are sent unchanged. Data urls are cached by the hash of the image bytes,
+    so an image repeated across requests is only processed once.
+    """
+
+    def __init__(
+            self,
+            max_dimension: int = 1568,
+            quality: int = 85,
+            workers: Optional[int] = None,
+            cache: Optional[Cache] = None,
+    ):
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.cache = cache if cache is not None else MemoryCache(max_size=64 * 1024 * 1024)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"max_dimension": self.max_dimension, "quality": self.quality, "workers": self.workers, "cache": self.cache}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="netmind-images")
+            return self._pool
+
+    def _key(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        return f"image:{digest}:{self.max_dimension}:{self.quality}"
+
+    def _encode(self, data: bytes) -> str:
+        Image, ImageOps = _import_pillow()
+        with Image.open(io.BytesIO(data)) as image:
+            source_format = image.format
+            if max(image.size) <= self.max_dimension and source_format in _WEB_FORMATS:
+                return f"data:{_WEB_FORMATS[source_format]};base64,{base64.b64encode(data).decode()}"
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((self.max_dimension, self.max_dimension), Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+                image.save(out, format="PNG", optimize=True)
+                mime = "image/png"
+            else:
+                image.convert("RGB").save(out, format="JPEG", quality=self.quality, optimize=True)
+                mime = "image/jpeg"
+        return f"data:{mime};base64,{base64.b64encode(out.getvalue()).decode()}"
+
+    def to_data_url(self, image: ImageInput) -> str:
+        """Return the (cached) data url of a local image given as a path or bytes."""
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            data = bytes(image)
+        else:
+            with open(image, "rb") as f:
+                data = f.read()
+        key = self._key(data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached.decode()
+        url = self._encode(data)
+        self.cache.set(key, url.encode())
+        return url
+
+    def _local_images(self, messages: Iterable[Dict[str, Any]]) -> List[Any]:
+        images = []
+        for message in messages:
+            content = message.get("content") if isinstance(message, dict) else None
+            if isinstance(content, list):
+                for part in content:
+                    if isinstance(part, dict) and part.get("type") == "image_url":
+                        url = (part.get("image_url") or {}).get("url")
+                        if is_local_image(url):
+                            images.append(url)
+        return images
+
+    def _replace(self, messages: List[Dict[str, Any]], urls: Dict[int, str]) -> List[Dict[str, Any]]:
+        # copies the messages holding local images, the caller's messages are left untouched
+        result = []
+        for message in messages:
+            content = message.get("content") if isinstance(message, dict) else None
+            if isinstance(content, list) and any(
+                    isinstance(part, dict) and part.get("type") == "image_url"
+                    and id((part.get("image_url") or {}).get("url")) in urls
+                    for part in content
+            ):
+                parts = []
+                for part in content:
+                    image_url = part.get("image_url") if isinstance(part, dict) else None
+                    if isinstance(image_url, dict) and id(image_url.get("url")) in urls:
+                        part = {**part, "image_url": {**image_url, "url": urls[id(image_url["url"])]}}
+                    parts.append(part)
+                message = {**message, "content": parts}
+            result.append(message)
+        return result
+
+    def process_messages(self, messages: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return `messages` with local images in `image_url` parts replaced by data urls."""
+        messages = list(messages)
+        images = self._local_images(messages)
+        if not images:
+            return messages
+        urls = list(self.pool.map(self.to_data_url, images)) if len(images) > 1 else [self.to_data_url(images[0])]
+        return self._replace(messages, {id(image): url for image, url in zip(images, urls)})
+
+    async def aprocess_messages(self, messages: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """See `process_messages`, the images are processed without blocking the event loop."""
+        messages = list(messages)
+        images = self._local_images(messages)
+        if not images:
+            return messages
+        loop = asyncio.get_running_loop()
+        urls = await asyncio.gather(*(loop.run_in_executor(self.pool, self.to_data_url, image) for image in images))
+        return self._replace(messages, {id(image): url for image, url in zip(images, urls)})
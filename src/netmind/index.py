@@ -0,0 +1,420 @@
+import os
+import json
+import math
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from netmind.exceptions import NetMindError
+
+METRICS = ("cosine", "ip", "l2")
+
+_META = "meta.json"
+_VECTORS = "vectors.f32"
+_IDS = "ids.jsonl"
+_IVF = "ivf.npz"
+_FORMAT_VERSION = 1
+# database rows scored per block by exact search, bounds the (queries x rows) score matrix
+_BLOCK_ROWS = 65536
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as err:
+        raise NetMindError(
+            "The vector index requires the `numpy` package, install it with `pip install 'netmind[index]'`"
+        ) from err
+    return numpy
+
+
+def _as_matrix(np, vectors: Any):
+    """Return float32 rows from a numpy array, nested lists, or embeddings from `client.embeddings.create`."""
+    data = getattr(vectors, "data", None)
+    if data is not None and not hasattr(vectors, "shape"):
+        vectors = sorted(data, key=lambda item: item.index)
+    if isinstance(vectors, (list, tuple)) and vectors and hasattr(vectors[0], "embedding"):
+        vectors = [item.embedding for item in vectors]
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _top_k(np, scores, positions, k: int):
+    """Keep the `k` best (highest) scores of every row, sorted best first."""
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, keep, axis=1)
+        positions = np.take_along_axis(positions, keep, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(positions, order, axis=1)
+
+
+class VectorIndex:
+    """A local nearest-neighbour index over embeddings.
+
+    Vectors are appended with `add`, straight from `client.embeddings.create` responses or
+    numpy matrices, and kept in a growing float32 array, memory-mapped when the index lives
+    in a `directory`. `search` is exact (blocked, batched matrix products) until `train`
+    builds an inverted-file (IVF) index, after which it only scans the `nprobe` closest lists.
+
+    `metric` is "cosine" (vectors are normalized on insert), "ip" (inner product) or "l2";
+    search scores are similarities, except for "l2" where they are squared distances.
+    """
+
+    def __init__(self, dim: Optional[int] = None, metric: str = "cosine", directory: Optional[str | os.PathLike] = None):
+        if metric not in METRICS:
+            raise ValueError(f"Expected `metric` to be one of {METRICS} but received {metric!r}")
+        self._np = _import_numpy()
+        self.dim = dim
+        self.metric = metric
+        self.directory = None if directory is None else os.fspath(directory)
+        self._count = 0
+        self._vectors = None
+        self._ids: List[Any] = []
+        self._custom_ids = False
+        self._id_array = None
+        self._readonly = False
+        # inverted file: centroids, the list of every vector, and the lists as sorted positions
+        self._centroids = None
+        self._assignments = None
+        self._lists = None
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(os.path.join(self.directory, _META)):
+                raise NetMindError(f"An index already exists in {self.directory}, open it with `VectorIndex.load`")
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def vectors(self):
+        """The stored vectors, normalized for the cosine metric."""
+        if self._vectors is None:
+            return self._np.empty((0, self.dim or 0), dtype=self._np.float32)
+        return self._vectors[:self._count]
+
+    @property
+    def ids(self) -> List[Any]:
+        return self._ids
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _reserve(self, rows: int) -> None:
+        np = self._np
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 1024)
+        if self.directory is None:
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            if self._count:
+                grown[:self._count] = self._vectors[:self._count]
+            self._vectors = grown
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+        with open(self._path(_VECTORS), "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(self._path(_VECTORS), dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _prepare(self, matrix):
+        np = self._np
+        if self.metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1, norms)
+        return matrix
+
+    def add(self, vectors: Any, ids: Optional[Sequence[Any]] = None) -> None:
+        """Append vectors, with optional ids (json serializable); ids default to insertion positions."""
+        if self._readonly:
+            raise NetMindError("This index was loaded read-only")
+        np = self._np
+        matrix = _as_matrix(np, vectors)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        if matrix.ndim != 2 or matrix.shape[0] == 0:
+            return
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim} but received {matrix.shape[1]}")
+        if ids is not None and len(ids) != matrix.shape[0]:
+            raise ValueError(f"Received {len(ids)} ids for {matrix.shape[0]} vectors")
+
+        matrix = self._prepare(matrix)
+        start, end = self._count, self._count + matrix.shape[0]
+        self._reserve(end)
+        self._vectors[start:end] = matrix
+        new_ids = list(range(start, end)) if ids is None else list(ids)
+        self._custom_ids = self._custom_ids or ids is not None
+        self._ids.extend(new_ids)
+        self._id_array = None
+        if self._centroids is not None:
+            self._assignments = np.concatenate([self._assignments, self._assign(matrix)])
+            self._lists = None
+        self._count = end
+        if self.directory is not None:
+            self._vectors.flush()
+            with open(self._path(_IDS), "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(i) + "\n" for i in new_ids)
+            # the count written last is what `load` trusts, rows past it are ignored
+            self._write_meta()
+
+    def _write_meta(self) -> None:
+        meta = {
+            "version": _FORMAT_VERSION, "dim": self.dim, "metric": self.metric,
+            "count": self._count, "custom_ids": self._custom_ids,
+        }
+        tmp = self._path(_META + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path(_META))
+
+    def _scores(self, queries, rows):
+        """Similarities of every query to every row, higher is better."""
+        np = self._np
+        scores = queries @ rows.T
+        if self.metric == "l2":
+            # -(|q|^2 - 2 q.v + |v|^2)
+            scores = 2 * scores - np.einsum("ij,ij->i", rows, rows)[None, :] - np.einsum("ij,ij->i", queries, queries)[:, None]
+        return scores
+
+    def _result_ids(self, positions):
+        np = self._np
+        if self._id_array is None:
+            if self._custom_ids:
+                self._id_array = np.empty(self._count + 1, dtype=object)
+                self._id_array[:-1] = self._ids
+                self._id_array[-1] = None
+            else:
+                self._id_array = np.append(np.arange(self._count, dtype=np.int64), -1)
+        # missing results are padded with position -1, the last entry (None or -1)
+        return self._id_array[positions]
+
+    def search(self, queries: Any, k: int = 10, *, nprobe: Optional[int] = None, batch_size: int = 1024) -> Tuple[Any, Any]:
+        """Return the `(scores, ids)` of the `k` nearest vectors of every query, best first.
+
+        A single query vector gives 1-d arrays, a matrix gives one row per query. Results missing
+        when fewer than `k` vectors are reachable are padded with nan scores and -1 (or None) ids.
+        `nprobe` is the number of IVF lists scanned once the index is trained, `nprobe=0` forces
+        an exact search.
+        """
+        np = self._np
+        matrix = _as_matrix(np, queries)
+        single = matrix.ndim == 1
+        if single:
+            matrix = matrix[None, :]
+        if self.dim is not None and matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected queries of dimension {self.dim} but received {matrix.shape[1]}")
+        matrix = self._prepare(matrix)
+        exact = self._centroids is None or nprobe == 0
+        all_scores, all_positions = [], []
+        for start in range(0, matrix.shape[0], batch_size):
+            batch = matrix[start:start + batch_size]
+            if exact:
+                scores, positions = self._search_exact(batch, k)
+            else:
+                scores, positions = self._search_ivf(batch, k, nprobe or max(1, int(math.sqrt(len(self._centroids)))))
+            all_scores.append(scores)
+            all_positions.append(positions)
+        scores = np.concatenate(all_scores) if all_scores else np.empty((0, k), dtype=np.float32)
+        positions = np.concatenate(all_positions) if all_positions else np.empty((0, k), dtype=np.int64)
+        if self.metric == "l2":
+            scores = -scores
+        ids = self._result_ids(positions)
+        return (scores[0], ids[0]) if single else (scores, ids)
+
+    def _pad(self, scores, positions, k: int):
+        np = self._np
+        missing = k - scores.shape[1]
+        if missing > 0:
+            scores = np.concatenate([scores, np.full((scores.shape[0], missing), np.nan, dtype=np.float32)], axis=1)
+            positions = np.concatenate([positions, np.full((positions.shape[0], missing), -1, dtype=np.int64)], axis=1)
+        return scores.astype(np.float32, copy=False), positions
+
+    def _search_exact(self, queries, k: int):
+        np = self._np
+        best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+        best_positions = np.empty((queries.shape[0], 0), dtype=np.int64)
+        for start in range(0, self._count, _BLOCK_ROWS):
+            rows = self._vectors[start:min(start + _BLOCK_ROWS, self._count)]
+            scores = self._scores(queries, rows)
+            positions = np.broadcast_to(np.arange(start, start + rows.shape[0], dtype=np.int64), scores.shape)
+            scores, positions = _top_k(np, scores, positions, k)
+            best_scores, best_positions = _top_k(
+                np, np.concatenate([best_scores, scores], axis=1), np.concatenate([best_positions, positions], axis=1), k
+            )
+        return self._pad(best_scores, best_positions, k)
+
+    def _search_ivf(self, queries, k: int, nprobe: int):
+        np = self._np
+        order, offsets = self._inverted_lists()
+        nprobe = min(nprobe, len(self._centroids))
+        probes = np.argpartition(-self._centroid_scores(queries), nprobe - 1, axis=1)[:, :nprobe]
+        results_scores, results_positions = [], []
+        for query, lists in zip(queries, probes):
+            candidates = np.concatenate([order[offsets[i]:offsets[i + 1]] for i in lists])
+            if candidates.size == 0:
+                scores = np.empty((1, 0), dtype=np.float32)
+                positions = np.empty((1, 0), dtype=np.int64)
+            else:
+                candidates.sort()
+                scores = self._scores(query[None, :], self._vectors[candidates])
+                scores, positions = _top_k(np, scores, candidates[None, :].astype(np.int64), k)
+            scores, positions = self._pad(scores, positions, k)
+            results_scores.append(scores)
+            results_positions.append(positions)
+        return np.concatenate(results_scores), np.concatenate(results_positions)
+
+    def _centroid_scores(self, vectors):
+        np = self._np
+        scores = vectors @ self._centroids.T
+        if self.metric != "cosine":
+            # nearest centroid in euclidean distance
+            scores = scores - 0.5 * np.einsum("ij,ij->i", self._centroids, self._centroids)[None, :]
+        return scores
+
+    def _assign(self, vectors):
+        np = self._np
+        out = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], _BLOCK_ROWS):
+            block = vectors[start:start + _BLOCK_ROWS]
+            out[start:start + block.shape[0]] = np.argmax(self._centroid_scores(block), axis=1)
+        return out
+
+    def _inverted_lists(self):
+        np = self._np
+        if self._lists is None:
+            order = np.argsort(self._assignments, kind="stable").astype(np.int64)
+            counts = np.bincount(self._assignments, minlength=len(self._centroids))
+            self._lists = order, np.concatenate([[0], np.cumsum(counts)])
+        return self._lists
+
+    def train(self, nlist: Optional[int] = None, iterations: int = 10, sample_size: Optional[int] = None, seed: int = 0) -> None:
+        """Cluster the vectors with k-means into `nlist` lists (default about 4 * sqrt(n)) for IVF search.
+
+        Vectors added later are assigned to their closest list; train again after large changes.
+        """
+        np = self._np
+        if self._count == 0:
+            raise NetMindError("Cannot train an empty index")
+        nlist = min(nlist or max(1, int(4 * math.sqrt(self._count))), self._count)
+        rng = np.random.default_rng(seed)
+        sample_size = min(self._count, sample_size or max(nlist * 32, 10000))
+        sample = self.vectors[np.sort(rng.choice(self._count, sample_size, replace=False))]
+        self._centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._assign(sample)
+            counts = np.bincount(labels, minlength=nlist)
+            order = np.argsort(labels, kind="stable")
+            filled = np.flatnonzero(counts)
+            sums = np.zeros_like(self._centroids)
+            sums[filled] = np.add.reduceat(sample[order], np.concatenate([[0], np.cumsum(counts)])[filled], axis=0)
+            empty = counts == 0
+            # empty lists restart from random sample vectors
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            counts[empty] = 1
+            centroids = sums / counts[:, None]
+            if self.metric == "cosine":
+                centroids = self._prepare(centroids)
+            if np.allclose(centroids, self._centroids, atol=1e-6):
+                self._centroids = centroids.astype(np.float32)
+                break
+            self._centroids = centroids.astype(np.float32)
+        self._assignments = self._assign(self.vectors)
+        self._lists = None
+        if self.directory is not None:
+            self._save_ivf(self.directory)
+
+    def _save_ivf(self, directory: str) -> None:
+        path = os.path.join(directory, _IVF)
+        if self._centroids is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        tmp = path + ".tmp.npz"
+        self._np.savez(tmp, centroids=self._centroids, assignments=self._assignments[:self._count])
+        os.replace(tmp, path)
+
+    def flush(self) -> None:
+        """Persist the state of a directory-backed index (vectors and ids are written by `add`)."""
+        if self.directory is not None and not self._readonly:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._save_ivf(self.directory)
+            self._write_meta()
+
+    def save(self, directory: str | os.PathLike) -> None:
+        """Write the index to `directory`, which can then be opened with `VectorIndex.load`."""
+        directory = os.fspath(directory)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory is not None and os.path.abspath(directory) == os.path.abspath(self.directory):
+            self.flush()
+            return
+        self.vectors.tofile(os.path.join(directory, _VECTORS))
+        with open(os.path.join(directory, _IDS), "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(i) + "\n" for i in self._ids)
+        self._save_ivf(directory)
+        original, self.directory = self.directory, directory
+        try:
+            self._write_meta()
+        finally:
+            self.directory = original
+
+    @classmethod
+    def load(cls, directory: str | os.PathLike, mmap_mode: str = "r+") -> "VectorIndex":
+        """Open an index saved in `directory`, memory-mapping its vectors.
+
+        With `mmap_mode="r"` the index is read-only; with "r+" new vectors are appended to it.
+        """
+        np = _import_numpy()
+        directory = os.fspath(directory)
+        with open(os.path.join(directory, _META)) as f:
+            meta = json.load(f)
+        index = cls.__new__(cls)
+        index._np = np
+        index.dim = meta["dim"]
+        index.metric = meta["metric"]
+        index.directory = directory
+        index._count = meta["count"]
+        index._custom_ids = meta["custom_ids"]
+        index._id_array = None
+        index._readonly = mmap_mode == "r"
+        index._vectors = None
+        if index.dim and index._count:
+            rows = os.path.getsize(os.path.join(directory, _VECTORS)) // (index.dim * 4)
+            index._vectors = np.memmap(
+                os.path.join(directory, _VECTORS), dtype=np.float32, mode=mmap_mode, shape=(rows, index.dim)
+            )
+        index._ids = []
+        with open(os.path.join(directory, _IDS), "r", encoding="utf-8") as f:
+            for _, line in zip(range(index._count), f):
+                index._ids.append(json.loads(line))
+            stale = f.readline() != ""
+        if stale and not index._readonly:
+            # drop ids written by an `add` interrupted before its count was recorded
+            with open(os.path.join(directory, _IDS), "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(i) + "\n" for i in index._ids)
+        index._centroids = index._assignments = index._lists = None
+        ivf = os.path.join(directory, _IVF)
+        if os.path.exists(ivf):
+            with np.load(ivf) as data:
+                index._centroids = data["centroids"]
+                index._assignments = data["assignments"][:index._count]
+            if len(index._assignments) < index._count:
+                index._assignments = np.concatenate([
+                    index._assignments, index._assign(index._vectors[len(index._assignments):index._count])
+                ])
+        return index
+
+    @classmethod
+    def from_embeddings(
+            cls, responses: Iterable[Any], metric: str = "cosine", directory: Optional[str | os.PathLike] = None
+    ) -> "VectorIndex":
+        """Build an index from `client.embeddings.create` responses, ids being the running input positions."""
+        index = cls(metric=metric, directory=directory)
+        for response in responses:
+            index.add(response)
+        return index
@@ -0,0 +1,175 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import List, Optional
+
+from netmind.types.abstract import BaseModel
+from netmind.types.parse_pro import FINISHED_STATUSES, Formt, TaskStatus
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_tasks (
+    task_id TEXT PRIMARY KEY,
+    source_digest TEXT NOT NULL,
+    source TEXT,
+    format TEXT NOT NULL,
+    mode TEXT,
+    figure_parsing INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parse_tasks_source
+    ON parse_tasks (source_digest, format, mode, figure_parsing);
+CREATE TABLE IF NOT EXISTS parse_task_events (
+    task_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    at REAL NOT NULL
+);
+"""
+
+_COLUMNS = "task_id, source_digest, source, format, mode, figure_parsing, status, created_at, updated_at"
+
+# finished without a result, the document has to be submitted again
+_UNUSABLE_STATUSES = tuple(s.value for s in FINISHED_STATUSES if s != TaskStatus.success)
+
+
+class ParseJournalEntry(BaseModel):
+    task_id: str
+    source_digest: str
+    source: Optional[str] = None
+    format: str
+    mode: Optional[str] = None
+    figure_parsing: bool
+    status: str
+    created_at: float
+    updated_at: float
+
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+class TaskJournal:
+    """A sqlite journal of submitted ParsePro tasks that survives process restarts.
+
+    It maps the content digest of every submitted document to its task id and records the
+    status transitions seen through `aresult`, so a restarted worker can resume polling
+    its outstanding tasks instead of uploading and parsing the documents again.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections must not be shared with forked children
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _entry(row) -> ParseJournalEntry:
+        return ParseJournalEntry(**dict(zip(_COLUMNS.split(", "), row)))
+
+    def record(
+            self,
+            task_id: str,
+            source_digest: str,
+            *,
+            format: Formt | str,
+            mode: Optional[str],
+            figure_parsing: bool,
+            status: str,
+            source: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        status = getattr(status, "value", status)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute(
+                    f"INSERT OR REPLACE INTO parse_tasks ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (task_id, source_digest, source, Formt(format).value, mode, int(bool(figure_parsing)),
+                     status, now, now),
+                )
+                conn.execute("INSERT INTO parse_task_events VALUES (?, ?, ?)", (task_id, status, now))
+
+    def update(self, task_id: str, status: str) -> None:
+        status = getattr(status, "value", status)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN")
+                changed = conn.execute(
+                    "UPDATE parse_tasks SET status = ?, updated_at = ? WHERE task_id = ? AND status != ?",
+                    (status, now, task_id, status),
+                ).rowcount
+                if changed:
+                    conn.execute("INSERT INTO parse_task_events VALUES (?, ?, ?)", (task_id, status, now))
+
+    def get(self, task_id: str) -> Optional[ParseJournalEntry]:
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT {_COLUMNS} FROM parse_tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return None if row is None else self._entry(row)
+
+    def find(
+            self, source_digest: str, *, format: Formt | str, mode: Optional[str], figure_parsing: bool
+    ) -> Optional[ParseJournalEntry]:
+        """Return the latest task for this document and options that is done or may still succeed."""
+        placeholders = ", ".join("?" * len(_UNUSABLE_STATUSES))
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT {_COLUMNS} FROM parse_tasks "
+                f"WHERE source_digest = ? AND format = ? AND mode IS ? AND figure_parsing = ? "
+                f"AND status NOT IN ({placeholders}) ORDER BY created_at DESC LIMIT 1",
+                (source_digest, Formt(format).value, mode, int(bool(figure_parsing)), *_UNUSABLE_STATUSES),
+            ).fetchone()
+        return None if row is None else self._entry(row)
+
+    def outstanding(self) -> List[ParseJournalEntry]:
+        """Return the tasks that have not reached a finished status yet, oldest first."""
+        finished = [s.value for s in FINISHED_STATUSES]
+        placeholders = ", ".join("?" * len(finished))
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT {_COLUMNS} FROM parse_tasks WHERE status NOT IN ({placeholders}) ORDER BY created_at",
+                finished,
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def history(self, task_id: str) -> List[str]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT status FROM parse_task_events WHERE task_id = ? ORDER BY rowid", (task_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def forget(self, task_id: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute("DELETE FROM parse_tasks WHERE task_id = ?", (task_id,))
+                conn.execute("DELETE FROM parse_task_events WHERE task_id = ?", (task_id,))
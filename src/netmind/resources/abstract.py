@@ -0,0 +1,30 @@
+from typing import Any, Awaitable, Callable
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from openai._resource import SyncAPIResource, AsyncAPIResource
+
+from netmind.types.lean import decode
+
+
+class NetMindSyncResource(SyncAPIResource):
+    def __init__(self, openai_client: OpenAI, *, lean: bool = False):
+        super().__init__(openai_client)
+        self.lean = lean
+
+    def _call(self, request: Callable[..., Any], path: str, *, cast_to: Any, **kwargs) -> Any:
+        # `request` is one of `self._get`, `self._post`, `self._delete`
+        if self.lean:
+            return decode(request(path, cast_to=httpx.Response, **kwargs), cast_to)
+        return request(path, cast_to=cast_to, **kwargs)
+
+
+class NetMindAsyncResource(AsyncAPIResource):
+    def __init__(self, openai_client: AsyncOpenAI, *, lean: bool = False):
+        super().__init__(openai_client)
+        self.lean = lean
+
+    async def _call(self, request: Callable[..., Awaitable[Any]], path: str, *, cast_to: Any, **kwargs) -> Any:
+        if self.lean:
+            return decode(await request(path, cast_to=httpx.Response, **kwargs), cast_to)
+        return await request(path, cast_to=cast_to, **kwargs)
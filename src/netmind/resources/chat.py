@@ -1,9 +1,64 @@
+from typing import Optional
+from functools import cached_property
+
+from openai import OpenAI, AsyncOpenAI
 from openai.resources import Chat as OpenChat, AsyncChat as AsyncOpenChat
+from openai.resources.chat.completions import Completions as OpenCompletions, AsyncCompletions as AsyncOpenCompletions
+
+from netmind.images import ImageProcessor
+
+
+_COMPLETIONS_PATH = "/chat/completions"
+
+
+class Completions(OpenCompletions):
+    """Chat completions accepting local image paths or bytes as `image_url` urls."""
+
+    def __init__(self, client: OpenAI, images: ImageProcessor):
+        super().__init__(client)
+        self.images = images
+        # `create` and `parse` keep their signatures, the messages are processed where they are posted
+        self._post = self._post_images
+
+    def _post_images(self, path: str, *, body=None, **kwargs):
+        if path == _COMPLETIONS_PATH and isinstance(body, dict) and "messages" in body:
+            body = {**body, "messages": self.images.process_messages(body["messages"])}
+        return self._client.post(path, body=body, **kwargs)
+
+
+class AsyncCompletions(AsyncOpenCompletions):
+    def __init__(self, client: AsyncOpenAI, images: ImageProcessor):
+        super().__init__(client)
+        self.images = images
+        self._post = self._post_images
+
+    async def _post_images(self, path: str, *, body=None, **kwargs):
+        if path == _COMPLETIONS_PATH and isinstance(body, dict) and "messages" in body:
+            body = {**body, "messages": await self.images.aprocess_messages(body["messages"])}
+        return await self._client.post(path, body=body, **kwargs)
 
 
 class Chat(OpenChat):
-    pass
+    """Chat resource, local images in messages are only read when an `ImageProcessor` is given."""
+
+    def __init__(self, client: OpenAI, images: Optional[ImageProcessor] = None):
+        super().__init__(client)
+        self.images = images
+
+    @cached_property
+    def completions(self) -> OpenCompletions:
+        if self.images is None:
+            return OpenCompletions(self._client)
+        return Completions(self._client, self.images)
 
 
 class AsyncChat(AsyncOpenChat):
-    pass
+    def __init__(self, client: AsyncOpenAI, images: Optional[ImageProcessor] = None):
+        super().__init__(client)
+        self.images = images
+
+    @cached_property
+    def completions(self) -> AsyncOpenCompletions:
+        if self.images is None:
+            return AsyncOpenCompletions(self._client)
+        return AsyncCompletions(self._client, self.images)
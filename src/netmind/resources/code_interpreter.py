@@ -1,31 +1,117 @@
+import json
+import asyncio
+import hashlib
+from typing import Any, Optional
+
+from netmind.cache import Cache
+from netmind.deadlines import use_deadline, cancel_at_deadline
 from netmind.types.code_interpreter import CodeInterpreterCodeRequest, CodeInterpreterCodeResponse
-from openai._resource import SyncAPIResource, AsyncAPIResource
+from netmind.types.lean import LeanModel
+from netmind.resources.abstract import NetMindSyncResource, NetMindAsyncResource
 from openai import OpenAI, AsyncOpenAI
 
 
-class CodeInterpreter(SyncAPIResource):
+def request_digest(request_data: CodeInterpreterCodeRequest) -> str:
+    """Hash of the canonical json of a request, unset optional fields counting as their defaults."""
+    data = request_data.model_dump(mode="json")
+    data["stdin"] = data.get("stdin") or ""
+    data["args"] = data.get("args") or []
+    data["file_id_usage"] = data.get("file_id_usage") or []
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _cache_key(request_data: CodeInterpreterCodeRequest) -> str:
+    return f"code-interpreter:{request_digest(request_data)}"
+
+
+def _load_response(cache: Cache, key: str, lean: bool) -> Any:
+    data = cache.get(key)
+    if data is None:
+        return None
+    if lean:
+        return LeanModel(json.loads(data), CodeInterpreterCodeResponse)
+    return CodeInterpreterCodeResponse.model_validate_json(data)
+
+
+def _store_response(cache: Cache, key: str, response: Any, cache_artifacts: bool) -> None:
+    if response is None:
+        return
+    run = response.run
+    # killed runs (timeouts, out of memory) may succeed next time, and artifacts in
+    # `data` are files of the sandbox that are not guaranteed to outlive the entry
+    if run.signal or (run.data and not cache_artifacts):
+        return
+    data = response.to_dict() if isinstance(response, LeanModel) else response.model_dump(mode="json", warnings=False)
+    cache.set(key, json.dumps(data, ensure_ascii=False).encode())
+
+
+class CodeInterpreter(NetMindSyncResource):
+
+    def __init__(self, openai_client: OpenAI, *, lean: bool = False, cache: Optional[Cache] = None):
+        super().__init__(openai_client, lean=lean)
+        self.cache = cache
 
-    def __init__(self, openai_client: OpenAI):
-        super().__init__(openai_client)
+    def run(
+            self,
+            request_data: CodeInterpreterCodeRequest,
+            *,
+            use_cache: bool = True,
+            cache_artifacts: bool = False,
+            deadline: Optional[float] = None,
+    ) -> CodeInterpreterCodeResponse | None:
+        """Execute code in a sandbox.
 
-    def run(self, request_data: CodeInterpreterCodeRequest) -> CodeInterpreterCodeResponse | None:
-        return self._post(
-            "/inference-api/agent/code-interpreter/v1/execute",
-            body=request_data.model_dump(),
-            options={'timeout': 30, "max_retries": 3},
-            cast_to=CodeInterpreterCodeResponse
-        )
+        With a `code_cache` on the client, identical requests are answered from the cache;
+        `use_cache=False` forces an execution. Runs that produced files in `run.data` are only
+        cached with `cache_artifacts=True`.
+        """
+        with use_deadline(deadline):
+            key = _cache_key(request_data) if self.cache is not None and use_cache else None
+            if key is not None:
+                cached = _load_response(self.cache, key, self.lean)
+                if cached is not None:
+                    return cached
+            response = self._call(
+                self._post,
+                "/inference-api/agent/code-interpreter/v1/execute",
+                body=request_data.model_dump(),
+                options={'timeout': 30, "max_retries": 3},
+                cast_to=CodeInterpreterCodeResponse
+            )
+            if key is not None:
+                _store_response(self.cache, key, response, cache_artifacts)
+            return response
 
 
-class AsyncCodeInterpreter(AsyncAPIResource):
+class AsyncCodeInterpreter(NetMindAsyncResource):
 
-    def __init__(self, openai_client: AsyncOpenAI):
-        super().__init__(openai_client)
+    def __init__(self, openai_client: AsyncOpenAI, *, lean: bool = False, cache: Optional[Cache] = None):
+        super().__init__(openai_client, lean=lean)
+        self.cache = cache
 
-    async def arun(self, request_data: CodeInterpreterCodeRequest) -> CodeInterpreterCodeResponse | None:
-        return await self._post(
-            "/inference-api/agent/code-interpreter/v1/execute",
-            body=request_data.model_dump(),
-            options={'timeout': 30, "max_retries": 3},
-            cast_to=CodeInterpreterCodeResponse
-        )
+    async def arun(
+            self,
+            request_data: CodeInterpreterCodeRequest,
+            *,
+            use_cache: bool = True,
+            cache_artifacts: bool = False,
+            deadline: Optional[float] = None,
+    ) -> CodeInterpreterCodeResponse | None:
+        """Execute code in a sandbox, see `CodeInterpreter.run`."""
+        async with cancel_at_deadline(deadline):
+            key = _cache_key(request_data) if self.cache is not None and use_cache else None
+            if key is not None:
+                cached = await asyncio.to_thread(_load_response, self.cache, key, self.lean)
+                if cached is not None:
+                    return cached
+            response = await self._call(
+                self._post,
+                "/inference-api/agent/code-interpreter/v1/execute",
+                body=request_data.model_dump(),
+                options={'timeout': 30, "max_retries": 3},
+                cast_to=CodeInterpreterCodeResponse
+            )
+            if key is not None:
+                await asyncio.to_thread(_store_response, self.cache, key, response, cache_artifacts)
+            return response
@@ -1,9 +1,123 @@
+import os
+import asyncio
+from typing import Any, List, Optional, Union
+
 from openai.resources.embeddings import Embeddings as OpenEmbeddings, AsyncEmbeddings as AsyncOpenEmbeddings
 
+from netmind._pipeline import run_pipeline
+from netmind.corpus import EmbeddingMatrix, Source, count_rows, iter_texts
+from netmind.types.embeddings import EmbeddingMatrixResult
+
+
+def _vectors(response: Any) -> List[List[float]]:
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def _tokens(response: Any) -> int:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", 0) or 0
+
+
+def _result(matrix: EmbeddingMatrix, skipped: int, tokens: int) -> EmbeddingMatrixResult:
+    return EmbeddingMatrixResult(
+        path=matrix.path, rows=matrix.rows, dim=matrix.dim or 0,
+        embedded=matrix.completed - skipped, skipped=skipped, total_tokens=tokens,
+    )
+
 
 class Embeddings(OpenEmbeddings):
-    pass
+    def create_matrix(
+            self,
+            source: Source,
+            output: Union[str, os.PathLike],
+            *,
+            model: str,
+            field: str = "text",
+            rows: Optional[int] = None,
+            batch_size: int = 64,
+            concurrency: int = 8,
+            checkpoint_interval: float = 10.0,
+            **kwargs,
+    ) -> EmbeddingMatrixResult:
+        """Embed a corpus into a memory-mapped `.npy` matrix, row `i` holding the vector of text `i`.
+
+        `source` is a JSONL or CSV path, or an iterable of strings (then `rows` must be given
+        unless it is a sequence). Batches of `batch_size` texts are embedded on `concurrency`
+        threads and written straight into the matrix. Finished rows are checkpointed next to
+        it every `checkpoint_interval` seconds, so calling again after an interruption only
+        embeds the missing rows. Other `kwargs` go to `create`. Requires the `numpy` package.
+        """
+        rows = count_rows(source, field) if rows is None else rows
+        matrix = EmbeddingMatrix(output, rows, kwargs.get("dimensions"), checkpoint_interval=checkpoint_interval)
+        skipped = matrix.completed
+        tokens = 0
+
+        def embed(batch):
+            indexes, texts = batch
+            return indexes, self.create(model=model, input=texts, **kwargs)
+
+        try:
+            for indexes, response in run_pipeline(
+                    matrix.pending(iter_texts(source, field), batch_size),
+                    [(embed, max(1, concurrency))],
+            ):
+                matrix.write(indexes, _vectors(response))
+                tokens += _tokens(response)
+                if matrix.checkpoint_due():
+                    matrix.checkpoint()
+        finally:
+            matrix.checkpoint()
+        return _result(matrix, skipped, tokens)
 
 
 class AsyncEmbeddings(AsyncOpenEmbeddings):
-    pass
+    async def create_matrix(
+            self,
+            source: Source,
+            output: Union[str, os.PathLike],
+            *,
+            model: str,
+            field: str = "text",
+            rows: Optional[int] = None,
+            batch_size: int = 64,
+            concurrency: int = 8,
+            checkpoint_interval: float = 10.0,
+            **kwargs,
+    ) -> EmbeddingMatrixResult:
+        """Embed a corpus into a memory-mapped `.npy` matrix, see `Embeddings.create_matrix`.
+
+        At most `concurrency` requests are in flight.
+        """
+        rows = await asyncio.to_thread(count_rows, source, field) if rows is None else rows
+        matrix = await asyncio.to_thread(
+            EmbeddingMatrix, output, rows, kwargs.get("dimensions"), checkpoint_interval=checkpoint_interval
+        )
+        skipped = matrix.completed
+        tokens = 0
+        batches = matrix.pending(iter_texts(source, field), batch_size)
+        lock = asyncio.Lock()
+
+        async def drain() -> None:
+            nonlocal tokens
+            while True:
+                # the corpus is read and parsed on a thread, one batch at a time
+                async with lock:
+                    batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    return
+                indexes, texts = batch
+                response = await self.create(model=model, input=texts, **kwargs)
+                matrix.write(indexes, _vectors(response))
+                tokens += _tokens(response)
+                if matrix.checkpoint_due():
+                    await asyncio.to_thread(matrix.checkpoint)
+
+        workers = [asyncio.ensure_future(drain()) for _ in range(max(1, concurrency))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await asyncio.to_thread(matrix.checkpoint)
+        return _result(matrix, skipped, tokens)
@@ -1,15 +1,28 @@
 import os
 import re
-import httpx
+import asyncio
+import tempfile
 import filetype
 
 from pathlib import Path
-from typing import List, Union
-from openai._resource import SyncAPIResource, AsyncAPIResource
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple, Union
+from netmind._compression import check_compression, compressor
+from netmind.deadlines import use_deadline, cancel_at_deadline, raise_on_expiry, trim_timeout
+from netmind.exceptions import JsonlValidationError
+from netmind.resources.abstract import NetMindSyncResource, NetMindAsyncResource
 from netmind.types.files import (
     FilePurpose, FilePresigned,
-    FileObject, FileId
+    FileObject, FileId, FileUpload
 )
+from netmind.types.validation import ValidationReport
+from netmind.validation import validate_jsonl
+
+# filetype only looks at the first 261 bytes of a file
+MIME_HEADER_SIZE = 261
+CHUNK_SIZE = 1024 * 1024
+# compressed uploads stay in memory up to this size, then spill to a temporary file
+SPOOL_SIZE = 64 * 1024 * 1024
+TEXT_PURPOSES = (FilePurpose.fine_tune, FilePurpose.batch)
 
 
 def sanitize_filename(filename: str) -> str:
@@ -18,45 +31,139 @@ def sanitize_filename(filename: str) -> str:
     return f"{clean_name}{ext}"
 
 
-class Files(SyncAPIResource):
+def sniff_mime(f: BinaryIO) -> Optional[str]:
+    position = f.tell()
+    header = f.read(MIME_HEADER_SIZE)
+    f.seek(position)
+    return filetype.guess_mime(header)
+
+
+def _check_compression(compression: Optional[str], purpose: FilePurpose | str) -> None:
+    if compression is None:
+        return
+    check_compression(compression)
+    if FilePurpose(purpose) not in TEXT_PURPOSES:
+        raise ValueError(
+            f"Compression is only supported for text files of purpose "
+            f"{', '.join(p.value for p in TEXT_PURPOSES)}, received {FilePurpose(purpose).value!r}"
+        )
+
+
+def _check_validate(validate: bool, purpose: FilePurpose | str) -> bool:
+    if validate and FilePurpose(purpose) not in TEXT_PURPOSES:
+        raise ValueError(
+            f"Validation is only supported for files of purpose "
+            f"{', '.join(p.value for p in TEXT_PURPOSES)}, received {FilePurpose(purpose).value!r}"
+        )
+    return validate
+
+
+def _raise_for_report(report: ValidationReport) -> None:
+    if not report.is_valid():
+        raise JsonlValidationError(report)
+
+
+def compress_file(f: BinaryIO, compression: str) -> Tuple[BinaryIO, int, int]:
+    """Compress `f` chunk by chunk, returns the compressed stream, the raw and the compressed sizes."""
+    compress, flush = compressor(compression)
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    raw_size = 0
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        raw_size += len(chunk)
+        out.write(compress(chunk))
+    out.write(flush())
+    size = out.tell()
+    out.seek(0)
+    return out, raw_size, size
+
+
+def _upload_headers(mime: Optional[str], size: int, compression: Optional[str]) -> dict:
+    # an explicit Content-Length keeps httpx from using chunked transfer encoding,
+    # which presigned urls do not accept
+    headers = {"Content-Length": str(size)}
+    if mime:
+        headers["Content-Type"] = mime
+    if compression:
+        headers["Content-Encoding"] = compression
+    return headers
+
+
+def _iter_chunks(f: BinaryIO) -> Iterator[bytes]:
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        yield chunk
+
+
+async def _aiter_chunks(f: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(f.read, CHUNK_SIZE):
+        yield chunk
+
+
+class Files(NetMindSyncResource):
     def create(
             self,
             file: Path | str,
             *,
             purpose: FilePurpose | str = FilePurpose.fine_tune,
-    ) -> FileId:
-        file_name = Path(file).name if isinstance(file, (Path, str)) else None
-        assert file_name is not None, "File must be a path or string representing the file path."
-        with open(file, 'rb') as f:
-            mime = filetype.guess_mime(f)
-            presign_url: FilePresigned = self._post(
-                "/v1/files",
-                body={
-                    "file_name": sanitize_filename(file_name),
-                    "purpose": purpose
-                },
-                cast_to=FilePresigned,
-                options={"headers": {"file-content-type": mime}} if mime else {}
-            )
-            response = httpx.put(
-                presign_url.presigned_url,
-                content=f,
-                headers={"Content-Type": mime} if mime else {},
-                timeout=300
-            )
-            response.raise_for_status()
-        return FileId(id=presign_url.id)
+            compression: Optional[str] = None,
+            validate: bool = False,
+            deadline: Optional[float] = None,
+    ) -> FileUpload:
+        """Upload a local file.
+
+        `compression` ("gzip" or "zstd") compresses fine-tune and batch files on the fly;
+        the upload is sent with a matching Content-Encoding. With `validate`, the file is
+        checked by `netmind.validation.validate_jsonl` first and `JsonlValidationError`
+        is raised before anything is uploaded if a line is invalid.
+        """
+        with use_deadline(deadline):
+            file_name = Path(file).name if isinstance(file, (Path, str)) else None
+            assert file_name is not None, "File must be a path or string representing the file path."
+            _check_compression(compression, purpose)
+            if _check_validate(validate, purpose):
+                _raise_for_report(validate_jsonl(file, purpose=purpose))
+            with open(file, 'rb') as f:
+                mime = sniff_mime(f)
+                raw_size = os.fstat(f.fileno()).st_size
+                presign_url: FilePresigned = self._call(
+                    self._post,
+                    "/v1/files",
+                    body={
+                        "file_name": sanitize_filename(file_name),
+                        "purpose": purpose
+                    },
+                    cast_to=FilePresigned,
+                    options={"headers": {"file-content-type": mime}} if mime else {}
+                )
+                body, size = f, raw_size
+                if compression:
+                    body, raw_size, size = compress_file(f, compression)
+                try:
+                    # reuse the connection pool of the API client instead of a one-off client
+                    with raise_on_expiry():
+                        response = self._client._client.put(
+                            str(presign_url.presigned_url),
+                            content=_iter_chunks(body),
+                            headers=_upload_headers(mime, size, compression),
+                            timeout=trim_timeout(300)
+                        )
+                finally:
+                    if body is not f:
+                        body.close()
+                response.raise_for_status()
+            return FileUpload(id=presign_url.id, raw_bytes=raw_size, uploaded_bytes=size, content_encoding=compression)
 
     def retrieve(self, file_id: str) -> FileObject:
         if not file_id:
             raise ValueError(f"Expected a non-empty value for `file_id` but received {file_id!r}")
-        return self._get(
+        return self._call(
+            self._get,
             f"/v1/files/{file_id}",
             cast_to=FileObject,
         )
 
     def list(self) -> List[FileObject]:
-        return self._get(
+        return self._call(
+            self._get,
             "/v1/files",
             cast_to=List[FileObject],
         )
@@ -64,12 +171,13 @@ class Files(SyncAPIResource):
     def delete(self, file_id: str) -> None:
         if not file_id:
             raise ValueError(f"Expected a non-empty value for `file_id` but received {file_id!r}")
-        self._delete(f"/v1/files/{file_id}", cast_to=Union[None])
+        self._call(self._delete, f"/v1/files/{file_id}", cast_to=Union[None])
 
     def retrieve_url(self, file_id: str) -> FilePresigned:
         if not file_id:
             raise ValueError(f"Expected a non-empty value for `file_id` but received {file_id!r}")
-        res: FilePresigned = self._get(
+        res: FilePresigned = self._call(
+            self._get,
             f"/v1/files/{file_id}/presigned_url",
             cast_to=FilePresigned,
         )
@@ -77,50 +185,69 @@ class Files(SyncAPIResource):
         return res
 
 
-class AsyncFiles(AsyncAPIResource):
+class AsyncFiles(NetMindAsyncResource):
     async def create(
             self,
             file: Path | str,
             *,
             purpose: FilePurpose | str = FilePurpose.fine_tune,
-    ) -> FileId:
-        file_name = Path(file).name if isinstance(file, (Path, str)) else None
-        assert file_name is not None, "File must be a path or string representing the file path."
+            compression: Optional[str] = None,
+            validate: bool = False,
+            deadline: Optional[float] = None,
+    ) -> FileUpload:
+        """Upload a local file, see `Files.create`."""
+        async with cancel_at_deadline(deadline):
+            file_name = Path(file).name if isinstance(file, (Path, str)) else None
+            assert file_name is not None, "File must be a path or string representing the file path."
+            _check_compression(compression, purpose)
+            if _check_validate(validate, purpose):
+                _raise_for_report(await asyncio.to_thread(validate_jsonl, file, purpose=purpose))
 
-        with open(file, 'rb') as f:
-            file_bytes = f.read()
-            mime = filetype.guess_mime(f)
+            with open(file, 'rb') as f:
+                mime = sniff_mime(f)
+                raw_size = os.fstat(f.fileno()).st_size
 
-        presign_url: FilePresigned = await self._post(
-            "/v1/files",
-            body={
-                "file_name": sanitize_filename(file_name),
-                "purpose": purpose
-            },
-            cast_to=FilePresigned,
-            options={"headers": {"file-content-type": mime}} if mime else {}
-        )
+                presign_url: FilePresigned = await self._call(
+                    self._post,
+                    "/v1/files",
+                    body={
+                        "file_name": sanitize_filename(file_name),
+                        "purpose": purpose
+                    },
+                    cast_to=FilePresigned,
+                    options={"headers": {"file-content-type": mime}} if mime else {}
+                )
 
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                presign_url.presigned_url,
-                content=file_bytes,
-                headers={"Content-Type": mime} if mime else {},
-                timeout=300
-            )
-            response.raise_for_status()
-        return FileId(id=presign_url.id)
+                body, size = f, raw_size
+                if compression:
+                    body, raw_size, size = await asyncio.to_thread(compress_file, f, compression)
+                try:
+                    # reuse the connection pool of the API client instead of a one-off client
+                    with raise_on_expiry():
+                        response = await self._client._client.put(
+                            str(presign_url.presigned_url),
+                            content=_aiter_chunks(body),
+                            headers=_upload_headers(mime, size, compression),
+                            timeout=trim_timeout(300)
+                        )
+                finally:
+                    if body is not f:
+                        body.close()
+                response.raise_for_status()
+            return FileUpload(id=presign_url.id, raw_bytes=raw_size, uploaded_bytes=size, content_encoding=compression)
 
     async def retrieve(self, file_id: str) -> FileObject:
         if not file_id:
             raise ValueError(f"Expected a non-empty value for `file_id` but received {file_id!r}")
-        return await self._get(
+        return await self._call(
+            self._get,
             f"/v1/files/{file_id}",
             cast_to=FileObject,
         )
 
     async def list(self) -> List[FileObject]:
-        return await self._get(
+        return await self._call(
+            self._get,
             "/v1/files",
             cast_to=List[FileObject],
         )
@@ -128,12 +255,13 @@ class AsyncFiles(AsyncAPIResource):
     async def delete(self, file_id: str) -> None:
         if not file_id:
             raise ValueError(f"Expected a non-empty value for `file_id` but received {file_id!r}")
-        await self._delete(f"/v1/files/{file_id}", cast_to=Union[None])
+        await self._call(self._delete, f"/v1/files/{file_id}", cast_to=Union[None])
 
     async def retrieve_url(self, file_id: str) -> FilePresigned:
         if not file_id:
             raise ValueError(f"Expected a non-empty value for `file_id` but received {file_id!r}")
-        res: FilePresigned = await self._get(
+        res: FilePresigned = await self._call(
+            self._get,
             f"/v1/files/{file_id}/presigned_url",
             cast_to=FilePresigned,
         )
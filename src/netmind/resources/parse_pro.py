@@ -1,10 +1,28 @@
 import os
 import re
+import json
+import hashlib
+import time
+import asyncio
+import tempfile
+import contextvars
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
-from typing import List, Union, overload, TYPE_CHECKING
-from openai._resource import SyncAPIResource, AsyncAPIResource
+from typing import (
+    Any, AsyncIterator, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Union, overload, TYPE_CHECKING
+)
+import httpx
+from openai._constants import RAW_RESPONSE_HEADER
 
+from netmind._pdf import split_pdf, merge_results
+from netmind._pipeline import run_pipeline
+from netmind._streaming import JsonArrayDecoder
+from netmind.cache import Cache
+from netmind.deadlines import use_deadline, cancel_at_deadline, trim_sleep
+from netmind.exceptions import NetMindError
+from netmind.journal import ParseJournalEntry, TaskJournal
+from netmind.resources.abstract import NetMindSyncResource, NetMindAsyncResource
 from netmind.types.files import FilePurpose
 from netmind.types.parse_pro import (
     Formt, JsonFormat, MarkdownFormat,
@@ -21,11 +39,115 @@ def is_url(s: str) -> bool:
     return parsed.scheme in ("http", "https") and bool(parsed.netloc)
 
 
-class ParsePro(SyncAPIResource):
+def _local_file(source: Union[str, Path]) -> str:
+    source = str(source)
+    if source.startswith("file-") or is_url(source):
+        raise ValueError(f"Expected a local file path but received {source!r}")
+    if not os.path.isfile(source):
+        raise FileNotFoundError(source)
+    return source
+
+
+def source_digest(source: Union[str, Path]) -> Optional[str]:
+    """Identify the content of a parse source.
+
+    Local files are identified by the sha256 of their bytes and uploaded files by their id.
+    Urls return None, since the content behind them may change.
+    """
+    source = str(source)
+    if source.startswith("file-"):
+        return source
+    if is_url(source):
+        return None
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def _result_key(digest: str, format: Formt | str, mode: Optional[str], figure_parsing: bool) -> str:
+    return f"parse-pro:{digest}:{Formt(format).value}:{mode}:{bool(figure_parsing)}"
+
+
+def _task_key(task_id: str) -> str:
+    return f"parse-pro-task:{task_id}"
+
+
+def _load_result(cache: Cache, key: Optional[str]) -> Optional[Union[JsonFormat, MarkdownFormat]]:
+    if key is None:
+        return None
+    data = cache.get(key)
+    return None if data is None else json.loads(data)
+
+
+def _store_result(cache: Cache, key: Optional[str], result: Union[JsonFormat, MarkdownFormat, None]) -> None:
+    if key is not None and result is not None:
+        cache.set(key, json.dumps(result, ensure_ascii=False).encode())
+
+
+def _load_task(cache: Cache, task_id: str) -> Optional[ParseTaskResult]:
+    data = cache.get(_task_key(task_id))
+    return None if data is None else ParseTaskResult.model_validate_json(data)
+
+
+def _store_task(cache: Cache, result: ParseTaskResult) -> None:
+    if result.is_finished():
+        cache.set(_task_key(result.task_id), result.model_dump_json(warnings=False).encode())
+
+
+def _write_jsonl(sink: IO[str], block: Dict[str, Any]) -> None:
+    sink.write(json.dumps(block, ensure_ascii=False))
+    sink.write("\n")
+
+
+def _status(result: ParseTaskResult) -> str:
+    # responses are constructed without validation, so the status may still be a plain string
+    return getattr(result.status, "value", result.status)
+
+
+def _task_data(result: ParseTaskResult) -> Union[JsonFormat, MarkdownFormat]:
+    if not result.is_successful():
+        raise NetMindError(
+            f"Parse task {result.task_id} finished with status {_status(result)}: "
+            f"{result.error or 'no data'}"
+        )
+    return result.data
+
+
+class ParsePro(NetMindSyncResource):
 
     def __init__(self, netmind_client: 'NetMind', openai_client: 'OpenAI'):
         self.client = netmind_client
-        super().__init__(openai_client)
+        super().__init__(openai_client, lean=netmind_client.lean_responses)
+
+    @property
+    def cache(self) -> Optional[Cache]:
+        return self.client.parse_cache
+
+    @property
+    def journal(self) -> Optional[TaskJournal]:
+        return self.client.parse_journal
+
+    def _cache_key(
+            self, source: Union[str, Path], format: Formt | str, mode: Optional[str], figure_parsing: bool
+    ) -> Optional[str]:
+        if self.cache is None:
+            return None
+        digest = source_digest(source)
+        return None if digest is None else _result_key(digest, format, mode, figure_parsing)
+
+    def invalidate(
+            self,
+            source: Union[str, Path],
+            format: Formt = Formt.markdown,
+            mode: str = None,
+            figure_parsing: bool = False,
+    ) -> None:
+        """Drop the cached result of parsing `source` with these options."""
+        key = self._cache_key(source, format, mode, figure_parsing)
+        if key is not None:
+            self.cache.delete(key)
 
     def _prepare_source(self, source: Union[str, Path]) -> str:
         if isinstance(source, Path):
@@ -59,15 +181,115 @@ class ParsePro(SyncAPIResource):
             timeout: float = 5 * 60,
             mode: str = None,
             figure_parsing: bool = False,
+            deadline: Optional[float] = None,
     ) -> Union[JsonFormat, MarkdownFormat]:
+        with use_deadline(deadline):
+            key = self._cache_key(source, format, mode, figure_parsing)
+            if key is not None:
+                cached = _load_result(self.cache, key)
+                if cached is not None:
+                    return cached
+            source = self._prepare_source(source)
+            response = self._call(
+                self._post,
+                "/inference-api/agent/v1/parse-pdf",
+                body={"url": source, "format": format, "mode": mode, "figure_parsing": figure_parsing},
+                options={'timeout': timeout},
+                cast_to = Union[JsonFormat, MarkdownFormat],
+            )
+            if key is not None:
+                _store_result(self.cache, key, response)
+            return response
+
+    def parse_stream(
+            self,
+            source: Union[str, Path],
+            timeout: float = 5 * 60,
+            mode: str = None,
+            figure_parsing: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """Parse a document as json and yield its blocks one by one while the response is read.
+
+        Unlike `parse(format="json")` the blocks are never held in memory all together.
+        The source is prepared and the request sent on the first iteration.
+        """
         source = self._prepare_source(source)
-        response = self._post(
+        response: httpx.Response = self._post(
             "/inference-api/agent/v1/parse-pdf",
-            body={"url": source, "format": format, "mode": mode, "figure_parsing": figure_parsing},
-            options={'timeout': timeout},
-            cast_to = Union[JsonFormat, MarkdownFormat],
+            body={"url": source, "format": Formt.json, "mode": mode, "figure_parsing": figure_parsing},
+            options={'timeout': timeout, 'headers': {RAW_RESPONSE_HEADER: "stream"}},
+            cast_to=httpx.Response,
+        )
+        try:
+            decoder = JsonArrayDecoder()
+            for chunk in response.iter_bytes():
+                yield from decoder.feed(chunk)
+            yield from decoder.close()
+        finally:
+            response.close()
+
+    def parse_to_jsonl(
+            self,
+            source: Union[str, Path],
+            sink: Union[str, Path, IO[str]],
+            timeout: float = 5 * 60,
+            mode: str = None,
+            figure_parsing: bool = False,
+    ) -> int:
+        """Stream the json blocks of a document into a JSONL file, returns the number of blocks."""
+        if isinstance(sink, (str, Path)):
+            with open(sink, "w", encoding="utf-8") as f:
+                return self.parse_to_jsonl(source, f, timeout=timeout, mode=mode, figure_parsing=figure_parsing)
+        count = 0
+        for block in self.parse_stream(source, timeout=timeout, mode=mode, figure_parsing=figure_parsing):
+            _write_jsonl(sink, block)
+            count += 1
+        return count
+
+    def parse_many(
+            self,
+            sources: Iterable[Union[str, Path]],
+            format: Formt = Formt.markdown,
+            timeout: float = 5 * 60,
+            mode: str = None,
+            figure_parsing: bool = False,
+            *,
+            upload_workers: int = 4,
+            parse_workers: int = 4,
+            max_pending: Optional[int] = None,
+            return_exceptions: bool = False,
+    ) -> Iterator[Union[JsonFormat, MarkdownFormat, Exception]]:
+        """Parse many documents, overlapping the upload of one with the parsing of the others.
+
+        Sources go through an upload stage (`files.create` and `files.retrieve_url`) on
+        `upload_workers` threads, then a parse stage on `parse_workers` threads. No more than
+        `max_pending` documents (default: the sum of the workers) are in flight, so uploads
+        never run far ahead of parsing. Results are yielded in the order of `sources`; with
+        `return_exceptions=True` a failed document yields its exception instead of stopping
+        the iteration.
+        """
+        def prepare(source):
+            key = self._cache_key(source, format, mode, figure_parsing)
+            cached = _load_result(self.cache, key) if key is not None else None
+            if cached is not None:
+                return key, None, cached
+            return key, self._prepare_source(source), None
+
+        def parse(prepared):
+            key, url, cached = prepared
+            if url is None:
+                return cached
+            result = self.parse(url, format=format, timeout=timeout, mode=mode, figure_parsing=figure_parsing)
+            if key is not None:
+                _store_result(self.cache, key, result)
+            return result
+
+        return run_pipeline(
+            sources,
+            [(prepare, upload_workers), (parse, parse_workers)],
+            max_pending=max_pending,
+            return_exceptions=return_exceptions,
         )
-        return response
 
     @overload
     def aparse(self, source: str) -> Union[JsonFormat, MarkdownFormat]: ...
@@ -81,32 +303,154 @@ class ParsePro(SyncAPIResource):
             format: Formt = Formt.markdown,
             timeout: float = 5 * 60,
             mode: str = None,
-            figure_parsing: bool = False
+            figure_parsing: bool = False,
+            deadline: Optional[float] = None,
     ) -> ParseTask:
-        source = self._prepare_source(source)
-        response = self._post(
-            "/inference-api/agent/v1/parse-pdf/async",
-            body={"url": source, "format": format, "mode": mode, "figure_parsing": figure_parsing},
-            options={'timeout': timeout},
-            cast_to=ParseTask,
-        )
-        return response
+        with use_deadline(deadline):
+            digest = source_digest(source) if self.journal is not None else None
+            if digest is not None:
+                entry = self.journal.find(digest, format=format, mode=mode, figure_parsing=figure_parsing)
+                if entry is not None:
+                    return ParseTask(task_id=entry.task_id, status=entry.status)
+            original = str(source)
+            source = self._prepare_source(source)
+            response = self._call(
+                self._post,
+                "/inference-api/agent/v1/parse-pdf/async",
+                body={"url": source, "format": format, "mode": mode, "figure_parsing": figure_parsing},
+                options={'timeout': timeout},
+                cast_to=ParseTask,
+            )
+            if digest is not None:
+                self.journal.record(
+                    response.task_id, digest, format=format, mode=mode, figure_parsing=figure_parsing,
+                    status=response.status, source=original,
+                )
+            return response
 
     def aresult(self, task_id: str) -> ParseTaskResult:
         if not task_id:
             raise ValueError(f"Expected a non-empty value for `task_id` but received {task_id!r}")
 
-        response = self._get(
-            f"/inference-api/agent/v1/parse-pdf/async/{task_id}",
-            cast_to=ParseTaskResult,
-        )
+        response = None if self.cache is None else _load_task(self.cache, task_id)
+        if response is None:
+            response = self._call(
+                self._get,
+                f"/inference-api/agent/v1/parse-pdf/async/{task_id}",
+                cast_to=ParseTaskResult,
+            )
+            if self.cache is not None:
+                _store_task(self.cache, response)
+        # results served from the cache are recorded as well, so resume() does not poll them again
+        if self.journal is not None:
+            self.journal.update(task_id, response.status)
         return response
 
+    def wait(self, task_id: str, poll_interval: float = 3, timeout: Optional[float] = None) -> ParseTaskResult:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            result = self.aresult(task_id)
+            if result.is_finished():
+                return result
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                raise NetMindError(
+                    f"Timed out waiting for parse task {task_id}, last status: {_status(result)}"
+                )
+            time.sleep(trim_sleep(poll_interval))
+
+    def resume(
+            self, poll_interval: float = 3, timeout: Optional[float] = None
+    ) -> Iterator[Tuple[ParseJournalEntry, ParseTaskResult]]:
+        """Poll the outstanding tasks of the journal, yielding each one once it has finished.
+
+        Use it after a restart to pick up the tasks submitted by a previous process.
+        """
+        if self.journal is None:
+            raise NetMindError("Resuming parse tasks requires a client created with a `parse_journal`")
+        pending = self.journal.outstanding()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while pending:
+            waiting = []
+            for entry in pending:
+                result = self.aresult(entry.task_id)
+                if result.is_finished():
+                    yield entry, result
+                else:
+                    waiting.append(entry)
+            pending = waiting
+            if not pending:
+                break
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                raise NetMindError(f"Timed out waiting for {len(pending)} journaled parse tasks")
+            time.sleep(trim_sleep(poll_interval))
 
-class AsyncParsePro(AsyncAPIResource):
+    def parse_split(
+            self,
+            source: Union[str, Path],
+            format: Formt = Formt.markdown,
+            pages_per_shard: int = 50,
+            max_concurrency: int = 8,
+            mode: str = None,
+            figure_parsing: bool = False,
+            poll_interval: float = 3,
+            timeout: Optional[float] = None,
+            deadline: Optional[float] = None,
+    ) -> Union[JsonFormat, MarkdownFormat]:
+        """Parse a large local PDF as page-range shards submitted concurrently through `aparse`.
+
+        The shard results are stitched back together in page order: json blocks are
+        concatenated with their page numbers shifted to the source document, markdown
+        texts are joined with blank lines. `timeout` bounds the wait for each shard.
+        Requires the `pypdf` package.
+        """
+        with use_deadline(deadline):
+            source = _local_file(source)
+            with tempfile.TemporaryDirectory(prefix="netmind-split-") as directory:
+                shards = split_pdf(source, pages_per_shard, directory)
+
+                def parse_shard(shard):
+                    task = self.aparse(shard.path, format=format, mode=mode, figure_parsing=figure_parsing)
+                    return _task_data(self.wait(task.task_id, poll_interval=poll_interval, timeout=timeout))
+
+                with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(shards)))) as pool:
+                    # shards run in the caller's context, so they share its deadline
+                    futures = [pool.submit(contextvars.copy_context().run, parse_shard, shard) for shard in shards]
+                    results = [future.result() for future in futures]
+            return merge_results(format, shards, results)
+
+
+class AsyncParsePro(NetMindAsyncResource):
     def __init__(self, netmind_client: 'AsyncNetMind', openai_client: 'AsyncOpenAI'):
         self.client = netmind_client
-        super().__init__(openai_client)
+        super().__init__(openai_client, lean=netmind_client.lean_responses)
+
+    @property
+    def cache(self) -> Optional[Cache]:
+        return self.client.parse_cache
+
+    @property
+    def journal(self) -> Optional[TaskJournal]:
+        return self.client.parse_journal
+
+    async def _cache_key(
+            self, source: Union[str, Path], format: Formt | str, mode: Optional[str], figure_parsing: bool
+    ) -> Optional[str]:
+        if self.cache is None:
+            return None
+        digest = await asyncio.to_thread(source_digest, source)
+        return None if digest is None else _result_key(digest, format, mode, figure_parsing)
+
+    async def invalidate(
+            self,
+            source: Union[str, Path],
+            format: Formt = Formt.markdown,
+            mode: str = None,
+            figure_parsing: bool = False,
+    ) -> None:
+        """Drop the cached result of parsing `source` with these options."""
+        key = await self._cache_key(source, format, mode, figure_parsing)
+        if key is not None:
+            await asyncio.to_thread(self.cache.delete, key)
 
     async def _prepare_source(self, source: Union[str, Path]) -> str:
         if isinstance(source, Path):
@@ -137,16 +481,74 @@ class AsyncParsePro(AsyncAPIResource):
             self,
             source: Union[str, Path],
             format: Formt = Formt.markdown,
-            timeout: float = 5 * 60
+            timeout: float = 5 * 60,
+            mode: str = None,
+            figure_parsing: bool = False,
+            deadline: Optional[float] = None,
     ) -> Union[JsonFormat, MarkdownFormat]:
+        async with cancel_at_deadline(deadline):
+            key = await self._cache_key(source, format, mode, figure_parsing)
+            if key is not None:
+                cached = await asyncio.to_thread(_load_result, self.cache, key)
+                if cached is not None:
+                    return cached
+            source = await self._prepare_source(source)
+            response = await self._call(
+                self._post,
+                "/inference-api/agent/v1/parse-pdf",
+                body={"url": source, "format": format, "mode": mode, "figure_parsing": figure_parsing},
+                options={'timeout': timeout},
+                cast_to=Union[JsonFormat, MarkdownFormat],
+            )
+            if key is not None:
+                await asyncio.to_thread(_store_result, self.cache, key, response)
+            return response
+
+    async def parse_stream(
+            self,
+            source: Union[str, Path],
+            timeout: float = 5 * 60,
+            mode: str = None,
+            figure_parsing: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Parse a document as json and yield its blocks one by one while the response is read.
+
+        See `ParsePro.parse_stream`.
+        """
         source = await self._prepare_source(source)
-        response = await self._post(
+        response: httpx.Response = await self._post(
             "/inference-api/agent/v1/parse-pdf",
-            body={"url": source, "format": format},
-            options={'timeout': timeout},
-            cast_to=Union[JsonFormat, MarkdownFormat],
+            body={"url": source, "format": Formt.json, "mode": mode, "figure_parsing": figure_parsing},
+            options={'timeout': timeout, 'headers': {RAW_RESPONSE_HEADER: "stream"}},
+            cast_to=httpx.Response,
         )
-        return response
+        try:
+            decoder = JsonArrayDecoder()
+            async for chunk in response.aiter_bytes():
+                for block in decoder.feed(chunk):
+                    yield block
+            for block in decoder.close():
+                yield block
+        finally:
+            await response.aclose()
+
+    async def parse_to_jsonl(
+            self,
+            source: Union[str, Path],
+            sink: Union[str, Path, IO[str]],
+            timeout: float = 5 * 60,
+            mode: str = None,
+            figure_parsing: bool = False,
+    ) -> int:
+        """Stream the json blocks of a document into a JSONL file, returns the number of blocks."""
+        if isinstance(sink, (str, Path)):
+            with open(sink, "w", encoding="utf-8") as f:
+                return await self.parse_to_jsonl(source, f, timeout=timeout, mode=mode, figure_parsing=figure_parsing)
+        count = 0
+        async for block in self.parse_stream(source, timeout=timeout, mode=mode, figure_parsing=figure_parsing):
+            _write_jsonl(sink, block)
+            count += 1
+        return count
 
     @overload
     async def aparse(self, source: str) -> Union[JsonFormat, MarkdownFormat]: ...
@@ -158,23 +560,115 @@ class AsyncParsePro(AsyncAPIResource):
             self,
             source: Union[str, Path],
             format: Formt = Formt.markdown,
-            timeout: float = 5 * 60
+            timeout: float = 5 * 60,
+            mode: str = None,
+            figure_parsing: bool = False,
+            deadline: Optional[float] = None,
     ) -> ParseTask:
-        source = await self._prepare_source(source)
-        response = await self._post(
-            "/inference-api/agent/v1/parse-pdf/async",
-            body={"url": source, "format": format},
-            options={'timeout': timeout},
-            cast_to=ParseTask,
-        )
-        return response
+        async with cancel_at_deadline(deadline):
+            digest = await asyncio.to_thread(source_digest, source) if self.journal is not None else None
+            if digest is not None:
+                entry = await asyncio.to_thread(
+                    self.journal.find, digest, format=format, mode=mode, figure_parsing=figure_parsing
+                )
+                if entry is not None:
+                    return ParseTask(task_id=entry.task_id, status=entry.status)
+            original = str(source)
+            source = await self._prepare_source(source)
+            response = await self._call(
+                self._post,
+                "/inference-api/agent/v1/parse-pdf/async",
+                body={"url": source, "format": format, "mode": mode, "figure_parsing": figure_parsing},
+                options={'timeout': timeout},
+                cast_to=ParseTask,
+            )
+            if digest is not None:
+                await asyncio.to_thread(
+                    self.journal.record, response.task_id, digest, format=format, mode=mode,
+                    figure_parsing=figure_parsing, status=response.status, source=original,
+                )
+            return response
 
     async def aresult(self, task_id: str) -> ParseTaskResult:
         if not task_id:
             raise ValueError(f"Expected a non-empty value for `task_id` but received {task_id!r}")
 
-        response = await self._get(
-            f"/inference-api/agent/v1/parse-pdf/async/{task_id}",
-            cast_to=ParseTaskResult,
-        )
+        response = None if self.cache is None else await asyncio.to_thread(_load_task, self.cache, task_id)
+        if response is None:
+            response = await self._call(
+                self._get,
+                f"/inference-api/agent/v1/parse-pdf/async/{task_id}",
+                cast_to=ParseTaskResult,
+            )
+            if self.cache is not None:
+                await asyncio.to_thread(_store_task, self.cache, response)
+        # results served from the cache are recorded as well, so resume() does not poll them again
+        if self.journal is not None:
+            await asyncio.to_thread(self.journal.update, task_id, response.status)
         return response
+
+    async def wait(self, task_id: str, poll_interval: float = 3, timeout: Optional[float] = None) -> ParseTaskResult:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            result = await self.aresult(task_id)
+            if result.is_finished():
+                return result
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                raise NetMindError(
+                    f"Timed out waiting for parse task {task_id}, last status: {_status(result)}"
+                )
+            await asyncio.sleep(trim_sleep(poll_interval))
+
+    async def resume(
+            self, poll_interval: float = 3, timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[ParseJournalEntry, ParseTaskResult]]:
+        """Poll the outstanding tasks of the journal concurrently, yielding each one once it has finished.
+
+        See `ParsePro.resume`.
+        """
+        if self.journal is None:
+            raise NetMindError("Resuming parse tasks requires a client created with a `parse_journal`")
+        entries = await asyncio.to_thread(self.journal.outstanding)
+
+        async def finish(entry: ParseJournalEntry) -> Tuple[ParseJournalEntry, ParseTaskResult]:
+            return entry, await self.wait(entry.task_id, poll_interval=poll_interval, timeout=timeout)
+
+        for future in asyncio.as_completed([finish(entry) for entry in entries]):
+            yield await future
+
+    async def parse_split(
+            self,
+            source: Union[str, Path],
+            format: Formt = Formt.markdown,
+            pages_per_shard: int = 50,
+            max_concurrency: int = 8,
+            mode: str = None,
+            figure_parsing: bool = False,
+            poll_interval: float = 3,
+            timeout: Optional[float] = None,
+            deadline: Optional[float] = None,
+    ) -> Union[JsonFormat, MarkdownFormat]:
+        """Parse a large local PDF as page-range shards submitted concurrently through `aparse`.
+
+        See `ParsePro.parse_split`.
+        """
+        async with cancel_at_deadline(deadline):
+            source = _local_file(source)
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+            async def parse_shard(shard):
+                async with semaphore:
+                    task = await self.aparse(shard.path, format=format, mode=mode, figure_parsing=figure_parsing)
+                return _task_data(await self.wait(task.task_id, poll_interval=poll_interval, timeout=timeout))
+
+            with tempfile.TemporaryDirectory(prefix="netmind-split-") as directory:
+                shards = await asyncio.to_thread(split_pdf, source, pages_per_shard, directory)
+                # the shards read their files from the directory, so none may outlive it
+                tasks = [asyncio.ensure_future(parse_shard(shard)) for shard in shards]
+                try:
+                    results = await asyncio.gather(*tasks)
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+            return merge_results(format, shards, results)
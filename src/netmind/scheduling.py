@@ -0,0 +1,175 @@
+import os
+import time
+import asyncio
+import contextlib
+import contextvars
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+from netmind.concurrency import CHAT, EMBEDDINGS, PARSE, CODE_INTERPRETER, FILES
+from netmind.types.scheduling import PriorityMetrics
+
+# priority classes, most urgent first
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BATCH, BACKGROUND)
+
+# per-call priority, e.g. `extra_headers={PRIORITY_HEADER: "background"}`; not sent upstream
+PRIORITY_HEADER = "X-NetMind-Priority"
+# request extension the clients move the header to, where the scheduler reads it
+PRIORITY_EXTENSION = "netmind_priority"
+
+DEFAULT_WEIGHTS: Dict[str, float] = {INTERACTIVE: 8, BATCH: 2, BACKGROUND: 1}
+DEFAULT_FAMILY_PRIORITIES: Dict[str, str] = {
+    CHAT: INTERACTIVE,
+    CODE_INTERPRETER: INTERACTIVE,
+    EMBEDDINGS: BATCH,
+    PARSE: BATCH,
+    FILES: BATCH,
+}
+
+_current_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("netmind_priority", default=None)
+
+
+def _check_priority(priority: str) -> str:
+    if priority not in PRIORITIES:
+        raise ValueError(f"Expected a priority in {PRIORITIES} but received {priority!r}")
+    return priority
+
+
+@contextlib.contextmanager
+def use_priority(priority: str) -> Iterator[None]:
+    """Run the requests made inside the block, including those of composite calls, at `priority`."""
+    token = _current_priority.set(_check_priority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class PriorityScheduler:
+    """Shares `capacity` in-flight requests of a client between priority classes.
+
+    Waiting requests are served by weighted fair queuing across the classes (by default
+    interactive 8, batch 2, background 1), and `reserved` slots are kept for interactive
+    requests so bulk work can never take the whole capacity. A request's class comes from
+    the `PRIORITY_HEADER` header, then `use_priority`, then its endpoint family.
+    """
+
+    def __init__(
+            self,
+            capacity: int = 64,
+            *,
+            weights: Optional[Dict[str, float]] = None,
+            reserved: Optional[int] = None,
+            families: Optional[Dict[str, str]] = None,
+            default: str = BATCH,
+    ):
+        if capacity < 1:
+            raise ValueError(f"Expected a positive `capacity` but received {capacity!r}")
+        self.capacity = capacity
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.reserved = min(capacity - 1, max(1, capacity // 8) if reserved is None else reserved)
+        self.families = {**DEFAULT_FAMILY_PRIORITIES, **(families or {})}
+        self.default = _check_priority(default)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._queues: Dict[str, Deque[Tuple[asyncio.Future, float]]] = {p: deque() for p in PRIORITIES}
+        # weighted fair queuing: virtual finish time of every class and the current virtual time
+        self._finish = {p: 0.0 for p in PRIORITIES}
+        self._virtual_time = 0.0
+        self.in_flight = 0
+        self._in_flight = {p: 0 for p in PRIORITIES}
+        self._dispatched = {p: 0 for p in PRIORITIES}
+        self._waited = {p: 0.0 for p in PRIORITIES}
+
+    def __getstate__(self):
+        return {
+            "capacity": self.capacity, "weights": self.weights, "reserved": self.reserved,
+            "families": self.families, "default": self.default,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def classify(self, family: Optional[str], header: Optional[str] = None) -> str:
+        if header:
+            return _check_priority(header.strip().lower())
+        priority = _current_priority.get()
+        if priority is not None:
+            return priority
+        return self.families.get(family, self.default) if family is not None else self.default
+
+    def _limit(self, priority: str) -> int:
+        return self.capacity if priority == INTERACTIVE else self.capacity - self.reserved
+
+    def _start(self, priority: str, waited: float = 0.0) -> None:
+        start = max(self._finish[priority], self._virtual_time)
+        self._virtual_time = start
+        self._finish[priority] = start + 1 / self.weights[priority]
+        self.in_flight += 1
+        self._in_flight[priority] += 1
+        self._dispatched[priority] += 1
+        self._waited[priority] += waited
+
+    async def acquire(self, priority: str) -> None:
+        if self._pid != os.getpid():
+            # slots held by the parent's requests at fork time are not ours to release
+            self._reset()
+        queue = self._queues[priority]
+        if not queue and self.in_flight < self._limit(priority):
+            self._start(priority)
+            return
+        if not queue:
+            # an idle class does not bank credit for the time it had nothing to send
+            self._finish[priority] = max(self._finish[priority], self._virtual_time)
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append((waiter, time.monotonic()))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just before the cancellation
+                self.release(priority)
+            else:
+                for entry in queue:
+                    if entry[0] is waiter:
+                        queue.remove(entry)
+                        break
+            raise
+
+    def release(self, priority: str) -> None:
+        self.in_flight -= 1
+        self._in_flight[priority] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while True:
+            candidates = [
+                p for p in PRIORITIES
+                if self._queues[p] and self.in_flight < self._limit(p)
+            ]
+            if not candidates:
+                return
+            priority = min(candidates, key=lambda p: (self._finish[p], PRIORITIES.index(p)))
+            waiter, enqueued = self._queues[priority].popleft()
+            if waiter.done():
+                continue
+            self._start(priority, time.monotonic() - enqueued)
+            waiter.set_result(None)
+
+    def metrics(self) -> Dict[str, PriorityMetrics]:
+        return {
+            p: PriorityMetrics(
+                priority=p,
+                weight=self.weights[p],
+                in_flight=self._in_flight[p],
+                waiting=len(self._queues[p]),
+                dispatched=self._dispatched[p],
+                mean_wait_ms=round(self._waited[p] / self._dispatched[p] * 1000, 3) if self._dispatched[p] else None,
+            )
+            for p in PRIORITIES
+        }
@@ -0,0 +1,19 @@
+from typing import Optional
+from netmind.types.abstract import BaseModel
+
+
+class ConcurrencyMetrics(BaseModel):
+    family: str
+    # current number of requests allowed in flight
+    limit: int
+    in_flight: int
+    waiting: int
+    successes: int
+    # responses with status 429
+    throttled: int
+    # 5xx responses, timeouts and connection errors
+    failures: int
+    # latency spikes that cut the limit
+    slowdowns: int
+    latency_ms: Optional[float] = None
+    baseline_latency_ms: Optional[float] = None
@@ -0,0 +1,12 @@
+from netmind.types.abstract import BaseModel
+
+
+class EmbeddingMatrixResult(BaseModel):
+    path: str
+    rows: int
+    dim: int
+    # rows embedded by this call
+    embedded: int
+    # rows found already written by an earlier, interrupted call
+    skipped: int
+    total_tokens: int = 0
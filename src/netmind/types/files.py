@@ -16,6 +16,12 @@ class FileId(BaseModel):
     id: str
 
 
+class FileUpload(FileId):
+    raw_bytes: int
+    uploaded_bytes: int
+    content_encoding: Optional[str] = None
+
+
 class FilePresigned(FileId):
     presigned_url: HttpUrl | URL
 
@@ -0,0 +1,113 @@
+import json
+import types
+import inspect
+from typing import Any, Dict, List, Type, Union, get_args, get_origin
+
+import httpx
+import pydantic
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on the environment
+    loads = json.loads
+
+
+def _model_class(annotation: Any) -> Any:
+    """Return the model class an annotation refers to, unwrapping Optional and List."""
+    origin = get_origin(annotation)
+    if origin is Union or origin is types.UnionType:
+        candidates = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _model_class(candidates[0]) if len(candidates) == 1 else None
+    if origin in (list, List):
+        args = get_args(annotation)
+        inner = _model_class(args[0]) if args else None
+        return None if inner is None else List[inner]
+    if inspect.isclass(annotation) and issubclass(annotation, pydantic.BaseModel):
+        return annotation
+    return None
+
+
+def _wrap(value: Any, annotation: Any) -> Any:
+    target = _model_class(annotation)
+    if target is None:
+        return value
+    if get_origin(target) in (list, List):
+        if isinstance(value, list):
+            return [_wrap(item, get_args(target)[0]) for item in value]
+        return value
+    if isinstance(value, dict):
+        return LeanModel(value, target)
+    return value
+
+
+class LeanModel:
+    """A read-only view over a decoded json object, standing in for a pydantic model.
+
+    Fields are read straight from the decoded dict without validation. Helper methods
+    defined by the model class (like `ParseTaskResult.is_successful`) run against the view,
+    anything else (`model_dump`, ...) builds the real model on first use.
+    """
+
+    __slots__ = ("_data", "_model_cls", "_model")
+
+    def __init__(self, data: Dict[str, Any], model_cls: Type[pydantic.BaseModel]):
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_model_cls", model_cls)
+        object.__setattr__(self, "_model", None)
+
+    def __getattr__(self, name: str) -> Any:
+        data = self._data
+        fields = self._model_cls.model_fields
+        if name in data:
+            field = fields.get(name)
+            return data[name] if field is None else _wrap(data[name], field.annotation)
+        if name in fields:
+            return fields[name].get_default(call_default_factory=True)
+        for cls in self._model_cls.__mro__:
+            attr = cls.__dict__.get(name)
+            if attr is not None and cls.__module__.startswith("netmind.") and inspect.isfunction(attr):
+                return types.MethodType(attr, self)
+        return getattr(self.to_model(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._data[name] = value
+        if self._model is not None:
+            setattr(self._model, name, value)
+
+    def to_model(self) -> pydantic.BaseModel:
+        """Build (once) and return the pydantic model for this object."""
+        if self._model is None:
+            object.__setattr__(self, "_model", self._model_cls.construct(**self._data))
+        return self._model
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._data
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LeanModel):
+            return self._model_cls is other._model_cls and self._data == other._data
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self._data.items())
+        return f"{self._model_cls.__name__}({fields})"
+
+    def __getstate__(self):
+        return self._data, self._model_cls
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+def decode(response: httpx.Response, cast_to: Any) -> Any:
+    """Decode a response body into lean objects shaped after `cast_to`."""
+    if cast_to is type(None) or cast_to == Union[None]:
+        return None
+    content = response.content
+    if not content:
+        return None
+    if not response.headers.get("content-type", "application/json").split(";")[0].endswith("json"):
+        return response.text
+    return _wrap(loads(content), cast_to)
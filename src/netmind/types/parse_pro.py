@@ -25,6 +25,14 @@ class TaskStatus(str, Enum):
     ignored = "IGNORED"
 
 
+FINISHED_STATUSES = frozenset({
+    TaskStatus.success,
+    TaskStatus.failed,
+    TaskStatus.revoked,
+    TaskStatus.rejected,
+})
+
+
 class ParseTask(BaseModel):
     task_id: str
     status: str
@@ -41,4 +49,7 @@ class ParseTaskResult(BaseModel):
         return self.status == TaskStatus.success and self.data is not None
 
     def is_failed(self) -> bool:
-        return self.status == TaskStatus.failed and self.error is not None
\ No newline at end of file
+        return self.status == TaskStatus.failed and self.error is not None
+
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
\ No newline at end of file
@@ -0,0 +1,12 @@
+from typing import Optional
+from netmind.types.abstract import BaseModel
+
+
+class PriorityMetrics(BaseModel):
+    priority: str
+    weight: float
+    in_flight: int
+    waiting: int
+    dispatched: int
+    # average time spent queued by the dispatched requests
+    mean_wait_ms: Optional[float] = None
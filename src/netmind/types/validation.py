@@ -0,0 +1,33 @@
+from typing import List, Optional
+from netmind.types.abstract import BaseModel
+
+
+class LineError(BaseModel):
+    line: int
+    offset: int
+    message: str
+
+
+class ValidationReport(BaseModel):
+    path: str
+    purpose: str
+    lines: int
+    valid_lines: int
+    tokens: int
+    max_line_tokens: int
+    errors: List[LineError]
+    # more errors were found than `max_errors` allowed to report
+    truncated: bool = False
+
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    def summary(self, limit: Optional[int] = 5) -> str:
+        if self.is_valid():
+            return f"{self.path}: {self.lines} valid lines, {self.tokens} tokens"
+        shown = self.errors if limit is None else self.errors[:limit]
+        lines = [f"{self.path}: {self.lines - self.valid_lines} invalid lines out of {self.lines}"]
+        lines.extend(f"  line {error.line}: {error.message}" for error in shown)
+        if len(shown) < len(self.errors) or self.truncated:
+            lines.append("  ...")
+        return "\n".join(lines)
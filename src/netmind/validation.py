@@ -0,0 +1,177 @@
+import os
+import re
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from netmind.types.files import FilePurpose
+from netmind.types.lean import loads
+from netmind.types.validation import LineError, ValidationReport
+
+ROLES = ("system", "user", "assistant", "tool")
+# tokens added per message for the role and separators, as counted by chat models
+MESSAGE_OVERHEAD = 4
+RANGE_SIZE = 16 * 1024 * 1024
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Estimate the token count of `text` from its words and punctuation.
+
+    Pass an exact tokenizer to `validate_jsonl` when the estimate is not enough.
+    """
+    return len(_TOKEN.findall(text))
+
+
+def _content_text(content: Any) -> Optional[str]:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list) and all(isinstance(part, dict) for part in content):
+        return "".join(part.get("text", "") for part in content if part.get("type") == "text")
+    return None
+
+
+def _check_messages(messages: Any, tokenizer: Callable[[str], int], require_assistant: bool) -> Tuple[Optional[str], int]:
+    if not isinstance(messages, list) or not messages:
+        return "`messages` must be a non-empty list", 0
+    tokens = 0
+    has_assistant = False
+    for index, message in enumerate(messages):
+        if not isinstance(message, dict):
+            return f"messages[{index}] must be an object", 0
+        role = message.get("role")
+        if role not in ROLES:
+            return f"messages[{index}].role must be one of {', '.join(ROLES)}, found {role!r}", 0
+        content = message.get("content")
+        if content is None and role == "assistant" and message.get("tool_calls"):
+            text = ""
+        else:
+            text = _content_text(content)
+            if text is None:
+                return f"messages[{index}].content must be a string or a list of content parts", 0
+        has_assistant = has_assistant or role == "assistant"
+        tokens += tokenizer(text) + MESSAGE_OVERHEAD
+    if require_assistant and not has_assistant:
+        return "`messages` must contain at least one assistant message", 0
+    return None, tokens
+
+
+def check_record(record: Any, purpose: str, tokenizer: Callable[[str], int] = count_tokens) -> Tuple[Optional[str], int]:
+    """Check one decoded line, returns the error message (None when valid) and its token count."""
+    if not isinstance(record, dict):
+        return "line must be a json object", 0
+    if purpose == FilePurpose.batch.value:
+        for key in ("custom_id", "method", "url"):
+            if not isinstance(record.get(key), str):
+                return f"`{key}` must be a string", 0
+        body = record.get("body")
+        if not isinstance(body, dict):
+            return "`body` must be an object", 0
+        if "messages" in body:
+            return _check_messages(body["messages"], tokenizer, require_assistant=False)
+        return None, 0
+    if "messages" not in record:
+        return "missing `messages`", 0
+    return _check_messages(record["messages"], tokenizer, require_assistant=True)
+
+
+def line_ranges(path: str | os.PathLike, range_size: int = RANGE_SIZE) -> List[Tuple[int, int]]:
+    """Split a file into byte ranges of about `range_size` that start and end on line boundaries."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(start + range_size, size)
+            if end < size:
+                newline = mm.find(b"\n", end - 1)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _validate_range(
+        path: str, start: int, end: int, purpose: str, tokenizer: Callable[[str], int], max_errors: int
+) -> Tuple[int, int, int, int, List[Tuple[int, int, str]], int]:
+    lines = valid = tokens = max_tokens = error_count = 0
+    errors: List[Tuple[int, int, str]] = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            newline = mm.find(b"\n", pos, end)
+            stop = end if newline == -1 else newline
+            line = mm[pos:stop]
+            lines += 1
+            if not line.strip():
+                message, count = "empty line", 0
+            else:
+                try:
+                    message, count = check_record(loads(line), purpose, tokenizer)
+                except ValueError as err:
+                    message, count = f"invalid json: {err}", 0
+            if message is None:
+                valid += 1
+                tokens += count
+                max_tokens = max(max_tokens, count)
+            else:
+                error_count += 1
+                if len(errors) < max_errors:
+                    errors.append((lines, pos, message))
+            pos = stop + 1
+    return lines, valid, tokens, max_tokens, errors, error_count
+
+
+def validate_jsonl(
+        path: str | os.PathLike,
+        *,
+        purpose: FilePurpose | str = FilePurpose.fine_tune,
+        workers: Optional[int] = None,
+        tokenizer: Callable[[str], int] = count_tokens,
+        max_errors: int = 1000,
+        range_size: int = RANGE_SIZE,
+) -> ValidationReport:
+    """Validate a fine-tune or batch JSONL file and count its tokens.
+
+    The file is memory-mapped and split into line-aligned ranges checked in a process pool
+    of `workers` processes (all cores by default). A custom `tokenizer` must be picklable.
+    """
+    path = os.fspath(path)
+    purpose = FilePurpose(purpose).value
+    ranges = line_ranges(path, range_size)
+    workers = min(workers or os.cpu_count() or 1, len(ranges)) or 1
+    args = [(path, start, end, purpose, tokenizer, max_errors) for start, end in ranges]
+    if workers == 1:
+        results = [_validate_range(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_validate_range, *zip(*args)))
+
+    lines = valid = tokens = max_tokens = error_count = 0
+    errors: List[LineError] = []
+    for range_lines, range_valid, range_tokens, range_max, range_errors, range_error_count in results:
+        errors.extend(
+            LineError(line=lines + line, offset=offset, message=message)
+            for line, offset, message in range_errors[:max_errors - len(errors)]
+        )
+        lines += range_lines
+        valid += range_valid
+        tokens += range_tokens
+        max_tokens = max(max_tokens, range_max)
+        error_count += range_error_count
+    if not ranges:
+        errors.append(LineError(line=0, offset=0, message="file is empty"))
+        error_count = 1
+    return ValidationReport(
+        path=path,
+        purpose=purpose,
+        lines=lines,
+        valid_lines=valid,
+        tokens=tokens,
+        max_line_tokens=max_tokens,
+        errors=errors,
+        truncated=error_count > len(errors),
+    )
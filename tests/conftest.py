@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.mock_server import MockConfig, MockServer
+
+
+@pytest.fixture
+def mock_server():
+    with MockServer(MockConfig()) as server:
+        yield server
@@ -1,6 +1,9 @@
 import os
+import time
 import pytest
 from netmind import NetMind, AsyncNetMind
+from netmind.cache import DiskCache, MemoryCache
+from netmind.types.lean import LeanModel
 from netmind.types.code_interpreter import (
     CodeInterpreterCodeRequest,
     CodeInterpreterCodeRunResponse,
@@ -163,3 +166,78 @@ class TestAsyncNetMindCodeInterpreter:
         assert "Arg 3: test" in result.run.stdout
         assert result.run.code == 0
 
+
+
+class TestNetMindCodeInterpreterLean:
+    @pytest.fixture
+    def sync_client(self, mock_server) -> NetMind:
+        return NetMind(api_key="mock", base_url=mock_server.url, max_retries=0, lean_responses=True)
+
+    def test_run(self, sync_client: NetMind):
+        result = sync_client.code_interpreter.run(SAMPLE_CODE_REQUEST)
+        assert isinstance(result, LeanModel)
+        assert isinstance(result.run, LeanModel)
+        assert result.run.code == 0
+        assert result.run.data == []
+        assert result.run.signal is None
+        assert isinstance(result.to_model(), CodeInterpreterCodeResponse)
+
+
+PLOT_REQUEST = CodeInterpreterCodeRequest(
+    language="python",
+    files=[CodeInterpreterCodeFile(name="plot.py", content="import matplotlib.pyplot as plt\nplt.savefig('a.png')")],
+)
+
+
+def _executions(mock_server) -> int:
+    return len([r for r in mock_server.requests if r.path.endswith("/execute")])
+
+
+class TestCodeInterpreterCache:
+    @pytest.fixture(params=["memory", "disk"])
+    def sync_client(self, request, mock_server, tmp_path) -> NetMind:
+        cache = MemoryCache() if request.param == "memory" else DiskCache(tmp_path / "cache")
+        return NetMind(api_key="mock", base_url=mock_server.url, max_retries=0, code_cache=cache)
+
+    def test_identical_requests_run_once(self, sync_client: NetMind, mock_server):
+        first = sync_client.code_interpreter.run(SAMPLE_CODE_REQUEST)
+        # explicit defaults hash like omitted ones
+        same = SAMPLE_CODE_REQUEST.model_copy(update={"stdin": None, "args": [], "file_id_usage": None})
+        second = sync_client.code_interpreter.run(same)
+        assert isinstance(second, CodeInterpreterCodeResponse)
+        assert second.run.stdout == first.run.stdout
+        assert _executions(mock_server) == 1
+
+        sync_client.code_interpreter.run(SAMPLE_CODE_REQUEST, use_cache=False)
+        sync_client.code_interpreter.run(SAMPLE_CODE_REQUEST.model_copy(update={"stdin": "input"}))
+        assert _executions(mock_server) == 3
+
+    def test_artifacts_are_not_cached_by_default(self, sync_client: NetMind, mock_server):
+        assert sync_client.code_interpreter.run(PLOT_REQUEST).run.data
+        sync_client.code_interpreter.run(PLOT_REQUEST)
+        assert _executions(mock_server) == 2
+
+        first = sync_client.code_interpreter.run(PLOT_REQUEST, cache_artifacts=True)
+        second = sync_client.code_interpreter.run(PLOT_REQUEST)
+        assert second.run.data[0].id == first.run.data[0].id
+        assert _executions(mock_server) == 3
+
+    def test_ttl(self, mock_server):
+        client = NetMind(api_key="mock", base_url=mock_server.url, max_retries=0, code_cache=MemoryCache(ttl=0.05))
+        client.code_interpreter.run(SAMPLE_CODE_REQUEST)
+        time.sleep(0.1)
+        client.code_interpreter.run(SAMPLE_CODE_REQUEST)
+        assert _executions(mock_server) == 2
+
+
+@pytest.mark.asyncio
+class TestAsyncCodeInterpreterCache:
+    async def test_lean_cache_hit(self, mock_server):
+        client = AsyncNetMind(
+            api_key="mock", base_url=mock_server.url, max_retries=0,
+            code_cache=MemoryCache(), lean_responses=True,
+        )
+        first = await client.code_interpreter.arun(SAMPLE_CODE_REQUEST)
+        second = await client.code_interpreter.arun(SAMPLE_CODE_REQUEST)
+        assert isinstance(second, LeanModel) and second == first
+        assert _executions(mock_server) == 1
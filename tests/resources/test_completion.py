@@ -1,7 +1,12 @@
+import io
 import os
+import json
+import base64
+import pickle
 import pytest
 
 from netmind import NetMind, AsyncNetMind
+from netmind.images import ImageProcessor
 from openai.types import CompletionUsage
 from openai.types.chat.chat_completion import Choice, ChatCompletion
 from openai.types.chat.chat_completion_message import ChatCompletionMessage
@@ -58,3 +63,99 @@ class TestAsyncNetMindChat:
             max_tokens=MAX_TOKENS,
         )
         assert_chat_completion(response)
+
+
+def _png(path, size, mode="RGB"):
+    from PIL import Image
+    Image.new(mode, size, "red").save(path, format="PNG")
+    return path
+
+
+def _sent_images(mock_server):
+    urls = []
+    for request in mock_server.requests:
+        if request.path.endswith("/chat/completions"):
+            for message in json.loads(request.body)["messages"]:
+                if isinstance(message["content"], list):
+                    urls += [part["image_url"]["url"] for part in message["content"] if part["type"] == "image_url"]
+    return urls
+
+
+def _image_size(url):
+    from PIL import Image
+    return Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1]))).size
+
+
+def _image_messages(*images):
+    return [{
+        "role": "user",
+        "content": [{"type": "text", "text": "Describe"}] + [
+            {"type": "image_url", "image_url": {"url": image}} for image in images
+        ],
+    }]
+
+
+class TestLocalImages:
+    @pytest.fixture(autouse=True)
+    def pillow(self):
+        pytest.importorskip("PIL")
+
+    @pytest.fixture
+    def sync_client(self, mock_server) -> NetMind:
+        return NetMind(
+            api_key="mock", base_url=mock_server.url, max_retries=0,
+            image_processor=ImageProcessor(max_dimension=256),
+        )
+
+    def test_local_images_are_sent_as_data_urls(self, sync_client: NetMind, mock_server, tmp_path):
+        small = _png(tmp_path / "small.png", (64, 32))
+        large = _png(tmp_path / "large.png", (1024, 512))
+        messages = _image_messages(str(small), large, "https://example.com/cat.png")
+        sync_client.chat.completions.create(model=MODEL, messages=messages)
+
+        small_url, large_url, remote_url = _sent_images(mock_server)
+        assert small_url == "data:image/png;base64," + base64.b64encode(small.read_bytes()).decode()
+        assert large_url.startswith("data:image/jpeg;base64,")
+        assert _image_size(large_url) == (256, 128)
+        assert remote_url == "https://example.com/cat.png"
+        # the caller's messages are left untouched
+        assert messages[0]["content"][2]["image_url"]["url"] == large
+
+    def test_transparency_is_kept(self, sync_client: NetMind, mock_server, tmp_path):
+        image = _png(tmp_path / "alpha.png", (512, 512), mode="RGBA")
+        sync_client.chat.completions.create(model=MODEL, messages=_image_messages(image.read_bytes()))
+        url, = _sent_images(mock_server)
+        assert url.startswith("data:image/png;base64,")
+        assert _image_size(url) == (256, 256)
+
+    def test_repeated_images_are_processed_once(self, sync_client: NetMind, mock_server, tmp_path, monkeypatch):
+        image = _png(tmp_path / "large.png", (1024, 1024))
+        processor = sync_client.chat.images
+        encoded = []
+        encode = processor._encode
+        monkeypatch.setattr(processor, "_encode", lambda data: encoded.append(data) or encode(data))
+        for _ in range(3):
+            sync_client.chat.completions.create(model=MODEL, messages=_image_messages(image, image))
+        assert len(encoded) == 1
+        assert len(set(_sent_images(mock_server))) == 1
+
+    def test_local_paths_are_not_read_by_default(self, mock_server, tmp_path):
+        client = NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+        image = _png(tmp_path / "small.png", (64, 32))
+        client.chat.completions.create(model=MODEL, messages=_image_messages(str(image)))
+        assert _sent_images(mock_server) == [str(image)]
+
+    def test_pickle(self):
+        processor = pickle.loads(pickle.dumps(ImageProcessor(max_dimension=512, quality=70)))
+        assert (processor.max_dimension, processor.quality) == (512, 70)
+
+    @pytest.mark.asyncio
+    async def test_async(self, mock_server, tmp_path):
+        client = AsyncNetMind(
+            api_key="mock", base_url=mock_server.url, max_retries=0,
+            image_processor=ImageProcessor(max_dimension=128),
+        )
+        images = [_png(tmp_path / f"{i}.png", (400 + i, 300)) for i in range(4)]
+        response = await client.chat.completions.create(model=MODEL, messages=_image_messages(*images))
+        assert_chat_completion(response)
+        assert [_image_size(url)[0] for url in _sent_images(mock_server)] == [128] * 4
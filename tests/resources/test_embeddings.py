@@ -1,7 +1,13 @@
 import os
+import csv
+import json
+import threading
 import pytest
 
+from benchmarks.mock_server import MockConfig, MockServer
 from netmind import NetMind, AsyncNetMind
+from netmind.corpus import count_rows, iter_texts
+from netmind.exceptions import NetMindError
 from openai.types.create_embedding_response import CreateEmbeddingResponse
 
 
@@ -43,3 +49,119 @@ class TestAsyncNetMindEmbeddings:
             input=INPUT,
         )
         assert_embeddings(response)
+
+
+def _corpus(path, count):
+    texts = [f"document number {i}" for i in range(count)]
+    with open(path, "w", encoding="utf-8") as f:
+        for i, text in enumerate(texts):
+            f.write(json.dumps({"id": i, "text": text}) + "\n")
+            if i % 7 == 0:
+                f.write("\n")
+    return texts
+
+
+def _embedding_requests(mock_server) -> int:
+    return len([r for r in mock_server.requests if r.path.endswith("/embeddings")])
+
+
+class TestCreateMatrix:
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    @pytest.fixture
+    def server(self):
+        with MockServer(MockConfig(embedding_dim=8)) as server:
+            yield server
+
+    @pytest.fixture
+    def sync_client(self, server) -> NetMind:
+        return NetMind(api_key="mock", base_url=server.url, max_retries=0)
+
+    def test_rows_follow_the_corpus(self, sync_client: NetMind, server, tmp_path, numpy):
+        texts = _corpus(tmp_path / "corpus.jsonl", 50)
+        result = sync_client.embeddings.create_matrix(
+            tmp_path / "corpus.jsonl", tmp_path / "vectors.npy", model=MODEL, batch_size=8, concurrency=4
+        )
+        assert (result.rows, result.dim, result.embedded, result.skipped) == (50, 8, 50, 0)
+        assert result.total_tokens == 50
+
+        matrix = numpy.load(tmp_path / "vectors.npy")
+        expected = sync_client.embeddings.create(model=MODEL, input=[texts[0], texts[37]])
+        assert numpy.allclose(matrix[[0, 37]], [item.embedding for item in expected.data])
+
+        # a finished matrix is not embedded again
+        requests = _embedding_requests(server)
+        result = sync_client.embeddings.create_matrix(tmp_path / "corpus.jsonl", tmp_path / "vectors.npy", model=MODEL)
+        assert (result.embedded, result.skipped) == (0, 50)
+        assert _embedding_requests(server) == requests
+
+    def test_resume_after_interruption(self, sync_client: NetMind, server, tmp_path, numpy):
+        texts = [f"text {i}" for i in range(40)]
+
+        def interrupted():
+            yield from texts[:25]
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            sync_client.embeddings.create_matrix(
+                interrupted(), tmp_path / "vectors.npy", model=MODEL, rows=40, batch_size=5, concurrency=1
+            )
+        before = _embedding_requests(server)
+        result = sync_client.embeddings.create_matrix(texts, tmp_path / "vectors.npy", model=MODEL, batch_size=5)
+        # batches still in flight when the source failed may be lost, finished ones are not redone
+        assert result.skipped >= 20
+        assert result.skipped + result.embedded == 40
+        assert _embedding_requests(server) - before == result.embedded // 5
+
+        reference = sync_client.embeddings.create(model=MODEL, input=texts)
+        assert numpy.allclose(numpy.load(tmp_path / "vectors.npy"), [item.embedding for item in reference.data])
+
+    def test_mismatched_corpus(self, sync_client: NetMind, tmp_path):
+        sync_client.embeddings.create_matrix(["a", "b", "c"], tmp_path / "vectors.npy", model=MODEL)
+        with pytest.raises(NetMindError):
+            sync_client.embeddings.create_matrix(["a", "b"], tmp_path / "vectors.npy", model=MODEL)
+        with pytest.raises(NetMindError):
+            sync_client.embeddings.create_matrix(iter(["a"]), tmp_path / "other.npy", model=MODEL)
+
+    @pytest.mark.asyncio
+    async def test_async_csv(self, server, tmp_path, numpy):
+        texts = [f"row, with \"quotes\" {i}" for i in range(30)]
+        with open(tmp_path / "corpus.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "body"])
+            writer.writerows(enumerate(texts))
+        client = AsyncNetMind(api_key="mock", base_url=server.url, max_retries=0)
+        result = await client.embeddings.create_matrix(
+            tmp_path / "corpus.csv", tmp_path / "vectors.npy", model=MODEL, field="body", batch_size=4, concurrency=3
+        )
+        assert (result.rows, result.embedded) == (30, 30)
+        assert server.peak_in_flight <= 3
+        reference = await client.embeddings.create(model=MODEL, input=texts)
+        assert numpy.allclose(numpy.load(tmp_path / "vectors.npy"), [item.embedding for item in reference.data])
+
+    def test_unicode_blank_lines(self, sync_client: NetMind, tmp_path):
+        with open(tmp_path / "corpus.jsonl", "w", encoding="utf-8") as f:
+            f.write('"first"\n　\n \t\n"　second"\n')
+        assert count_rows(tmp_path / "corpus.jsonl") == 2
+        assert list(iter_texts(tmp_path / "corpus.jsonl")) == ["first", "　second"]
+        result = sync_client.embeddings.create_matrix(tmp_path / "corpus.jsonl", tmp_path / "vectors.npy", model=MODEL)
+        assert (result.rows, result.embedded) == (2, 2)
+
+    @pytest.mark.asyncio
+    async def test_async_reads_the_corpus_off_the_loop(self, server, tmp_path):
+        loop_thread = threading.get_ident()
+        threads = set()
+
+        def texts():
+            for i in range(20):
+                threads.add(threading.get_ident())
+                yield f"text {i}"
+
+        client = AsyncNetMind(api_key="mock", base_url=server.url, max_retries=0)
+        result = await client.embeddings.create_matrix(
+            texts(), tmp_path / "vectors.npy", model=MODEL, rows=20, batch_size=3, concurrency=4
+        )
+        assert (result.rows, result.embedded) == (20, 20)
+        assert threads and loop_thread not in threads
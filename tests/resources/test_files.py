@@ -2,6 +2,7 @@ import os
 import openai
 import pytest
 from netmind import NetMind, AsyncNetMind
+from netmind.types.lean import LeanModel
 
 
 FILE_PATH = os.path.join(
@@ -9,6 +10,11 @@ FILE_PATH = os.path.join(
     "..", "..", "demo",
     "english.jsonl"
 )
+PDF_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "demo",
+    "test.pdf"
+)
 PURPOSE = "inference"
 
 
@@ -76,3 +82,101 @@ class TestAsyncNetMindFiles:
         await async_client.files.delete(file_id)
         with pytest.raises(openai.NotFoundError):
             await async_client.files.retrieve(file_id)
+
+
+class TestNetMindFilesLean:
+    @pytest.fixture
+    def sync_client(self, mock_server) -> NetMind:
+        return NetMind(api_key="mock", base_url=mock_server.url, max_retries=0, lean_responses=True)
+
+    def test_file_lifecycle(self, sync_client: NetMind):
+        file_id = sync_client.files.create(file=FILE_PATH, purpose=PURPOSE).id
+        assert file_id.startswith("file-")
+
+        file = sync_client.files.retrieve(file_id)
+        assert isinstance(file, LeanModel)
+        assert file.id == file_id
+        assert file.purpose == PURPOSE
+        assert file.length is None
+        assert file.to_model().file_name == "english.jsonl"
+
+        files = sync_client.files.list()
+        assert [f.id for f in files] == [file_id]
+
+        url = sync_client.files.retrieve_url(file_id)
+        assert url.id == file_id
+        assert url.presigned_url.startswith("http")
+
+        assert sync_client.files.delete(file_id) is None
+        with pytest.raises(openai.NotFoundError):
+            sync_client.files.retrieve(file_id)
+
+
+@pytest.mark.asyncio
+class TestAsyncNetMindFilesLean:
+    @pytest.fixture
+    def async_client(self, mock_server) -> AsyncNetMind:
+        return AsyncNetMind(api_key="mock", base_url=mock_server.url, max_retries=0, lean_responses=True)
+
+    async def test_list_files(self, async_client: AsyncNetMind):
+        file_id = (await async_client.files.create(file=FILE_PATH, purpose=PURPOSE)).id
+        files = await async_client.files.list()
+        assert [f.id for f in files] == [file_id]
+        assert files[0].to_dict()["file_name"] == "english.jsonl"
+
+
+class TestNetMindFilesUpload:
+    @pytest.fixture
+    def sync_client(self, mock_server) -> NetMind:
+        return NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+
+    @pytest.mark.parametrize("compression", ["gzip", "zstd"])
+    def test_compressed_upload(self, sync_client: NetMind, mock_server, compression):
+        with open(FILE_PATH, "rb") as f:
+            content = f.read()
+        upload = sync_client.files.create(file=FILE_PATH, purpose="batch", compression=compression)
+        assert upload.content_encoding == compression
+        assert upload.raw_bytes == len(content)
+        assert upload.uploaded_bytes < upload.raw_bytes
+
+        put = [r for r in mock_server.requests if r.method == "PUT"][-1]
+        assert put.headers["content-encoding"] == compression
+        assert put.raw_body_size == upload.uploaded_bytes
+        assert "chunked" not in put.headers.get("transfer-encoding", "")
+        assert mock_server.uploads[upload.id] == content
+
+    def test_uncompressed_upload(self, sync_client: NetMind, mock_server):
+        upload = sync_client.files.create(file=PDF_PATH, purpose=PURPOSE)
+        assert upload.content_encoding is None
+        assert upload.raw_bytes == upload.uploaded_bytes == os.path.getsize(PDF_PATH)
+
+        put = [r for r in mock_server.requests if r.method == "PUT"][-1]
+        assert put.headers["content-type"] == "application/pdf"
+        with open(PDF_PATH, "rb") as f:
+            assert mock_server.uploads[upload.id] == f.read()
+
+    def test_compression_requires_text_purpose(self, sync_client: NetMind):
+        with pytest.raises(ValueError):
+            sync_client.files.create(file=PDF_PATH, purpose=PURPOSE, compression="gzip")
+        with pytest.raises(ValueError):
+            sync_client.files.create(file=FILE_PATH, purpose="batch", compression="brotli")
+
+
+@pytest.mark.asyncio
+class TestAsyncNetMindFilesUpload:
+    @pytest.fixture
+    def async_client(self, mock_server) -> AsyncNetMind:
+        return AsyncNetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+
+    async def test_mime_is_sniffed(self, async_client: AsyncNetMind, mock_server):
+        upload = await async_client.files.create(file=PDF_PATH, purpose=PURPOSE)
+        put = [r for r in mock_server.requests if r.method == "PUT"][-1]
+        assert put.headers["content-type"] == "application/pdf"
+        with open(PDF_PATH, "rb") as f:
+            assert mock_server.uploads[upload.id] == f.read()
+
+    async def test_compressed_upload(self, async_client: AsyncNetMind, mock_server):
+        upload = await async_client.files.create(file=FILE_PATH, purpose="fine-tune", compression="gzip")
+        assert upload.uploaded_bytes < upload.raw_bytes
+        with open(FILE_PATH, "rb") as f:
+            assert mock_server.uploads[upload.id] == f.read()
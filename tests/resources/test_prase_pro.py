@@ -1,9 +1,15 @@
 import os
+import json
+import random
 import pytest
 import time
 import asyncio
 from netmind import NetMind, AsyncNetMind
-from netmind.types.parse_pro import TaskStatus
+from netmind._streaming import JsonArrayDecoder
+from netmind.cache import DiskCache
+from netmind.journal import TaskJournal
+from netmind.exceptions import NetMindError
+from netmind.types.parse_pro import ParseTaskResult, TaskStatus
 
 
 FILE_PATH = os.path.join(
@@ -65,3 +71,357 @@ class TestAsyncNetMindParsePro:
         task_result = await async_client.parse_pro.aresult(result.task_id)
         assert task_result.status in FINAL_STATUSES
         assert isinstance(task_result.data, str)
+
+
+class TestNetMindParseProPipeline:
+    @pytest.fixture
+    def sync_client(self, mock_server) -> NetMind:
+        return NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+
+    def test_parse_many(self, sync_client: NetMind, mock_server):
+        results = list(sync_client.parse_pro.parse_many(
+            [FILE_PATH] * 6, format="json", upload_workers=2, parse_workers=3
+        ))
+        assert len(results) == 6
+        assert all(isinstance(result, list) and len(result) > 0 for result in results)
+        uploads = [r for r in mock_server.requests if r.method == "PUT"]
+        assert len(uploads) == 6
+
+    def test_parse_many_return_exceptions(self, sync_client: NetMind):
+        sources = [FILE_PATH, "/does/not/exist.pdf", FILE_PATH]
+        results = list(sync_client.parse_pro.parse_many(
+            sources, format="markdown", max_pending=1, return_exceptions=True
+        ))
+        assert isinstance(results[0], str)
+        assert isinstance(results[1], FileNotFoundError)
+        assert isinstance(results[2], str)
+
+    def test_parse_many_raises(self, sync_client: NetMind):
+        with pytest.raises(FileNotFoundError):
+            list(sync_client.parse_pro.parse_many(["/does/not/exist.pdf"]))
+
+
+@pytest.fixture
+def multi_page_pdf(tmp_path):
+    pypdf = pytest.importorskip("pypdf")
+    writer = pypdf.PdfWriter()
+    for _ in range(7):
+        writer.add_blank_page(width=200, height=200)
+    path = tmp_path / "multi.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+class TestNetMindParseProSplit:
+    @pytest.fixture
+    def sync_client(self, mock_server) -> NetMind:
+        return NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+
+    def test_parse_split_json(self, sync_client: NetMind, mock_server, multi_page_pdf):
+        mock_server.config.parse_blocks = 2
+        result = sync_client.parse_pro.parse_split(
+            multi_page_pdf, format="json", pages_per_shard=3, poll_interval=0.01
+        )
+        # 3 shards of 2 blocks each, page numbers shifted to the source document
+        assert [block["page"] for block in result] == [1, 1, 4, 4, 7, 7]
+        submits = [r for r in mock_server.requests if r.path.endswith("/parse-pdf/async")]
+        assert len(submits) == 3
+
+    def test_parse_split_markdown(self, sync_client: NetMind, multi_page_pdf):
+        result = sync_client.parse_pro.parse_split(
+            multi_page_pdf, format="markdown", pages_per_shard=5, poll_interval=0.01
+        )
+        assert isinstance(result, str)
+
+    def test_parse_split_rejects_urls(self, sync_client: NetMind):
+        with pytest.raises(ValueError):
+            sync_client.parse_pro.parse_split("https://example.com/a.pdf")
+
+    def test_wait_polls_until_finished(self, sync_client: NetMind, mock_server):
+        mock_server.config.parse_task_polls = 2
+        task = sync_client.parse_pro.aparse(FILE_PATH, format="markdown")
+        result = sync_client.parse_pro.wait(task.task_id, poll_interval=0.01)
+        assert result.status == TaskStatus.success
+
+    def test_wait_timeout_raises(self, sync_client: NetMind, mock_server):
+        mock_server.config.parse_task_polls = 100
+        task = sync_client.parse_pro.aparse(FILE_PATH, format="markdown")
+        with pytest.raises(NetMindError, match="last status: PENDING"):
+            sync_client.parse_pro.wait(task.task_id, poll_interval=0.05, timeout=0.1)
+
+    def test_failed_task_raises(self, sync_client: NetMind, multi_page_pdf, monkeypatch):
+        # results are constructed without validation, their status is a plain string
+        failed = ParseTaskResult.construct(task_id="task", status="FAILED", error="boom")
+        monkeypatch.setattr(sync_client.parse_pro, "aresult", lambda task_id: failed)
+        with pytest.raises(NetMindError, match="status FAILED: boom"):
+            sync_client.parse_pro.parse_split(multi_page_pdf, pages_per_shard=3, poll_interval=0.01)
+
+
+@pytest.mark.asyncio
+class TestAsyncNetMindParseProSplit:
+    @pytest.fixture
+    def async_client(self, mock_server) -> AsyncNetMind:
+        return AsyncNetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+
+    async def test_parse_split_json(self, async_client: AsyncNetMind, mock_server, multi_page_pdf):
+        mock_server.config.parse_blocks = 1
+        result = await async_client.parse_pro.parse_split(
+            multi_page_pdf, format="json", pages_per_shard=2, max_concurrency=2, poll_interval=0.01
+        )
+        assert [block["page"] for block in result] == [1, 3, 5, 7]
+
+    async def test_failed_shard_cancels_the_others(self, async_client: AsyncNetMind, multi_page_pdf, monkeypatch):
+        started, cancelled = [], []
+
+        async def aparse(path, **kwargs):
+            started.append(path)
+            if len(started) == 1:
+                raise NetMindError("upload failed")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(path)
+                raise
+
+        monkeypatch.setattr(async_client.parse_pro, "aparse", aparse)
+        with pytest.raises(NetMindError, match="upload failed"):
+            await async_client.parse_pro.parse_split(multi_page_pdf, pages_per_shard=2, max_concurrency=4)
+        assert sorted(cancelled) == sorted(started[1:]) and len(cancelled) == 3
+
+
+class TestJsonArrayDecoder:
+    BLOCKS = [
+        {"type": "text", "page": 1, "text": "h\u00e9llo [world], {\"quoted\"}"},
+        {"type": "table", "page": 2, "rows": [[1, 2.5, None], [True, False, "x"]]},
+        {"type": "text", "page": 12345, "text": "\u4f60\u597d"},
+    ]
+
+    def decode(self, body: bytes, chunk_size: int):
+        decoder = JsonArrayDecoder()
+        items = []
+        for start in range(0, len(body), chunk_size):
+            items.extend(decoder.feed(body[start:start + chunk_size]))
+        items.extend(decoder.close())
+        return items
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 16])
+    def test_chunked(self, chunk_size):
+        body = json.dumps(self.BLOCKS, ensure_ascii=False, indent=1).encode()
+        assert self.decode(body, chunk_size) == self.BLOCKS
+
+    def test_scalars_split_across_chunks(self):
+        rng = random.Random(0)
+        values = [rng.randint(0, 10 ** 9) for _ in range(200)]
+        body = json.dumps(values).encode()
+        assert self.decode(body, 3) == values
+
+    def test_empty_array(self):
+        assert self.decode(b" [ ] ", 1) == []
+
+    @pytest.mark.parametrize("body", [b"{}", b"[1,,2]", b"[1 2]", b"[1, 2", b"[{\"a\": }]", b"[1] 2"])
+    def test_invalid(self, body):
+        with pytest.raises(ValueError):
+            self.decode(body, 1)
+
+    def test_fractions_split_across_chunks(self):
+        values = [-1.5, 2.25e-3, 1e+20, 0.5]
+        assert self.decode(json.dumps(values).encode(), 1) == values
+
+    def test_escapes_split_across_chunks(self):
+        body = json.dumps(self.BLOCKS).encode()
+        assert self.decode(body, 1) == self.BLOCKS
+
+    def test_malformed_element_fails_early(self):
+        body = b'[{"a": 1}, {bad}, ' + b", ".join([b'{"a": 1}'] * 10000) + b"]"
+        decoder = JsonArrayDecoder()
+        read = 0
+        with pytest.raises(ValueError, match="property name"):
+            for start in range(0, len(body), 64):
+                decoder.feed(body[start:start + 64])
+                read += 64
+        assert read <= 64
+
+
+class TestNetMindParseProStream:
+    @pytest.fixture
+    def sync_client(self, mock_server) -> NetMind:
+        return NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+
+    def test_parse_stream(self, sync_client: NetMind, mock_server):
+        mock_server.config.parse_blocks = 50
+        blocks = list(sync_client.parse_pro.parse_stream(FILE_PATH))
+        assert blocks == sync_client.parse_pro.parse(FILE_PATH, format="json")
+        assert len(blocks) == 50
+
+    def test_parse_to_jsonl(self, sync_client: NetMind, tmp_path):
+        sink = tmp_path / "blocks.jsonl"
+        count = sync_client.parse_pro.parse_to_jsonl(FILE_PATH, sink)
+        lines = sink.read_text(encoding="utf-8").splitlines()
+        assert count == len(lines) > 0
+        assert all(isinstance(json.loads(line), dict) for line in lines)
+
+
+@pytest.mark.asyncio
+class TestAsyncNetMindParseProStream:
+    @pytest.fixture
+    def async_client(self, mock_server) -> AsyncNetMind:
+        return AsyncNetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+
+    async def test_parse_stream(self, async_client: AsyncNetMind, mock_server):
+        mock_server.config.parse_blocks = 20
+        blocks = [block async for block in async_client.parse_pro.parse_stream(FILE_PATH)]
+        assert len(blocks) == 20
+        assert all(isinstance(block, dict) for block in blocks)
+
+    async def test_parse_to_jsonl(self, async_client: AsyncNetMind, tmp_path):
+        sink = tmp_path / "blocks.jsonl"
+        count = await async_client.parse_pro.parse_to_jsonl(FILE_PATH, sink)
+        assert count == len(sink.read_text(encoding="utf-8").splitlines()) > 0
+
+
+def parse_requests(mock_server):
+    return [r for r in mock_server.requests if r.path.startswith("/inference-api/agent/v1/parse-pdf")]
+
+
+class TestNetMindParseProCache:
+    @pytest.fixture
+    def sync_client(self, mock_server, tmp_path) -> NetMind:
+        return NetMind(
+            api_key="mock", base_url=mock_server.url, max_retries=0, parse_cache=DiskCache(tmp_path)
+        )
+
+    def test_parse_is_cached(self, sync_client: NetMind, mock_server):
+        first = sync_client.parse_pro.parse(FILE_PATH, format="json")
+        mock_server.reset()
+        assert sync_client.parse_pro.parse(FILE_PATH, format="json") == first
+        assert mock_server.requests == []
+
+        # other options miss the cache
+        sync_client.parse_pro.parse(FILE_PATH, format="json", figure_parsing=True)
+        assert len(parse_requests(mock_server)) == 1
+
+    def test_invalidate(self, sync_client: NetMind, mock_server):
+        sync_client.parse_pro.parse(FILE_PATH)
+        sync_client.parse_pro.invalidate(FILE_PATH)
+        mock_server.reset()
+        sync_client.parse_pro.parse(FILE_PATH)
+        assert len(parse_requests(mock_server)) == 1
+
+    def test_parse_many_uses_cache(self, sync_client: NetMind, mock_server):
+        sync_client.parse_pro.parse(FILE_PATH, format="json")
+        mock_server.reset()
+        results = list(sync_client.parse_pro.parse_many([FILE_PATH] * 3, format="json"))
+        assert len(results) == 3
+        assert mock_server.requests == []
+
+    def test_finished_task_results_are_cached(self, sync_client: NetMind, mock_server):
+        mock_server.config.parse_task_polls = 1
+        task = sync_client.parse_pro.aparse(FILE_PATH)
+        assert sync_client.parse_pro.aresult(task.task_id).status == TaskStatus.pending
+        result = sync_client.parse_pro.aresult(task.task_id)
+        assert result.status == TaskStatus.success
+        mock_server.reset()
+        assert sync_client.parse_pro.aresult(task.task_id) == result
+        assert mock_server.requests == []
+
+
+@pytest.mark.asyncio
+class TestAsyncNetMindParseProCache:
+    @pytest.fixture
+    def async_client(self, mock_server, tmp_path) -> AsyncNetMind:
+        return AsyncNetMind(
+            api_key="mock", base_url=mock_server.url, max_retries=0, parse_cache=DiskCache(tmp_path)
+        )
+
+    async def test_parse_is_cached(self, async_client: AsyncNetMind, mock_server):
+        first = await async_client.parse_pro.parse(FILE_PATH, format="markdown")
+        mock_server.reset()
+        assert await async_client.parse_pro.parse(FILE_PATH, format="markdown") == first
+        assert mock_server.requests == []
+
+
+class TestNetMindParseProJournal:
+    @pytest.fixture
+    def journal_path(self, tmp_path):
+        return tmp_path / "journal.db"
+
+    def client(self, mock_server, journal_path) -> NetMind:
+        return NetMind(
+            api_key="mock", base_url=mock_server.url, max_retries=0, parse_journal=TaskJournal(journal_path)
+        )
+
+    def test_aparse_reuses_journaled_task(self, mock_server, journal_path):
+        client = self.client(mock_server, journal_path)
+        task = client.parse_pro.aparse(FILE_PATH, format="json")
+        mock_server.reset()
+        assert client.parse_pro.aparse(FILE_PATH, format="json").task_id == task.task_id
+        assert mock_server.requests == []
+
+    def test_resume_after_restart(self, mock_server, journal_path):
+        mock_server.config.parse_task_polls = 2
+        task = self.client(mock_server, journal_path).parse_pro.aparse(FILE_PATH, format="json")
+
+        restarted = self.client(mock_server, journal_path)
+        finished = list(restarted.parse_pro.resume(poll_interval=0.01))
+        assert [(entry.task_id, result.status) for entry, result in finished] == [(task.task_id, TaskStatus.success)]
+        assert restarted.parse_journal.outstanding() == []
+        assert restarted.parse_journal.history(task.task_id) == ["PENDING", "SUCCESS"]
+
+        # the finished document is not submitted again
+        mock_server.reset()
+        assert restarted.parse_pro.aparse(FILE_PATH, format="json").task_id == task.task_id
+        assert mock_server.requests == []
+
+    def test_cached_result_updates_journal(self, mock_server, journal_path, tmp_path):
+        cache = DiskCache(tmp_path / "cache")
+        client = NetMind(
+            api_key="mock", base_url=mock_server.url, max_retries=0,
+            parse_cache=cache, parse_journal=TaskJournal(journal_path),
+        )
+        task = client.parse_pro.aparse(FILE_PATH, format="json")
+        # another process without the journal fetched the result into the shared cache
+        NetMind(api_key="mock", base_url=mock_server.url, parse_cache=cache).parse_pro.aresult(task.task_id)
+
+        mock_server.reset()
+        assert client.parse_pro.aresult(task.task_id).is_successful()
+        assert mock_server.requests == []
+        assert client.parse_journal.outstanding() == []
+
+    def test_resume_requires_journal(self, mock_server):
+        client = NetMind(api_key="mock", base_url=mock_server.url)
+        with pytest.raises(NetMindError):
+            list(client.parse_pro.resume())
+
+
+@pytest.mark.asyncio
+class TestAsyncNetMindParseProJournal:
+    async def test_resume_after_restart(self, mock_server, tmp_path):
+        mock_server.config.parse_task_polls = 1
+        journal_path = tmp_path / "journal.db"
+        client = AsyncNetMind(api_key="mock", base_url=mock_server.url, parse_journal=TaskJournal(journal_path))
+        task = await client.parse_pro.aparse(FILE_PATH)
+
+        restarted = AsyncNetMind(api_key="mock", base_url=mock_server.url, parse_journal=TaskJournal(journal_path))
+        finished = [item async for item in restarted.parse_pro.resume(poll_interval=0.01)]
+        assert [entry.task_id for entry, _ in finished] == [task.task_id]
+        assert finished[0][1].is_successful()
+
+
+class TestNetMindParseProLean:
+    @pytest.fixture
+    def sync_client(self, mock_server) -> NetMind:
+        return NetMind(api_key="mock", base_url=mock_server.url, max_retries=0, lean_responses=True)
+
+    def test_parse(self, sync_client: NetMind):
+        result = sync_client.parse_pro.parse(FILE_PATH, format="json")
+        assert isinstance(result, list) and isinstance(result[0], dict)
+
+    def test_aresult(self, sync_client: NetMind, mock_server):
+        mock_server.config.parse_task_polls = 1
+        task = sync_client.parse_pro.aparse(FILE_PATH, format="markdown")
+        assert task.status == "PENDING"
+        result = sync_client.parse_pro.wait(task.task_id, poll_interval=0.01)
+        assert result.is_successful()
+        assert isinstance(result.data, str)
+        assert result.error is None
@@ -0,0 +1,45 @@
+from benchmarks.bench import run_benchmarks, format_table
+from benchmarks.mock_server import MockConfig, MockServer, MockServerProcess
+from netmind import NetMind
+
+
+def test_run_benchmarks(mock_server, tmp_path):
+    upload_path = tmp_path / "upload.pdf"
+    upload_path.write_bytes(b"%PDF-1.4\n" + b"0" * 1024)
+
+    scenarios = ["chat", "embeddings", "files", "parse", "code_interpreter"]
+    results = run_benchmarks(
+        mock_server.url, scenarios, ["sync", "async"], [1, 4],
+        requests=8, upload_path=str(upload_path), warmup=1, trace=False,
+    )
+
+    assert len(results) == len(scenarios) * 2 * 2
+    for result in results:
+        assert result.errors == 0
+        assert result.requests == 8
+        assert result.throughput > 0
+        assert result.p50_ms <= result.p99_ms
+    assert "throughput" in format_table(results)
+
+
+def test_run_benchmarks_against_server_process(tmp_path):
+    upload_path = tmp_path / "upload.pdf"
+    upload_path.write_bytes(b"%PDF-1.4\n" + b"0" * 1024)
+
+    with MockServerProcess(MockConfig(record=False)) as server:
+        results = run_benchmarks(
+            server.url, ["chat", "files"], ["sync", "async"], [2],
+            requests=8, upload_path=str(upload_path), warmup=1,
+        )
+    assert [result.errors for result in results] == [0] * 4
+
+
+def test_unrecorded_server_keeps_no_bodies(tmp_path):
+    upload_path = tmp_path / "upload.pdf"
+    upload_path.write_bytes(b"%PDF-1.4\n" + b"0" * 1024)
+
+    with MockServer(MockConfig(record=False)) as server:
+        client = NetMind(api_key="mock", base_url=server.url, max_retries=0)
+        upload = client.files.create(str(upload_path), purpose="inference")
+        assert client.files.retrieve(upload.id).bytes == upload_path.stat().st_size
+        assert server.requests == [] and server.uploads == {}
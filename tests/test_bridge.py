@@ -0,0 +1,127 @@
+import time
+import pickle
+import threading
+import pytest
+from concurrent.futures import Future
+
+from benchmarks.mock_server import MockConfig, MockServer
+from netmind import BackgroundNetMind
+from netmind.deadlines import use_deadline
+from netmind.exceptions import DeadlineExceededError
+from netmind.types.code_interpreter import CodeInterpreterCodeRequest, CodeInterpreterCodeFile
+
+CODE_REQUEST = CodeInterpreterCodeRequest(
+    language="python",
+    files=[CodeInterpreterCodeFile(name="main.py", content="print('hello')")],
+)
+
+
+def test_calls_return_futures():
+    with MockServer(MockConfig(embedding_dim=4)) as server:
+        with BackgroundNetMind(api_key="mock", base_url=server.url) as client:
+            future = client.chat.completions.create(model="mock", messages=[{"role": "user", "content": "hi"}])
+            assert isinstance(future, Future)
+            assert future.result(5).choices[0].message.content.startswith("token")
+
+            embedding = client.embeddings.create(model="mock", input="hello").result(5)
+            assert len(embedding.data[0].embedding) == 4
+            assert client.code_interpreter.arun(CODE_REQUEST).result(5).run.stdout
+
+
+def test_requests_overlap_on_one_loop_thread():
+    with MockServer(MockConfig(latency=0.2)) as server:
+        with BackgroundNetMind(api_key="mock", base_url=server.url) as client:
+            started = time.monotonic()
+            futures = [client.embeddings.create(model="mock", input=str(i)) for i in range(50)]
+            assert all(f.result(5).data for f in futures)
+            # 50 requests of 200ms each, concurrently and on a single extra thread
+            assert time.monotonic() - started < 2
+            assert [t.name for t in threading.enumerate()].count("netmind-loop") == 1
+            assert server.peak_in_flight > 10
+
+
+def test_map_keeps_order_and_limit():
+    with MockServer(MockConfig(latency=0.05)) as server:
+        with BackgroundNetMind(api_key="mock", base_url=server.url) as client:
+            texts = [f"text {i}" for i in range(20)]
+            results = list(client.map(lambda text: client.embeddings.create(model="mock", input=text), texts, limit=4))
+            assert [r.data[0].embedding for r in results] == [
+                client.embeddings.create(model="mock", input=text).result(5).data[0].embedding for text in texts
+            ]
+            assert server.peak_in_flight <= 4
+
+
+def test_as_completed_yields_items_with_their_futures():
+    with MockServer() as server:
+        with BackgroundNetMind(api_key="mock", base_url=server.url) as client:
+            inputs = list(range(10))
+            pairs = list(client.as_completed(lambda i: client.embeddings.create(model="mock", input=str(i)), inputs))
+            assert sorted(item for item, _ in pairs) == inputs
+            assert all(future.done() and future.exception() is None for _, future in pairs)
+
+
+def test_caller_context_applies_to_the_call():
+    with MockServer(MockConfig(latency=1)) as server:
+        with BackgroundNetMind(api_key="mock", base_url=server.url, max_retries=0) as client:
+            with use_deadline(0.2):
+                future = client.code_interpreter.arun(CODE_REQUEST)
+            with pytest.raises(DeadlineExceededError):
+                future.result(5)
+
+
+def test_cancel_and_close():
+    with MockServer(MockConfig(latency=5)) as server:
+        client = BackgroundNetMind(api_key="mock", base_url=server.url)
+        slow = client.code_interpreter.arun(CODE_REQUEST)
+        pending = client.code_interpreter.arun(CODE_REQUEST)
+        assert slow.cancel()
+        started = time.monotonic()
+        client.close()
+        assert time.monotonic() - started < 2
+        assert slow.cancelled() and pending.cancelled()
+
+
+def test_pickle_carries_the_configuration():
+    client = pickle.loads(pickle.dumps(BackgroundNetMind(api_key="mock", base_url="http://localhost:1")))
+    assert client.client.client.api_key == "mock"
+
+
+def test_submit_races_close():
+    with MockServer(MockConfig(latency=0.05)) as server:
+        client = BackgroundNetMind(api_key="mock", base_url=server.url)
+        futures, refused = [], []
+
+        def submit():
+            stop = time.monotonic() + 3
+            while time.monotonic() < stop:
+                try:
+                    futures.append(client.embeddings.create(model="mock", input="text"))
+                except RuntimeError:
+                    refused.append(True)
+                    return
+                time.sleep(0.001)
+
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        client.close()
+        for thread in threads:
+            thread.join()
+        # every call submitted before close finishes or is cancelled, later ones are refused
+        assert len(refused) == 4
+        assert all(future.done() for future in futures)
+        with pytest.raises(RuntimeError, match="closed"):
+            client.chat.completions.create(model="mock", messages=[])
+
+
+@pytest.mark.parametrize("method", ["map", "as_completed"])
+def test_timeouts_raise_the_builtin_timeout_error(method):
+    with MockServer(MockConfig(latency=1)) as server:
+        with BackgroundNetMind(api_key="mock", base_url=server.url) as client:
+            results = getattr(client, method)(
+                lambda text: client.embeddings.create(model="mock", input=text), ["a", "b"], timeout=0.1
+            )
+            with pytest.raises(TimeoutError) as info:
+                list(results)
+            assert type(info.value) is TimeoutError
@@ -0,0 +1,77 @@
+import os
+import time
+import pytest
+
+from netmind.cache import DiskCache, MemoryCache
+
+
+@pytest.fixture(params=["memory", "disk"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(max_size=1024)
+    return DiskCache(tmp_path / "cache", max_size=1024, compress_level=0)
+
+
+def test_roundtrip(cache):
+    assert cache.get("a") is None
+    cache.set("a", b"value")
+    assert cache.get("a") == b"value"
+    assert "a" in cache
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_clear(cache):
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.clear()
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.size == 0
+
+
+def test_ttl(cache):
+    cache.set("a", b"1", ttl=0.01)
+    cache.set("b", b"2")
+    time.sleep(0.05)
+    assert cache.get("a") is None
+    assert cache.get("b") == b"2"
+
+
+def test_evicts_least_recently_used(cache):
+    for key in "abc":
+        cache.set(key, key.encode() * 300)
+        time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("d", b"d" * 300)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("d") is not None
+    assert cache.size <= 1024
+
+
+def test_oversized_values_are_not_stored(cache):
+    cache.set("big", b"x" * 4096)
+    assert cache.get("big") is None
+
+
+def test_disk_cache_is_compressed_and_shared(tmp_path):
+    first = DiskCache(tmp_path)
+    first.set("key", b"abc" * 10000)
+    files = [os.path.join(root, name) for root, _, names in os.walk(tmp_path) for name in names]
+    assert len(files) == 1
+    assert os.path.getsize(files[0]) < 1000
+    assert DiskCache(tmp_path).get("key") == b"abc" * 10000
+
+
+@pytest.mark.parametrize("content", [b"", b"\x00" * 4, b"\x00" * 8 + b"not zlib"])
+def test_disk_cache_corrupt_entries_are_misses(tmp_path, content):
+    cache = DiskCache(tmp_path)
+    cache.set("key", b"value")
+    files = [os.path.join(root, name) for root, _, names in os.walk(tmp_path) for name in names]
+    with open(files[0], "wb") as f:
+        f.write(content)
+    assert cache.get("key") is None
+    assert not os.path.exists(files[0])
+    cache.set("key", b"value")
+    assert cache.get("key") == b"value"
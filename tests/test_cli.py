@@ -0,0 +1,115 @@
+import os
+import json
+import shutil
+import pytest
+
+from netmind.cli import main, expand_sources
+
+DEMO = os.path.join(os.path.dirname(__file__), "..", "demo")
+
+
+@pytest.fixture
+def run(mock_server):
+    def run(*args: str) -> int:
+        return main(["--api-key", "mock", "--base-url", mock_server.url, "--max-retries", "0", *args])
+    return run
+
+
+@pytest.fixture
+def documents(tmp_path):
+    directory = tmp_path / "docs"
+    (directory / "nested").mkdir(parents=True)
+    shutil.copy(os.path.join(DEMO, "test.pdf"), directory / "a.pdf")
+    shutil.copy(os.path.join(DEMO, "table.pdf"), directory / "nested" / "b.pdf")
+    (directory / "notes.txt").write_text("not a pdf")
+    return directory
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_expand_sources(documents):
+    names = [name for _, name in expand_sources([str(documents)], "*.pdf")]
+    assert names == ["a.pdf", os.path.join("nested", "b.pdf")]
+    names = [name for _, name in expand_sources([str(documents / "**" / "*.pdf")])]
+    assert sorted(names) == ["a.pdf", os.path.join("nested", "b.pdf")]
+    [(url, name)] = expand_sources(["https://example.com/paper.pdf"], allow_urls=True)
+    assert url == "https://example.com/paper.pdf" and name.startswith("paper.pdf-")
+
+
+def test_files_upload_resumes(run, documents, tmp_path, mock_server):
+    output = tmp_path / "uploads.jsonl"
+    assert run("files", "upload", str(documents), "--pattern", "*.pdf", "-o", str(output), "-q") == 0
+    uploads = read_jsonl(output)
+    assert len(uploads) == 2 and all(u["id"] in mock_server.uploads for u in uploads)
+
+    # an interrupted run leaves a partial last line, which is dropped before resuming
+    with open(output, "a") as f:
+        f.write('{"path": "cut')
+    mock_server.reset()
+    assert run("files", "upload", str(documents), "--pattern", "*.pdf", "-o", str(output), "-q") == 0
+    assert not [r for r in mock_server.requests if r.method == "PUT"]
+    assert read_jsonl(output) == uploads
+
+
+def test_files_rm_by_purpose(run, documents, capsys):
+    assert run("files", "upload", str(documents / "a.pdf"), "--purpose", "batch", "-q") == 0
+    assert run("files", "upload", str(documents / "nested"), "-q") == 0
+    capsys.readouterr()
+
+    assert run("files", "rm", "--purpose", "batch", "-q") == 1
+    assert "1 files would be deleted" in capsys.readouterr().err
+
+    assert run("files", "rm", "--purpose", "batch", "--yes", "-q") == 0
+    assert run("files", "ls") == 0
+    listed = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [f["purpose"] for f in listed] == ["inference"]
+
+
+@pytest.mark.parametrize("format, suffix", [("json", ".jsonl"), ("markdown", ".md")])
+def test_parse_directory(run, documents, tmp_path, mock_server, format, suffix):
+    output = tmp_path / "parsed"
+    args = ("parse", str(documents), "--pattern", "*.pdf", "-f", format, "-o", str(output), "-q")
+    assert run(*args) == 0
+    targets = [output / f"a.pdf{suffix}", output / "nested" / f"b.pdf{suffix}"]
+    assert all(target.exists() for target in targets)
+    if format == "json":
+        assert len(read_jsonl(targets[0])) == mock_server.config.parse_blocks
+    assert not list(output.rglob("*.part"))
+
+    mock_server.reset()
+    assert run(*args) == 0
+    assert mock_server.requests == []
+
+
+def test_embed_resumes(run, tmp_path, mock_server):
+    source = tmp_path / "texts.jsonl"
+    with open(source, "w") as f:
+        for i in range(10):
+            f.write(json.dumps({"text": f"document {i}"}) + "\n")
+        f.write(json.dumps("a plain string") + "\n")
+        f.write("{broken\n")
+    output = tmp_path / "vectors.jsonl"
+    with open(output, "w") as f:
+        f.write(json.dumps({"line": 1, "embedding": [0.0]}) + "\n")
+
+    assert run("embed", str(source), "-m", "mock/model", "-b", "4", "-o", str(output), "-q") == 1
+    records = read_jsonl(output)
+    assert sorted(r["line"] for r in records) == list(range(1, 12))
+    assert len(records[-1]["embedding"]) == mock_server.config.embedding_dim
+    inputs = [r for r in mock_server.requests if r.path.endswith("/embeddings")]
+    assert len(inputs) == 3
+
+
+def test_adaptive_concurrency_is_capped(run, tmp_path, mock_server):
+    mock_server.config.latency = 0.05
+    source = tmp_path / "texts.jsonl"
+    with open(source, "w") as f:
+        for i in range(40):
+            f.write(json.dumps({"text": f"document {i}"}) + "\n")
+    output = tmp_path / "vectors.jsonl"
+    assert run("embed", str(source), "-m", "mock/model", "-b", "1", "-c", "2", "--adaptive", "-o", str(output), "-q") == 0
+    assert len(read_jsonl(output)) == 40
+    assert mock_server.peak_in_flight <= 2
@@ -0,0 +1,99 @@
+import os
+import pickle
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import pytest
+
+from netmind import NetMind, AsyncNetMind
+from netmind.cache import DiskCache
+from netmind.journal import TaskJournal
+
+
+def test_strict_response_validation_reaches_clients():
+    client = NetMind(api_key="mock")
+    assert client._openai_client._strict_response_validation is False
+    assert client._inference_client._strict_response_validation is False
+
+    client = AsyncNetMind(api_key="mock", _strict_response_validation=True)
+    assert client._openai_client._strict_response_validation is True
+    assert client._inference_client._strict_response_validation is True
+
+
+def _chat_in_worker(client: NetMind) -> str:
+    response = client.chat.completions.create(model="mock/model", messages=[{"role": "user", "content": "hi"}])
+    return response.choices[0].message.content
+
+
+def _shared_in_worker(base_url: str) -> str:
+    client = NetMind.shared(api_key="mock", base_url=base_url, max_retries=0)
+    assert NetMind.shared(api_key="mock", base_url=base_url, max_retries=0) is client
+    return _chat_in_worker(client)
+
+
+def test_pickle_is_config_only(tmp_path):
+    client = NetMind(
+        api_key="mock", base_url="http://localhost:1", max_retries=1,
+        parse_cache=DiskCache(tmp_path / "cache"), parse_journal=TaskJournal(tmp_path / "journal.db"),
+        lean_responses=True,
+    )
+    client.chat  # build the transports
+    clone = pickle.loads(pickle.dumps(client))
+    assert "_inference_client" not in clone.__dict__
+    assert clone.client.base_url == client.client.base_url
+    assert clone._inference_client.base_url == client._inference_client.base_url
+    assert clone._inference_client.max_retries == 1
+    assert clone.lean_responses and clone.parse_cache.directory == client.parse_cache.directory
+    assert clone.parse_journal.path == client.parse_journal.path
+
+    async_clone = pickle.loads(pickle.dumps(AsyncNetMind(api_key="mock")))
+    assert isinstance(async_clone, AsyncNetMind)
+
+
+def test_pickle_leaves_out_live_options():
+    http_client = httpx.Client()
+    client = NetMind(api_key="mock", http_client=http_client, default_headers={"X-Team": "search"})
+    clone = pickle.loads(pickle.dumps(client))
+    assert "http_client" not in clone.client.kwargs
+    assert clone.client.kwargs["default_headers"] == {"X-Team": "search"}
+    assert clone._inference_client._client is not http_client
+    http_client.close()
+
+
+def test_shared_accepts_unhashable_options():
+    headers = {"X-Team": "search"}
+    client = NetMind.shared(api_key="mock", default_headers=headers)
+    assert NetMind.shared(api_key="mock", default_headers=dict(headers)) is client
+    assert NetMind.shared(api_key="mock", default_headers={"X-Team": "ads"}) is not client
+
+
+def test_process_pool_workers(mock_server):
+    client = NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+    expected = _chat_in_worker(client)
+    for method in ("fork", "spawn"):
+        with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context(method)) as pool:
+            assert list(pool.map(_chat_in_worker, [client] * 4)) == [expected] * 4
+            assert list(pool.map(_shared_in_worker, [mock_server.url] * 4)) == [expected] * 4
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork_rebuilds_transports(mock_server):
+    client = NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+    expected = _chat_in_worker(client)
+    parent_transport = client._inference_client
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            rebuilt = "_inference_client" not in client.__dict__ and client._inference_client is not parent_transport
+            ok = rebuilt and _chat_in_worker(client) == expected
+        finally:
+            os.write(write, b"1" if ok else b"0")
+            os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b"1"
+    assert client._inference_client is parent_transport
+    assert _chat_in_worker(client) == expected
@@ -0,0 +1,77 @@
+import json
+import pickle
+import pytest
+
+from benchmarks.mock_server import MockConfig, MockServer
+from netmind import NetMind, AsyncNetMind
+from netmind.types.code_interpreter import CodeInterpreterCodeRequest, CodeInterpreterCodeFile
+from netmind.types.parse_pro import Formt
+
+MODEL = "Qwen/Qwen3-8B"
+LONG_CONTEXT = " ".join(f"line {i} of a long document that repeats itself." for i in range(2000))
+
+
+def _last(server, suffix):
+    return [r for r in server.requests if r.path.endswith(suffix)][-1]
+
+
+def test_large_chat_requests_are_compressed(mock_server):
+    client = NetMind(api_key="mock", base_url=mock_server.url, max_retries=0, request_compression="gzip")
+    messages = [{"role": "user", "content": LONG_CONTEXT}]
+    response = client.chat.completions.create(model=MODEL, messages=messages)
+    assert response.choices[0].message.content
+
+    request = _last(mock_server, "/chat/completions")
+    assert request.headers["content-encoding"] == "gzip"
+    assert request.raw_body_size * 5 < request.body_size
+    assert json.loads(request.body)["messages"] == messages
+
+    client.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": "Hi there!"}])
+    assert "content-encoding" not in _last(mock_server, "/chat/completions").headers
+
+
+def test_compression_is_opt_in(mock_server):
+    client = NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+    client.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": LONG_CONTEXT}])
+    request = _last(mock_server, "/chat/completions")
+    assert "content-encoding" not in request.headers
+    assert request.raw_body_size == request.body_size
+
+
+@pytest.mark.asyncio
+async def test_async_zstd_code_interpreter(mock_server):
+    pytest.importorskip("zstandard")
+    client = AsyncNetMind(
+        api_key="mock", base_url=mock_server.url, max_retries=0, request_compression="zstd", compression_threshold=1024,
+    )
+    content = "\n".join(f"value_{i} = {i}" for i in range(5000)) + "\nprint('done')"
+    request_data = CodeInterpreterCodeRequest(
+        language="python", files=[CodeInterpreterCodeFile(name="main.py", content=content)],
+    )
+    await client.code_interpreter.arun(request_data)
+    request = _last(mock_server, "/execute")
+    assert request.headers["content-encoding"] == "zstd"
+    assert request.raw_body_size < request.body_size
+    assert json.loads(request.body)["files"][0]["content"] == content
+
+
+def test_large_responses_are_negotiated():
+    with MockServer(MockConfig(gzip_min_size=1024, parse_blocks=200)) as server:
+        client = NetMind(api_key="mock", base_url=server.url, max_retries=0)
+        responses = []
+        client._openai_client._client.event_hooks["response"].append(responses.append)
+        result = client.parse_pro.parse("https://example.com/doc.pdf", format=Formt.json)
+        assert len(result) == 200
+        assert "gzip" in _last(server, "/parse-pdf").headers["accept-encoding"]
+        [response] = responses
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()) == 200
+
+
+def test_options():
+    with pytest.raises(ValueError):
+        NetMind(api_key="mock", request_compression="brotli")
+    client = pickle.loads(pickle.dumps(NetMind(api_key="mock", request_compression="gzip", compression_threshold=1)))
+    assert (client.request_compression, client.compression_threshold) == ("gzip", 1)
+    assert client._inference_client.request_compression == "gzip"
@@ -0,0 +1,108 @@
+import asyncio
+import pickle
+import pytest
+
+from benchmarks.mock_server import MockConfig, MockServer
+from netmind import AsyncNetMind
+from netmind.concurrency import AIMDLimiter, AdaptiveConcurrency, OK, THROTTLED, FAILED
+from netmind._transport import endpoint_family
+
+import httpx
+
+
+def test_additive_increase():
+    limiter = AIMDLimiter("chat", initial_limit=4, max_limit=6)
+    # about one more slot per round of `limit` responses
+    for _ in range(5):
+        limiter.record(0.0, 0.01, OK)
+    assert limiter.capacity == 5
+    for _ in range(100):
+        limiter.record(0.0, 0.01, OK)
+    assert limiter.capacity == 6
+
+
+def test_initial_limit_is_capped():
+    assert AIMDLimiter("chat", max_limit=2).capacity == 2
+    assert AdaptiveConcurrency(max_limit=2).limiter("embeddings").capacity == 2
+
+
+def test_multiplicative_decrease_once_per_round():
+    limiter = AIMDLimiter("chat", initial_limit=16)
+    limiter.record(1.0, None, THROTTLED)
+    assert limiter.capacity == 8
+    # a response to a request sent before the cut does not cut again
+    limiter.record(1.0, None, FAILED)
+    assert limiter.capacity == 8
+    limiter.record(limiter._last_cut, None, THROTTLED)
+    assert limiter.capacity == 4
+    assert (limiter.throttled, limiter.failures) == (2, 1)
+
+
+def test_latency_spike_cuts_the_limit():
+    limiter = AIMDLimiter("chat", initial_limit=16, latency_tolerance=3.0, warmup=5)
+    for _ in range(10):
+        limiter.record(0.0, 0.01, OK)
+    limit = limiter.limit
+    limiter.record(limiter._last_cut, 0.5, OK)
+    assert limiter.limit == pytest.approx(limit / 2)
+    assert limiter.slowdowns == 1
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_capacity():
+    limiter = AIMDLimiter("chat", initial_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    cancelled = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done() and limiter.metrics().waiting == 2
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    limiter.release()
+    await waiter
+    assert limiter.in_flight == 2 and limiter.metrics().waiting == 0
+
+
+def test_endpoint_family():
+    def family(method, url):
+        return endpoint_family(httpx.Request(method, url))
+
+    assert family("POST", "http://h/inference-api/openai/v1/chat/completions") == "chat"
+    assert family("POST", "http://h/inference-api/openai/v1/embeddings") == "embeddings"
+    assert family("GET", "http://h/inference-api/agent/v1/parse-pdf/async/1") == "parse"
+    assert family("POST", "http://h/inference-api/agent/code-interpreter/v1/execute") == "code_interpreter"
+    assert family("GET", "http://h/v1/files/file-1") == "files"
+    assert family("PUT", "http://bucket/upload") == "files"
+    assert family("GET", "http://h/v1/models") is None
+
+
+def test_pickle_keeps_configuration():
+    concurrency = AdaptiveConcurrency(max_limit=32, families={"chat": {"initial_limit": 2}})
+    concurrency.limiter("chat")
+    clone = pickle.loads(pickle.dumps(concurrency))
+    assert clone.metrics() == {}
+    assert clone.limiter("chat").capacity == 2 and clone.limiter("chat").max_limit == 32
+
+
+@pytest.mark.asyncio
+async def test_client_adapts_to_server_capacity():
+    with MockServer(MockConfig(latency=0.01, max_concurrency=4)) as server:
+        client = AsyncNetMind(
+            api_key="mock", base_url=server.url, max_retries=50,
+            concurrency=AdaptiveConcurrency(initial_limit=32),
+        )
+
+        async def embed():
+            return await client.embeddings.create(model="mock/model", input="hello")
+
+        results = await asyncio.gather(*(embed() for _ in range(200)))
+        assert len(results) == 200
+
+        metrics = client.concurrency.metrics()
+        assert set(metrics) == {"embeddings"}
+        embeddings = metrics["embeddings"]
+        assert embeddings.throttled > 0 and embeddings.successes == 200
+        assert embeddings.limit < 32
+        assert embeddings.in_flight == 0 and embeddings.waiting == 0
@@ -0,0 +1,155 @@
+import time
+import asyncio
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.mock_server import MockConfig, MockServer
+from netmind import NetMind, AsyncNetMind
+from netmind._pipeline import run_pipeline
+from netmind.deadlines import cancel_at_deadline, remaining, trim_timeout, use_deadline
+from netmind.exceptions import DeadlineExceededError
+from netmind.types.code_interpreter import CodeInterpreterCodeRequest, CodeInterpreterCodeFile
+
+CODE_REQUEST = CodeInterpreterCodeRequest(
+    language="python",
+    files=[CodeInterpreterCodeFile(name="main.py", content="print('hello')")],
+)
+
+
+def _executions(server) -> int:
+    return len([r for r in server.requests if r.path.endswith("/execute")])
+
+
+def test_nested_deadlines_never_extend():
+    assert remaining() is None
+    with use_deadline(0.5):
+        with use_deadline(10):
+            assert remaining() <= 0.5
+        with use_deadline(0.1):
+            assert remaining() <= 0.1
+            assert trim_timeout(300) <= 0.1
+    assert remaining() is None
+    assert trim_timeout(300) == 300
+
+
+def test_expired_deadline_fails_fast():
+    with use_deadline(0):
+        with pytest.raises(DeadlineExceededError):
+            trim_timeout(300)
+
+
+def test_retries_stop_at_the_deadline():
+    with MockServer(MockConfig(latency=0.5)) as server:
+        client = NetMind(api_key="mock", base_url=server.url)
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            # the request itself allows 30s and 3 retries
+            client.code_interpreter.run(CODE_REQUEST, deadline=0.2)
+        assert time.monotonic() - started < 0.45
+        assert _executions(server) == 1
+
+
+def test_sub_requests_share_the_budget(tmp_path):
+    document = tmp_path / "doc.pdf"
+    document.write_bytes(b"%PDF-1.4 mock")
+    with MockServer(MockConfig(upload_latency=0.3)) as server:
+        client = NetMind(api_key="mock", base_url=server.url, max_retries=0)
+        client.parse_pro.parse(document, deadline=2)
+        parse, = [r for r in server.requests if r.path.endswith("/parse-pdf")]
+        # the parse POST only gets what the upload left of the budget, not its own 5 minutes
+        assert float(parse.headers["x-stainless-read-timeout"]) < 1.7
+
+        with pytest.raises(DeadlineExceededError):
+            client.parse_pro.parse(document, deadline=0.1)
+
+
+def test_polling_stops_at_the_deadline():
+    with MockServer(MockConfig(parse_task_polls=100)) as server:
+        client = NetMind(api_key="mock", base_url=server.url, max_retries=0)
+        task = client.parse_pro.aparse("https://example.com/doc.pdf")
+        started = time.monotonic()
+        with use_deadline(0.2), pytest.raises(DeadlineExceededError):
+            client.parse_pro.wait(task.task_id, poll_interval=5)
+        assert time.monotonic() - started < 1
+
+
+class _TrickleHandler(BaseHTTPRequestHandler):
+    """Answers with a body sent one byte every 50ms, each read well within any timeout."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "200")
+        self.end_headers()
+        try:
+            for _ in range(200):
+                self.wfile.write(b" ")
+                self.wfile.flush()
+                time.sleep(0.05)
+        except ConnectionError:
+            pass
+
+
+def test_sync_response_bodies_stop_at_the_deadline():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TrickleHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = NetMind(api_key="mock", base_url=f"http://127.0.0.1:{server.server_address[1]}", max_retries=0)
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            client.code_interpreter.run(CODE_REQUEST, deadline=0.3)
+        assert time.monotonic() - started < 1
+    finally:
+        server.shutdown()
+
+
+def test_sync_uploads_stop_at_the_deadline():
+    def slow_chunks():
+        for _ in range(100):
+            time.sleep(0.02)
+            yield b"x" * 1024
+
+    with MockServer() as server:
+        client = NetMind(api_key="mock", base_url=server.url)
+        started = time.monotonic()
+        with use_deadline(0.2), pytest.raises(DeadlineExceededError):
+            client._openai_client._client.put(f"{server.url}/upload/file-1", content=slow_chunks())
+        assert time.monotonic() - started < 0.5
+
+
+def test_pipeline_stages_inherit_the_deadline():
+    with use_deadline(5):
+        left, = run_pipeline([None], [(lambda _: remaining(), 1)])
+    assert 0 < left <= 5
+
+
+@pytest.mark.asyncio
+async def test_cancel_at_deadline():
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        async with cancel_at_deadline(0.05):
+            await asyncio.sleep(5)
+    assert time.monotonic() - started < 1
+    # the task is usable afterwards
+    await asyncio.sleep(0)
+    async with cancel_at_deadline(None):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_async_calls_are_cancelled_at_the_deadline():
+    with MockServer(MockConfig(latency=1)) as server:
+        client = AsyncNetMind(api_key="mock", base_url=server.url)
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            await client.code_interpreter.arun(CODE_REQUEST, deadline=0.2)
+        assert time.monotonic() - started < 0.6
+        assert _executions(server) == 1
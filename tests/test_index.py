@@ -0,0 +1,125 @@
+import json
+import numpy as np
+import pytest
+
+from netmind import NetMind
+from netmind.exceptions import NetMindError
+from netmind.index import VectorIndex
+
+
+def brute_force(vectors, queries, k, metric):
+    if metric == "cosine":
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    if metric == "l2":
+        distances = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(-1)
+        return np.argsort(distances, axis=1)[:, :k]
+    return np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(2000, 32)).astype(np.float32), rng.normal(size=(50, 32)).astype(np.float32)
+
+
+@pytest.mark.parametrize("metric", ["cosine", "ip", "l2"])
+def test_exact_search(data, metric):
+    vectors, queries = data
+    index = VectorIndex(metric=metric)
+    for start in range(0, len(vectors), 300):
+        index.add(vectors[start:start + 300])
+    scores, ids = index.search(queries, k=5, batch_size=16)
+    assert ids.shape == scores.shape == (50, 5)
+    assert (ids == brute_force(vectors, queries, 5, metric)).all()
+    if metric == "l2":
+        assert (np.diff(scores, axis=1) >= 0).all()
+    else:
+        assert (np.diff(scores, axis=1) <= 0).all()
+
+
+def test_single_query_and_padding():
+    index = VectorIndex()
+    index.add([[1.0, 0.0], [0.0, 1.0]], ids=["x", "y"])
+    scores, ids = index.search([1.0, 0.1], k=3)
+    assert list(ids) == ["x", "y", None]
+    assert np.isnan(scores[2])
+
+
+def test_ivf_recall(data):
+    vectors, queries = data
+    index = VectorIndex()
+    index.add(vectors)
+    index.train(nlist=16, seed=1)
+    assert index.is_trained
+    _, approx = index.search(queries, k=10, nprobe=4)
+    exact = brute_force(vectors, queries, 10, "cosine")
+    recall = np.mean([len(set(a) & set(e)) / 10 for a, e in zip(approx, exact)])
+    assert recall > 0.5
+    _, all_lists = index.search(queries, k=10, nprobe=16)
+    assert (all_lists == exact).all()
+    _, forced = index.search(queries, k=10, nprobe=0)
+    assert (forced == exact).all()
+
+    # vectors added after training land in their closest list
+    index.add(queries, ids=[f"q{i}" for i in range(len(queries))])
+    _, ids = index.search(queries, k=1, nprobe=2)
+    assert list(ids[:, 0]) == [f"q{i}" for i in range(len(queries))]
+
+
+def test_directory_persistence(tmp_path, data):
+    vectors, queries = data
+    index = VectorIndex(metric="l2", directory=tmp_path / "index")
+    index.add(vectors[:1500], ids=list(range(100, 1600)))
+    index.train(nlist=8)
+    index.add(vectors[1500:], ids=list(range(1600, 2100)))
+    expected = index.search(queries, k=5, nprobe=3)
+
+    loaded = VectorIndex.load(tmp_path / "index")
+    assert len(loaded) == 2000 and loaded.is_trained
+    assert isinstance(loaded.vectors, np.memmap)
+    result = loaded.search(queries, k=5, nprobe=3)
+    assert (result[1] == expected[1]).all()
+    loaded.add(queries[:1], ids=["extra"])
+    assert VectorIndex.load(tmp_path / "index").ids[-1] == "extra"
+
+    with pytest.raises(NetMindError):
+        VectorIndex(directory=tmp_path / "index")
+    readonly = VectorIndex.load(tmp_path / "index", mmap_mode="r")
+    with pytest.raises(NetMindError):
+        readonly.add(queries[:1])
+
+
+def test_load_drops_a_single_stale_id(tmp_path):
+    directory = tmp_path / "index"
+    index = VectorIndex(directory=directory)
+    index.add(np.eye(2, 4, dtype=np.float32), ids=["a", "b"])
+    # an `add` interrupted after writing its id but before recording the count
+    with open(directory / "ids.jsonl", "a") as f:
+        f.write(json.dumps("stale") + "\n")
+
+    loaded = VectorIndex.load(directory)
+    assert loaded.ids == ["a", "b"]
+    loaded.add(np.eye(1, 4, k=2, dtype=np.float32), ids=["c"])
+    reloaded = VectorIndex.load(directory)
+    assert reloaded.ids == ["a", "b", "c"]
+    assert list(reloaded.search(np.eye(1, 4, k=2, dtype=np.float32), k=1)[1][0]) == ["c"]
+
+
+def test_save_in_memory_index(tmp_path, data):
+    vectors, queries = data
+    index = VectorIndex()
+    index.add(vectors)
+    index.save(tmp_path / "saved")
+    loaded = VectorIndex.load(tmp_path / "saved", mmap_mode="r")
+    assert (loaded.search(queries, k=3)[1] == index.search(queries, k=3)[1]).all()
+
+
+def test_from_embedding_responses(mock_server):
+    client = NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+    texts = ["alpha", "beta", "gamma", "delta"]
+    responses = [client.embeddings.create(model="mock/model", input=texts[i:i + 2]) for i in (0, 2)]
+    index = VectorIndex.from_embeddings(responses)
+    assert len(index) == 4 and index.dim == mock_server.config.embedding_dim
+    _, ids = index.search(responses[1], k=1)
+    assert list(ids[:, 0]) == [2, 3]
@@ -0,0 +1,53 @@
+import pickle
+
+from netmind.journal import TaskJournal
+
+
+def record(journal, task_id, digest="sha256:abc", status="PENDING", format="json"):
+    journal.record(task_id, digest, format=format, mode=None, figure_parsing=False, status=status, source="a.pdf")
+
+
+def test_record_and_find(tmp_path):
+    journal = TaskJournal(tmp_path / "journal.db")
+    record(journal, "t1")
+    entry = journal.find("sha256:abc", format="json", mode=None, figure_parsing=False)
+    assert entry.task_id == "t1"
+    assert entry.source == "a.pdf"
+    assert journal.find("sha256:abc", format="markdown", mode=None, figure_parsing=False) is None
+    assert journal.find("sha256:abc", format="json", mode="fast", figure_parsing=False) is None
+
+
+def test_failed_tasks_are_not_reused(tmp_path):
+    journal = TaskJournal(tmp_path / "journal.db")
+    record(journal, "t1")
+    journal.update("t1", "FAILED")
+    assert journal.find("sha256:abc", format="json", mode=None, figure_parsing=False) is None
+
+
+def test_status_transitions_and_outstanding(tmp_path):
+    journal = TaskJournal(tmp_path / "journal.db")
+    record(journal, "t1")
+    record(journal, "t2", digest="sha256:def")
+    journal.update("t1", "STARTED")
+    journal.update("t1", "STARTED")
+    journal.update("t1", "SUCCESS")
+    assert journal.history("t1") == ["PENDING", "STARTED", "SUCCESS"]
+    assert [entry.task_id for entry in journal.outstanding()] == ["t2"]
+    assert journal.get("t1").is_finished()
+
+
+def test_survives_reopening_and_pickling(tmp_path):
+    path = tmp_path / "journal.db"
+    journal = TaskJournal(path)
+    record(journal, "t1")
+    journal.close()
+    assert TaskJournal(path).get("t1").status == "PENDING"
+    assert pickle.loads(pickle.dumps(journal)).get("t1").task_id == "t1"
+
+
+def test_forget(tmp_path):
+    journal = TaskJournal(tmp_path / "journal.db")
+    record(journal, "t1")
+    journal.forget("t1")
+    assert journal.get("t1") is None
+    assert journal.history("t1") == []
@@ -0,0 +1,116 @@
+import time
+import asyncio
+import pickle
+import pytest
+
+from benchmarks.mock_server import MockConfig, MockServer
+from netmind import NetMind, AsyncNetMind
+from netmind.scheduling import PRIORITY_HEADER, PriorityScheduler, use_priority
+
+
+async def dispatch_order(scheduler, requests):
+    """Queue `requests` (priorities) behind a held slot, then release one at a time."""
+    await scheduler.acquire("interactive")
+    order = []
+
+    async def request(priority):
+        await scheduler.acquire(priority)
+        order.append(priority)
+
+    tasks = [asyncio.ensure_future(request(p)) for p in requests]
+    await asyncio.sleep(0)
+    scheduler.release("interactive")
+    for _ in requests:
+        await asyncio.sleep(0)
+        scheduler.release(order[-1])
+    await asyncio.gather(*tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_queuing():
+    scheduler = PriorityScheduler(capacity=2, reserved=1)
+    order = await dispatch_order(scheduler, ["batch"] * 30 + ["background"] * 30)
+    head = order[:15]
+    assert head.count("batch") == 10 and head.count("background") == 5
+
+
+@pytest.mark.asyncio
+async def test_interactive_first_and_reserved_capacity():
+    scheduler = PriorityScheduler(capacity=4, reserved=2)
+    await scheduler.acquire("batch")
+    await scheduler.acquire("batch")
+    # bulk work cannot take the reserved slots
+    waiting = asyncio.ensure_future(scheduler.acquire("background"))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+    await scheduler.acquire("interactive")
+    await scheduler.acquire("interactive")
+    assert scheduler.in_flight == 4
+
+    order = await dispatch_order(PriorityScheduler(capacity=2, reserved=1), ["background"] * 3 + ["interactive"] * 3)
+    assert order[:3] == ["interactive"] * 3
+    waiting.cancel()
+
+
+def test_classify():
+    scheduler = PriorityScheduler(families={"parse": "background"})
+    assert scheduler.classify("chat") == "interactive"
+    assert scheduler.classify("embeddings") == "batch"
+    assert scheduler.classify("parse") == "background"
+    assert scheduler.classify(None) == "batch"
+    assert scheduler.classify("chat", "Background") == "background"
+    with use_priority("background"):
+        assert scheduler.classify("chat") == "background"
+        assert scheduler.classify("chat", "interactive") == "interactive"
+    with pytest.raises(ValueError):
+        scheduler.classify("chat", "urgent")
+
+    clone = pickle.loads(pickle.dumps(scheduler))
+    assert clone.families["parse"] == "background" and clone.reserved == scheduler.reserved
+
+
+@pytest.mark.asyncio
+async def test_interactive_latency_under_bulk_load():
+    with MockServer(MockConfig(latency=0.02)) as server:
+        scheduler = PriorityScheduler(capacity=4, reserved=1)
+        client = AsyncNetMind(api_key="mock", base_url=server.url, max_retries=0, scheduler=scheduler)
+
+        async def bulk():
+            with client.priority("background"):
+                await client.embeddings.create(model="mock/model", input="bulk")
+
+        async def chat():
+            start = time.perf_counter()
+            await client.chat.completions.create(
+                model="mock/model", messages=[{"role": "user", "content": "hi"}],
+                extra_headers={PRIORITY_HEADER: "interactive"},
+            )
+            return time.perf_counter() - start
+
+        bulk_tasks = [asyncio.ensure_future(bulk()) for _ in range(60)]
+        await asyncio.sleep(0.05)
+        latencies = await asyncio.gather(*(chat() for _ in range(3)))
+        await asyncio.gather(*bulk_tasks)
+
+        # 60 bulk requests take about 60 / 3 * 20ms, interactive ones skip the queue
+        assert max(latencies) < 0.2
+        metrics = scheduler.metrics()
+        assert metrics["background"].dispatched == 60 and metrics["interactive"].dispatched == 3
+        assert metrics["background"].in_flight == metrics["interactive"].in_flight == 0
+        assert server.peak_in_flight <= 4
+        assert all(PRIORITY_HEADER.lower() not in r.headers for r in server.requests)
+
+
+@pytest.mark.asyncio
+async def test_priority_header_is_never_sent(mock_server):
+    messages = [{"role": "user", "content": "hi"}]
+    headers = {PRIORITY_HEADER: "background"}
+    NetMind(api_key="mock", base_url=mock_server.url, max_retries=0).chat.completions.create(
+        model="mock/model", messages=messages, extra_headers=headers,
+    )
+    await AsyncNetMind(api_key="mock", base_url=mock_server.url, max_retries=0).chat.completions.create(
+        model="mock/model", messages=messages, extra_headers=headers,
+    )
+    assert len(mock_server.requests) == 2
+    assert all(PRIORITY_HEADER.lower() not in r.headers for r in mock_server.requests)
@@ -0,0 +1,90 @@
+import os
+import json
+import pytest
+
+from netmind import NetMind
+from netmind.exceptions import JsonlValidationError
+from netmind.validation import count_tokens, line_ranges, validate_jsonl
+
+DEMO_PATH = os.path.join(os.path.dirname(__file__), "..", "demo", "english.jsonl")
+
+VALID = {"messages": [{"role": "user", "content": "Hello there"}, {"role": "assistant", "content": "Hi!"}]}
+
+
+def write_jsonl(path, lines):
+    with open(path, "w") as f:
+        for line in lines:
+            f.write((line if isinstance(line, str) else json.dumps(line)) + "\n")
+    return str(path)
+
+
+def test_demo_file_is_valid():
+    report = validate_jsonl(DEMO_PATH)
+    assert report.is_valid()
+    with open(DEMO_PATH) as f:
+        assert report.lines == report.valid_lines == len(f.read().splitlines())
+    assert report.tokens > 0
+    assert report.max_line_tokens <= report.tokens
+
+
+def test_line_ranges_are_line_aligned(tmp_path):
+    path = write_jsonl(tmp_path / "data.jsonl", [VALID] * 100)
+    ranges = line_ranges(path, range_size=100)
+    assert ranges[0][0] == 0 and ranges[-1][1] == os.path.getsize(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b"\n"
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_reports_errors_with_line_numbers(tmp_path, workers):
+    lines = [VALID] * 50
+    lines[3] = "{not json"
+    lines[10] = {"messages": [{"role": "robot", "content": "beep"}]}
+    lines[20] = {"messages": [{"role": "user", "content": "no answer"}]}
+    lines[30] = ""
+    lines[49] = {"prompt": "legacy"}
+    path = write_jsonl(tmp_path / "data.jsonl", lines)
+
+    report = validate_jsonl(path, workers=workers, range_size=512)
+    assert report.lines == 50
+    assert report.valid_lines == 45
+    assert [e.line for e in report.errors] == [4, 11, 21, 31, 50]
+    assert "invalid json" in report.errors[0].message
+    assert "role" in report.errors[1].message
+    assert "assistant" in report.errors[2].message
+    assert report.errors[3].message == "empty line"
+    assert report.tokens == 45 * validate_jsonl(write_jsonl(tmp_path / "one.jsonl", [VALID])).tokens
+
+
+def test_max_errors(tmp_path):
+    path = write_jsonl(tmp_path / "data.jsonl", ["[]"] * 10)
+    report = validate_jsonl(path, max_errors=3, workers=2, range_size=8)
+    assert len(report.errors) == 3 and report.truncated
+
+
+def test_batch_purpose(tmp_path):
+    request = {"custom_id": "1", "method": "POST", "url": "/v1/chat/completions",
+               "body": {"model": "m", "messages": [{"role": "user", "content": "hi"}]}}
+    path = write_jsonl(tmp_path / "batch.jsonl", [request, {"custom_id": 2}])
+    report = validate_jsonl(path, purpose="batch")
+    assert [e.line for e in report.errors] == [2]
+    assert report.tokens == count_tokens("hi") + 4
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_bytes(b"")
+    assert not validate_jsonl(path).is_valid()
+
+
+def test_create_gated_by_validation(tmp_path, mock_server):
+    client = NetMind(api_key="mock", base_url=mock_server.url, max_retries=0)
+    path = write_jsonl(tmp_path / "data.jsonl", [VALID, "{oops"])
+    with pytest.raises(JsonlValidationError) as info:
+        client.files.create(path, purpose="fine-tune", validate=True)
+    assert info.value.report.errors[0].line == 2
+    assert mock_server.requests == []
+
+    assert client.files.create(DEMO_PATH, purpose="fine-tune", validate=True).id.startswith("file-")